@@ -1,17 +1,15 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
 from datetime import datetime
 import os
 import re
 import json
+import uuid
 from io import BytesIO
-from PyPDF2 import PdfReader
-from PIL import Image as PILImage
-from utils.report_generator import ReportGenerator
-from utils.zodiac_mapping import ZODIAC_BODY_MAPPING, get_zodiac_info, get_accessories_for_sign
+# Heavy libraries (reportlab, docx, openpyxl, PyPDF2, PIL, numpy, pdf2image) are
+# imported inside the endpoints that need them to keep cold starts fast
+from utils.zodiac_mapping import get_zodiac_info, get_accessories_for_sign
 from utils.vastu_directions import (
-    VASTU_DIRECTIONS,
-    PLANET_COLORS,
     get_direction_info,
     get_colors_for_direction,
     get_planets_for_direction,
@@ -20,17 +18,42 @@ from utils.vastu_directions import (
     suggest_colors_for_planets
 )
 from utils.astro_vastu_logic import (
-    PLANET_ZODIAC_CLASSICAL,
     get_body_parts_for_planet,
     get_placement_suggestions_for_direction,
-    generate_placement_recommendation,
-    generate_removal_recommendation,
+    get_recommendation,
     batch_generate_recommendations,
+    iter_batch_recommendations,
     get_planet_classical_info,
     is_planet_exalted_in_sign,
     is_planet_debilitated_in_sign,
     get_planet_strength_in_sign
 )
+from utils.static_payloads import serve_static_payload
+from utils.bulk_reports import iter_bulk_entries, stream_reports_zip
+from utils.storage_manager import (
+    ReportStorageManager,
+    REPORT_STORAGE_MAX_BYTES,
+    REPORT_STORAGE_MAX_AGE_SECONDS,
+    REPORT_JANITOR_INTERVAL_SECONDS
+)
+from utils.storage_backends import create_report_store, is_valid_report_id
+from utils.bulkheads import isolated, hold_while_streaming, saturated_response, bulkhead_stats, PoolSaturated
+from utils.admission import admission_controlled, admission_stats
+from utils.api_auth import api_key_required
+from utils.uploads import SpooledUploadRequest, EmptyUploadError, open_upload, upload_limit
+from utils.dasha_schedule import ClientScheduleStore
+from utils.report_records import ReportRecords
+from utils.client_store import ClientStore, ClientNotFound, ClientChanged, is_valid_client_id
+from utils.report_search import ReportSearchIndex, InvalidSearchQuery
+from utils.report_history import ReportHistory, VersionNotFound
+from utils.single_flight import coalesced, request_key, single_flight_stats
+from utils.knowledge_index import (
+    get_planets_for_color,
+    get_directions_for_color,
+    get_signs_for_accessory,
+    get_signs_for_zone,
+    get_planet_index_entry
+)
 
 app = Flask(__name__)
 
@@ -47,8 +70,9 @@ CORS(app, resources={
             "http://127.0.0.1:3000",
             "http://192.168.31.121:3000"  # Your local network IP
         ],
-        "methods": ["GET", "POST", "OPTIONS"],
-        "allow_headers": ["Content-Type"],
+        "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+        "allow_headers": ["Content-Type", "X-API-Key", "Authorization", "If-Match"],
+        "expose_headers": ["Content-Disposition", "X-Report-Id", "X-Report-Version"],
         "supports_credentials": False
     }
 })
@@ -63,31 +87,95 @@ def add_security_headers(response):
     return response
 
 # Configuration
-app.config['UPLOAD_FOLDER'] = 'generated_reports'
+# Rendered reports and the local report store; created on first write, not at import
+app.config['UPLOAD_FOLDER'] = os.getenv("REPORT_STORAGE_ROOT", "generated_reports")
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['JSON_SORT_KEYS'] = False
+# Tighter per-endpoint upload limits
+app.config['EXTRACT_PDF_MAX_BYTES'] = int(os.getenv("EXTRACT_PDF_MAX_BYTES", str(8 * 1024 * 1024)))  # 8MB
+app.config['CONVERT_PDF_MAX_BYTES'] = int(os.getenv("CONVERT_PDF_MAX_BYTES", str(12 * 1024 * 1024)))  # 12MB
+
+# Spool PDF uploads to temp files so they can be memory-mapped instead of read
+app.request_class = SpooledUploadRequest
+
+# Generated report retention (total size cap and maximum age)
+app.config['REPORT_STORAGE_MAX_BYTES'] = REPORT_STORAGE_MAX_BYTES
+app.config['REPORT_STORAGE_MAX_AGE_SECONDS'] = REPORT_STORAGE_MAX_AGE_SECONDS
+app.config['REPORT_JANITOR_INTERVAL_SECONDS'] = REPORT_JANITOR_INTERVAL_SECONDS
+
+report_storage = ReportStorageManager(
+    app.config['UPLOAD_FOLDER'],
+    max_bytes=app.config['REPORT_STORAGE_MAX_BYTES'],
+    max_age_seconds=app.config['REPORT_STORAGE_MAX_AGE_SECONDS'],
+    janitor_interval=app.config['REPORT_JANITOR_INTERVAL_SECONDS']
+)
 
-# Ensure directories exist
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Where finished reports live: local sharded directories or an S3-compatible bucket
+report_store = create_report_store(app.config['UPLOAD_FOLDER'])
+
+# Stored client records (SQLite), so reports can be generated by client id
+clients = ClientStore()
+# Full-text index of generated reports, in the same database
+report_search = ReportSearchIndex(clients)
+# Per-client report versions stored as field diffs; only recent versions keep their file
+report_history = ReportHistory(clients)
+
+# Stores, records and indexes finished reports (shared with the dasha scheduler)
+report_records = ReportRecords(report_store, report_storage, clients, report_history, report_search)
+report_storage.on_evict = report_records.evicted
+
+# Clients picked up by the dasha rollover scheduler (python -m backend.dasha_scheduler)
+dasha_clients = ClientScheduleStore(clients)
+
+@app.before_request
+def start_report_janitor():
+    report_storage.ensure_started()
+
+def persist_bulk_report(file_path, form_data):
+    """Store and index one report of a bulk batch"""
+    report_id = report_records.persist(file_path)
+    report_records.index(report_id, form_data, os.path.splitext(file_path)[1].lstrip('.') or 'pdf')
+    return report_id
+
+def send_stored_report(report_id, download_name):
+    """Send a stored report as an attachment"""
+    local_path = report_store.path(report_id)
+    if local_path:
+        response = send_file(local_path, as_attachment=True, download_name=download_name)
+    else:
+        response = send_file(report_store.open(report_id), as_attachment=True, download_name=download_name)
+    response.headers['X-Report-Id'] = report_id
+    return response
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({'status': 'healthy', 'timestamp': datetime.now().isoformat()})
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Process-level operational metrics"""
+    return jsonify({
+        'pid': os.getpid(),
+        'timestamp': datetime.now().isoformat(),
+        'storage': report_storage.usage(),
+        'bulkheads': bulkhead_stats(),
+        'admission': admission_stats(),
+        'coalescing': single_flight_stats()
+    })
+
 @app.route('/api/zodiac-mapping', methods=['GET'])
+@isolated('lookup')
 def get_zodiac_mapping():
     """Get zodiac sign body part and accessory mapping"""
     try:
-        return jsonify({
-            'success': True,
-            'data': ZODIAC_BODY_MAPPING
-        })
+        return serve_static_payload('zodiac-mapping')
     except Exception as e:
         print(f"Error fetching zodiac mapping: {str(e)}")
         return jsonify({'error': 'Failed to fetch zodiac mapping'}), 500
 
 @app.route('/api/zodiac-info/<sign>', methods=['GET'])
+@isolated('lookup')
 def get_sign_info(sign):
     """Get information for a specific zodiac sign"""
     try:
@@ -105,6 +193,7 @@ def get_sign_info(sign):
         return jsonify({'error': 'Failed to fetch sign information'}), 500
 
 @app.route('/api/zodiac-accessories/<sign>', methods=['GET'])
+@isolated('lookup')
 def get_sign_accessories(sign):
     """Get accessories for a specific zodiac sign"""
     try:
@@ -122,18 +211,17 @@ def get_sign_accessories(sign):
         return jsonify({'error': 'Failed to fetch accessories'}), 500
 
 @app.route('/api/vastu-directions', methods=['GET'])
+@isolated('lookup')
 def get_vastu_directions():
     """Get all 16 Vastu directions with planetary influences and colors"""
     try:
-        return jsonify({
-            'success': True,
-            'data': VASTU_DIRECTIONS
-        })
+        return serve_static_payload('vastu-directions')
     except Exception as e:
         print(f"Error fetching vastu directions: {str(e)}")
         return jsonify({'error': 'Failed to fetch vastu directions'}), 500
 
 @app.route('/api/vastu-direction/<direction>', methods=['GET'])
+@isolated('lookup')
 def get_vastu_direction_info(direction):
     """Get information for a specific Vastu direction"""
     try:
@@ -151,18 +239,17 @@ def get_vastu_direction_info(direction):
         return jsonify({'error': 'Failed to fetch direction information'}), 500
 
 @app.route('/api/planet-colors', methods=['GET'])
+@isolated('lookup')
 def get_planet_colors_mapping():
     """Get color mapping for all planets"""
     try:
-        return jsonify({
-            'success': True,
-            'data': PLANET_COLORS
-        })
+        return serve_static_payload('planet-colors')
     except Exception as e:
         print(f"Error fetching planet colors: {str(e)}")
         return jsonify({'error': 'Failed to fetch planet colors'}), 500
 
 @app.route('/api/planet-colors/<planet>', methods=['GET'])
+@isolated('lookup')
 def get_planet_color_info(planet):
     """Get colors for a specific planet"""
     try:
@@ -180,6 +267,7 @@ def get_planet_color_info(planet):
         return jsonify({'error': 'Failed to fetch planet colors'}), 500
 
 @app.route('/api/planet-directions/<planet>', methods=['GET'])
+@isolated('lookup')
 def get_planet_directions(planet):
     """Get all directions associated with a planet"""
     try:
@@ -196,7 +284,81 @@ def get_planet_directions(planet):
         print(f"Error fetching planet directions: {str(e)}")
         return jsonify({'error': 'Failed to fetch planet directions'}), 500
 
+@app.route('/api/planet-index/<planet>', methods=['GET'])
+@isolated('lookup')
+def get_planet_index(planet):
+    """Get directions, colors and body parts for a planet in one lookup"""
+    try:
+        entry = get_planet_index_entry(planet)
+        if entry:
+            return jsonify({
+                'success': True,
+                'data': entry
+            })
+        else:
+            return jsonify({'error': f'Planet "{planet}" not found'}), 404
+    except Exception as e:
+        print(f"Error fetching planet index: {str(e)}")
+        return jsonify({'error': 'Failed to fetch planet index'}), 500
+
+@app.route('/api/color-associations/<color>', methods=['GET'])
+@isolated('lookup')
+def get_color_associations(color):
+    """Get planets and directions associated with a color"""
+    try:
+        planets = get_planets_for_color(color)
+        directions = get_directions_for_color(color)
+        if planets or directions:
+            return jsonify({
+                'success': True,
+                'color': color,
+                'planets': planets,
+                'directions': directions
+            })
+        else:
+            return jsonify({'error': f'Color "{color}" not found'}), 404
+    except Exception as e:
+        print(f"Error fetching color associations: {str(e)}")
+        return jsonify({'error': 'Failed to fetch color associations'}), 500
+
+@app.route('/api/accessory-signs/<accessory>', methods=['GET'])
+@isolated('lookup')
+def get_accessory_signs(accessory):
+    """Get zodiac signs associated with an accessory"""
+    try:
+        signs = get_signs_for_accessory(accessory)
+        if signs:
+            return jsonify({
+                'success': True,
+                'accessory': accessory,
+                'signs': signs
+            })
+        else:
+            return jsonify({'error': f'Accessory "{accessory}" not found'}), 404
+    except Exception as e:
+        print(f"Error fetching accessory signs: {str(e)}")
+        return jsonify({'error': 'Failed to fetch accessory signs'}), 500
+
+@app.route('/api/zone-signs/<path:zone>', methods=['GET'])
+@isolated('lookup')
+def get_zone_signs(zone):
+    """Get zodiac signs for a body placement zone or category"""
+    try:
+        signs = get_signs_for_zone(zone)
+        if signs:
+            return jsonify({
+                'success': True,
+                'zone': zone,
+                'signs': signs
+            })
+        else:
+            return jsonify({'error': f'Zone "{zone}" not found'}), 404
+    except Exception as e:
+        print(f"Error fetching zone signs: {str(e)}")
+        return jsonify({'error': 'Failed to fetch zone signs'}), 500
+
 @app.route('/api/suggest-colors', methods=['POST'])
+@isolated('lookup')
 def suggest_colors():
     """Suggest colors based on planets"""
     try:
@@ -219,6 +381,7 @@ def suggest_colors():
         return jsonify({'error': 'Failed to suggest colors'}), 500
 
 @app.route('/api/placement-suggestion', methods=['POST'])
+@isolated('lookup')
 def get_placement_suggestion():
     """Get placement suggestion for planet and direction"""
     try:
@@ -232,7 +395,7 @@ def get_placement_suggestion():
         if not planet or not direction:
             return jsonify({'error': 'Both planet and direction are required'}), 400
 
-        recommendation = generate_placement_recommendation(planet, direction)
+        recommendation = get_recommendation(planet, direction, 'place')
         return jsonify({
             'success': True,
             'recommendation': recommendation
@@ -242,6 +405,7 @@ def get_placement_suggestion():
         return jsonify({'error': 'Failed to generate placement suggestion'}), 500
 
 @app.route('/api/removal-suggestion', methods=['POST'])
+@isolated('lookup')
 def get_removal_suggestion():
     """Get removal suggestion for planet and direction"""
     try:
@@ -255,7 +419,7 @@ def get_removal_suggestion():
         if not planet or not direction:
             return jsonify({'error': 'Both planet and direction are required'}), 400
 
-        recommendation = generate_removal_recommendation(planet, direction)
+        recommendation = get_recommendation(planet, direction, 'remove')
         return jsonify({
             'success': True,
             'recommendation': recommendation
@@ -264,7 +428,27 @@ def get_removal_suggestion():
         print(f"Error generating removal suggestion: {str(e)}")
         return jsonify({'error': 'Failed to generate removal suggestion'}), 500
 
+def stream_batch_recommendations(placements, action):
+    """Yield one NDJSON line per batch entry, in input order"""
+    # Each unique recommendation is serialized once and spliced into its lines
+    serialized = {}
+    for index, key, rec, error in iter_batch_recommendations(placements, action):
+        if error:
+            yield json.dumps({'index': index, 'error': error}) + '\n'
+            continue
+
+        body = serialized.get(key)
+        if body is None:
+            body = json.dumps(rec, ensure_ascii=False)
+            serialized[key] = body
+
+        yield (
+            f'{{"index":{index},"action":{json.dumps(key[0])},'
+            f'"recommendation":{body}}}\n'
+        )
+
 @app.route('/api/batch-recommendations', methods=['POST'])
+@isolated('lookup')
 def get_batch_recommendations():
     """Get batch recommendations for multiple planet-direction combinations"""
     try:
@@ -274,6 +458,7 @@ def get_batch_recommendations():
         data = request.json
         placements = data.get('placements', [])
         action = data.get('action', 'place')  # 'place' or 'remove'
+        stream = data.get('stream', False) or request.accept_mimetypes.best == 'application/x-ndjson'
 
         if not placements or not isinstance(placements, list):
             return jsonify({'error': 'placements must be a non-empty array'}), 400
@@ -281,6 +466,12 @@ def get_batch_recommendations():
         if action not in ['place', 'remove']:
             return jsonify({'error': 'action must be either "place" or "remove"'}), 400
 
+        if stream:
+            return Response(
+                stream_with_context(stream_batch_recommendations(placements, action)),
+                mimetype='application/x-ndjson'
+            )
+
         recommendations = batch_generate_recommendations(placements, action)
         return jsonify({
             'success': True,
@@ -292,6 +483,7 @@ def get_batch_recommendations():
         return jsonify({'error': 'Failed to generate batch recommendations'}), 500
 
 @app.route('/api/direction-suggestions/<direction>', methods=['GET'])
+@isolated('lookup')
 def get_direction_suggestions(direction):
     """Get complete placement suggestions for a direction"""
     try:
@@ -308,18 +500,17 @@ def get_direction_suggestions(direction):
         return jsonify({'error': 'Failed to fetch direction suggestions'}), 500
 
 @app.route('/api/planet-classical', methods=['GET'])
+@isolated('lookup')
 def get_all_planets_classical():
     """Get classical information for all planets"""
     try:
-        return jsonify({
-            'success': True,
-            'data': PLANET_ZODIAC_CLASSICAL
-        })
+        return serve_static_payload('planet-classical')
     except Exception as e:
         print(f"Error fetching classical planet data: {str(e)}")
         return jsonify({'error': 'Failed to fetch classical planet data'}), 500
 
 @app.route('/api/planet-classical/<planet>', methods=['GET'])
+@isolated('lookup')
 def get_planet_classical(planet):
     """Get classical information for a specific planet"""
     try:
@@ -337,6 +528,7 @@ def get_planet_classical(planet):
         return jsonify({'error': 'Failed to fetch planet classical info'}), 500
 
 @app.route('/api/planet-strength', methods=['POST'])
+@isolated('lookup')
 def check_planet_strength():
     """Check planet strength in a zodiac sign"""
     try:
@@ -366,7 +558,42 @@ def check_planet_strength():
         print(f"Error checking planet strength: {str(e)}")
         return jsonify({'error': 'Failed to check planet strength'}), 500
 
+@app.route('/api/chart-analysis', methods=['POST'])
+@isolated('lookup')
+def chart_analysis():
+    """Analyze a full chart: strengths, direction relevance and ranked recommendations"""
+    try:
+        if not request.is_json:
+            return jsonify({'error': 'Content-Type must be application/json'}), 400
+
+        data = request.json
+        chart = data.get('chart')
+        limit = data.get('limit', 10)
+
+        if not chart:
+            return jsonify({'error': 'chart is required'}), 400
+
+        if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+            return jsonify({'error': 'limit must be a positive integer'}), 400
+
+        from utils.chart_analysis import parse_chart, analyze_chart
+
+        sign_codes, errors = parse_chart(chart)
+        if errors:
+            return jsonify({'error': 'Invalid chart', 'details': errors}), 400
+
+        return jsonify({
+            'success': True,
+            'analysis': analyze_chart(sign_codes, limit)
+        })
+    except Exception as e:
+        print(f"Error analyzing chart: {str(e)}")
+        return jsonify({'error': 'Failed to analyze chart'}), 500
+
 @app.route('/api/extract-pdf-data', methods=['POST'])
+@upload_limit(app.config['EXTRACT_PDF_MAX_BYTES'])
+@admission_controlled('pdf_text')
+@isolated('pdf_text')
 def extract_pdf_data():
     """Extract client data from uploaded Kundli PDF"""
     try:
@@ -383,15 +610,17 @@ def extract_pdf_data():
         if not file.filename.lower().endswith('.pdf'):
             return jsonify({'error': 'File must be a PDF'}), 400
 
-        # Read PDF
-        pdf_reader = PdfReader(BytesIO(file.read()))
+        # Read PDF straight from the memory-mapped upload
+        from PyPDF2 import PdfReader
+        with open_upload(file) as upload:
+            pdf_reader = PdfReader(upload.buffer)
 
-        # Extract text from first page
-        if len(pdf_reader.pages) == 0:
-            return jsonify({'error': 'PDF has no pages'}), 400
+            # Extract text from first page
+            if len(pdf_reader.pages) == 0:
+                return jsonify({'error': 'PDF has no pages'}), 400
 
-        first_page = pdf_reader.pages[0]
-        text = first_page.extract_text()
+            first_page = pdf_reader.pages[0]
+            text = first_page.extract_text()
 
         # Log the extracted text for debugging
         print("=" * 80)
@@ -514,11 +743,78 @@ def extract_pdf_data():
             'extractedText': text[:500]  # First 500 chars for debugging
         })
 
+    except EmptyUploadError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error extracting PDF data: {str(e)}")
         return jsonify({'error': f'Failed to extract PDF data: {str(e)}'}), 500
 
+def rasterize_pdf(pdf_path, first_page=None, last_page=None):
+    """Render pages of a PDF on disk to JPEG images at 200 DPI"""
+    from pdf2image import convert_from_path
+
+    try:
+        return convert_from_path(pdf_path, dpi=200, fmt='jpeg', first_page=first_page, last_page=last_page)
+    except Exception as conv_error:
+        print(f"Error in convert_from_path: {str(conv_error)}")
+        # Try with explicit poppler path
+        return convert_from_path(
+            pdf_path,
+            dpi=200,
+            fmt='jpeg',
+            first_page=first_page,
+            last_page=last_page,
+            poppler_path='/opt/homebrew/bin'
+        )
+
+def page_runs(page_numbers):
+    """Group 1-indexed page numbers into sorted contiguous (first, last) runs"""
+    runs = []
+    for page in sorted({p for p in page_numbers if p >= 1}):
+        if runs and page == runs[-1][1] + 1:
+            runs[-1][1] = page
+        else:
+            runs.append([page, page])
+    return [tuple(run) for run in runs]
+
+def requested_page_count():
+    """Pages a convert-pdf-pages-to-images request will rasterize, for admission (None if unreadable)"""
+    try:
+        page_numbers = json.loads(request.form.get('pages', '[1, 3, 4]'))
+    except ValueError:
+        return None
+    if not isinstance(page_numbers, list) or not all(isinstance(p, int) for p in page_numbers):
+        return None
+    return sum(last - first + 1 for first, last in page_runs(page_numbers))
+
+def images_to_data_urls(images):
+    """Encode rendered pages as JPEG data URLs"""
+    from PIL import Image as PILImage
+    import base64
+
+    image_base64_list = []
+    for img in images:
+        # Convert to RGB if necessary
+        if img.mode in ('RGBA', 'P'):
+            rgb_img = PILImage.new('RGB', img.size, (255, 255, 255))
+            if img.mode == 'P':
+                img = img.convert('RGBA')
+            rgb_img.paste(img, mask=img.split()[3] if img.mode == 'RGBA' else None)
+            img = rgb_img
+
+        # Save to BytesIO as JPEG
+        img_io = BytesIO()
+        img.save(img_io, 'JPEG', quality=95, optimize=False, subsampling=0)
+        img_io.seek(0)
+
+        # Convert to base64
+        img_base64 = base64.b64encode(img_io.read()).decode('utf-8')
+        image_base64_list.append(f'data:image/jpeg;base64,{img_base64}')
+    return image_base64_list
+
 @app.route('/api/convert-pdf-to-image', methods=['POST'])
+@upload_limit(app.config['CONVERT_PDF_MAX_BYTES'])
+@admission_controlled('raster')
 def convert_pdf_to_image():
     """Convert PDF pages to images"""
     try:
@@ -533,49 +829,15 @@ def convert_pdf_to_image():
 
         print(f"Converting PDF to images: {file.filename}")
 
-        # Import pdf2image
-        from pdf2image import convert_from_bytes
-        import base64
-
-        # Read PDF file
-        pdf_bytes = file.read()
-
-        print(f"PDF file size: {len(pdf_bytes)} bytes")
-
-        # Convert PDF pages to images with poppler path
-        try:
-            images = convert_from_bytes(pdf_bytes, dpi=200, fmt='jpeg')
-            print(f"Successfully converted PDF to {len(images)} images")
-        except Exception as conv_error:
-            print(f"Error in convert_from_bytes: {str(conv_error)}")
-            # Try with explicit poppler path
-            images = convert_from_bytes(
-                pdf_bytes,
-                dpi=200,
-                fmt='jpeg',
-                poppler_path='/opt/homebrew/bin'
+        # Poppler reads the spooled upload from disk; identical uploads in
+        # flight (client retries) share one rasterization in the raster pool
+        with open_upload(file) as upload:
+            print(f"PDF file size: {upload.size} bytes")
+            key = request_key('convert-pdf-to-image', upload.buffer)
+            image_base64_list, shared = coalesced(
+                'raster', key, lambda: images_to_data_urls(rasterize_pdf(upload.path)), pool_name='raster'
             )
-            print(f"Successfully converted PDF to {len(images)} images (with explicit poppler path)")
-
-        # Convert images to base64
-        image_base64_list = []
-        for img in images:
-            # Convert to RGB if necessary
-            if img.mode in ('RGBA', 'P'):
-                rgb_img = PILImage.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                rgb_img.paste(img, mask=img.split()[3] if img.mode == 'RGBA' else None)
-                img = rgb_img
-
-            # Save to BytesIO as JPEG
-            img_io = BytesIO()
-            img.save(img_io, 'JPEG', quality=95, optimize=False, subsampling=0)
-            img_io.seek(0)
-
-            # Convert to base64
-            img_base64 = base64.b64encode(img_io.read()).decode('utf-8')
-            image_base64_list.append(f'data:image/jpeg;base64,{img_base64}')
+            print(f"Successfully converted PDF to {len(image_base64_list)} images" + (' (coalesced)' if shared else ''))
 
         return jsonify({
             'success': True,
@@ -583,6 +845,10 @@ def convert_pdf_to_image():
             'pageCount': len(image_base64_list)
         })
 
+    except EmptyUploadError as e:
+        return jsonify({'error': str(e)}), 400
+    except PoolSaturated as e:
+        return saturated_response(e)
     except ImportError:
         return jsonify({'error': 'pdf2image library not installed. Please run: pip install pdf2image'}), 500
     except Exception as e:
@@ -590,6 +856,8 @@ def convert_pdf_to_image():
         return jsonify({'error': f'Failed to convert PDF: {str(e)}'}), 500
 
 @app.route('/api/convert-pdf-pages-to-images', methods=['POST'])
+@upload_limit(app.config['CONVERT_PDF_MAX_BYTES'])
+@admission_controlled('raster', pages=requested_page_count)
 def convert_pdf_pages_to_images():
     """Convert specific PDF pages to images"""
     try:
@@ -605,67 +873,35 @@ def convert_pdf_pages_to_images():
         # Get page numbers to extract
         pages_json = request.form.get('pages', '[1, 3, 4]')
         page_numbers = json.loads(pages_json)
+        if not isinstance(page_numbers, list) or not all(isinstance(p, int) for p in page_numbers):
+            return jsonify({'error': 'pages must be a list of page numbers'}), 400
 
         print(f"Converting specific pages from PDF: {file.filename}, pages: {page_numbers}")
 
-        # Import required modules
-        from pdf2image import convert_from_bytes
-        import base64
-
-        # Read PDF file
-        pdf_bytes = file.read()
-
-        print(f"PDF file size: {len(pdf_bytes)} bytes")
+        def convert_pages(upload):
+            # Rasterize only the requested pages, one poppler call per contiguous run
+            rendered = {}
+            for first_page, last_page in page_runs(page_numbers):
+                images = rasterize_pdf(upload.path, first_page=first_page, last_page=last_page)
+                for offset, img in enumerate(images):
+                    rendered[first_page + offset] = img
 
-        # Convert specific PDF pages to images with poppler path
-        try:
-            # Convert all pages first
-            all_images = convert_from_bytes(pdf_bytes, dpi=200, fmt='jpeg')
-            print(f"Total pages in PDF: {len(all_images)}")
-
-            # Extract only requested pages (1-indexed to 0-indexed)
+            # Keep the requested order (1-indexed pages)
             selected_images = []
             for page_num in page_numbers:
-                if 1 <= page_num <= len(all_images):
-                    selected_images.append(all_images[page_num - 1])
+                if page_num in rendered:
+                    selected_images.append(rendered[page_num])
                     print(f"Extracted page {page_num}")
                 else:
-                    print(f"Warning: Page {page_num} does not exist (total pages: {len(all_images)})")
+                    print(f"Warning: Page {page_num} does not exist")
 
             print(f"Successfully extracted {len(selected_images)} pages")
-        except Exception as conv_error:
-            print(f"Error in convert_from_bytes: {str(conv_error)}")
-            # Try with explicit poppler path
-            all_images = convert_from_bytes(
-                pdf_bytes,
-                dpi=200,
-                fmt='jpeg',
-                poppler_path='/opt/homebrew/bin'
-            )
-            selected_images = []
-            for page_num in page_numbers:
-                if 1 <= page_num <= len(all_images):
-                    selected_images.append(all_images[page_num - 1])
-
-        # Convert images to base64
-        image_base64_list = []
-        for img in selected_images:
-            # Convert to RGB if necessary
-            if img.mode in ('RGBA', 'P'):
-                rgb_img = PILImage.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                rgb_img.paste(img, mask=img.split()[3] if img.mode == 'RGBA' else None)
-                img = rgb_img
-
-            # Save to BytesIO as JPEG
-            img_io = BytesIO()
-            img.save(img_io, 'JPEG', quality=95, optimize=False, subsampling=0)
-            img_io.seek(0)
-
-            # Convert to base64
-            img_base64 = base64.b64encode(img_io.read()).decode('utf-8')
-            image_base64_list.append(f'data:image/jpeg;base64,{img_base64}')
+            return images_to_data_urls(selected_images)
+
+        with open_upload(file) as upload:
+            print(f"PDF file size: {upload.size} bytes")
+            key = request_key('convert-pdf-pages-to-images', upload.buffer, json.dumps(page_numbers))
+            image_base64_list, _ = coalesced('raster', key, lambda: convert_pages(upload), pool_name='raster')
 
         return jsonify({
             'success': True,
@@ -673,13 +909,69 @@ def convert_pdf_pages_to_images():
             'pageCount': len(image_base64_list)
         })
 
+    except EmptyUploadError as e:
+        return jsonify({'error': str(e)}), 400
+    except PoolSaturated as e:
+        return saturated_response(e)
     except ImportError:
         return jsonify({'error': 'pdf2image library not installed. Please run: pip install pdf2image'}), 500
     except Exception as e:
         print(f"Error converting PDF pages to images: {str(e)}")
         return jsonify({'error': f'Failed to convert PDF pages: {str(e)}'}), 500
 
+def render_form_report(form_data, report_type, custom_filename=None, client_id=None):
+    """
+    Render a report from form data, store and index it (recorded against client_id if given)
+
+    Returns:
+        dict: {'report_id', 'download_filename', 'version'}; shareable between
+            coalesced requests
+    """
+    # Initialize report generator
+    from utils.report_generator import ReportGenerator
+    generator = ReportGenerator(app.config['UPLOAD_FOLDER'])
+
+    # Generate report - PDF or DOCX
+    if report_type == 'pdf':
+        file_path = generator.generate_pdf(form_data)
+    elif report_type == 'docx':
+        file_path = generator.generate_docx(form_data)
+    else:
+        raise ValueError('Only PDF and DOCX export are supported')
+
+    # Validate file exists
+    if not os.path.exists(file_path):
+        raise RuntimeError(f'Report file was not written: {file_path}')
+
+    # Determine download filename
+    if custom_filename:
+        # Sanitize filename to prevent directory traversal
+        safe_filename = os.path.basename(custom_filename)
+        extension = report_type if report_type != 'excel' else 'xlsx'
+        download_filename = f"{safe_filename}.{extension}"
+    else:
+        download_filename = os.path.basename(file_path)
+
+    # Store the report (shared between app instances)
+    report_id = report_records.persist(file_path)
+    version = report_records.record(report_id, form_data, report_type, client_id)
+    if client_id:
+        try:
+            # Stored clients are kept up to date by the dasha rollover scheduler
+            dasha_clients.register(form_data, report_type, report_id, client_id)
+        except Exception as e:
+            print(f"Could not schedule dasha rollover: {str(e)}")
+    return {'report_id': report_id, 'download_filename': download_filename, 'version': version}
+
+def send_rendered_report(report):
+    """Send a report produced by render_form_report"""
+    response = send_stored_report(report['report_id'], report['download_filename'])
+    if report['version'] is not None:
+        response.headers['X-Report-Version'] = str(report['version'])
+    return response
+
 @app.route('/api/generate-report', methods=['POST'])
+@admission_controlled('render')
 def generate_report():
     """Generate report from form data"""
     try:
@@ -705,35 +997,17 @@ def generate_report():
         if not isinstance(form_data, dict):
             return jsonify({'error': 'Form data must be an object'}), 400
 
-        # Initialize report generator
-        generator = ReportGenerator()
+        if report_type == 'excel':
+            return jsonify({'error': 'Only PDF and DOCX export are supported'}), 400
 
-        # Generate report - only PDF is supported
-        if report_type == 'pdf':
-            file_path = generator.generate_pdf(form_data)
-        else:
-            return jsonify({'error': 'Only PDF export is supported'}), 400
-
-        # Validate file exists
-        if not os.path.exists(file_path):
-            return jsonify({'error': 'Failed to generate report'}), 500
-
-        # Determine download filename
-        if custom_filename:
-            # Sanitize filename to prevent directory traversal
-            safe_filename = os.path.basename(custom_filename)
-            extension = report_type if report_type != 'excel' else 'xlsx'
-            download_filename = f"{safe_filename}.{extension}"
-        else:
-            download_filename = os.path.basename(file_path)
-
-        # Return file
-        return send_file(
-            file_path,
-            as_attachment=True,
-            download_name=download_filename
-        )
+        # Identical concurrent requests (double-clicks) share one render in the render pool
+        key = request_key('generate-report', request.get_data())
+        report, _ = coalesced('render', key, lambda: render_form_report(form_data, report_type, custom_filename),
+                              pool_name='render')
+        return send_rendered_report(report)
 
+    except PoolSaturated as e:
+        return saturated_response(e)
     except Exception as e:
         # Log error (in production, use proper logging)
         import traceback
@@ -741,6 +1015,337 @@ def generate_report():
         print(traceback.format_exc())
         return jsonify({'error': 'An error occurred while generating the report'}), 500
 
+def _client_form_data(data):
+    """formData from a client create/update body, or an error response"""
+    if not data or not isinstance(data.get('formData'), dict):
+        return None, (jsonify({'error': 'formData must be an object'}), 400)
+    return data['formData'], None
+
+@app.route('/api/clients', methods=['POST'])
+@api_key_required
+@isolated('lookup')
+def create_client():
+    """Store a client's form data and return its id"""
+    try:
+        form_data, error = _client_form_data(request.get_json(silent=True))
+        if error:
+            return error
+        client_id = clients.save_client(form_data)
+        return jsonify({'success': True, 'client_id': client_id}), 201
+    except Exception as e:
+        print(f"Error storing client: {str(e)}")
+        return jsonify({'error': 'Failed to store client'}), 500
+
+@app.route('/api/clients', methods=['GET'])
+@api_key_required
+@isolated('lookup')
+def find_clients():
+    """Find stored clients by name prefix, date of birth and/or place of birth"""
+    try:
+        try:
+            limit = min(max(int(request.args.get('limit', 50)), 1), 200)
+            offset = max(int(request.args.get('offset', 0)), 0)
+        except ValueError:
+            return jsonify({'error': 'limit and offset must be integers'}), 400
+        results = clients.find_clients(
+            name=request.args.get('name'),
+            date_of_birth=request.args.get('dob'),
+            place=request.args.get('place'),
+            limit=limit,
+            offset=offset
+        )
+        return jsonify({'success': True, 'clients': results, 'limit': limit, 'offset': offset})
+    except Exception as e:
+        print(f"Error finding clients: {str(e)}")
+        return jsonify({'error': 'Failed to find clients'}), 500
+
+@app.route('/api/clients/<client_id>', methods=['GET', 'PUT', 'DELETE'])
+@api_key_required
+@isolated('lookup')
+def client_record(client_id):
+    """
+    Get, replace or delete a stored client
+
+    GET returns the client's revision (also as the ETag). A PUT carrying it
+    (If-Match header or a "revision" body field) only replaces the form if
+    nobody changed it since, and otherwise answers 409 with the current one.
+    """
+    if not is_valid_client_id(client_id):
+        return jsonify({'error': 'Client not found'}), 404
+    try:
+        if request.method == 'GET':
+            # ?assets=0 leaves images and the Kundli PDF as {"$asset": hash} references
+            expand = request.args.get('assets', '1') != '0'
+            client = clients.get_client(client_id, expand_assets=expand)
+            response = jsonify({'success': True, 'client': client})
+            response.set_etag(client['revision'])
+            return response
+        if request.method == 'PUT':
+            data = request.get_json(silent=True)
+            form_data, error = _client_form_data(data)
+            if error:
+                return error
+            revision = next(iter(request.if_match), None) or data.get('revision')
+            clients.save_client(form_data, client_id=client_id, expected_revision=revision)
+            revision = clients.get_client(client_id, expand_assets=False)['revision']
+            response = jsonify({'success': True, 'client_id': client_id, 'revision': revision})
+            response.set_etag(revision)
+            return response
+        if not clients.delete_client(client_id):
+            raise ClientNotFound(client_id)
+        report_search.remove_client(client_id)
+        return jsonify({'success': True})
+    except ClientNotFound:
+        return jsonify({'error': 'Client not found'}), 404
+    except ClientChanged:
+        current = clients.get_client(client_id, expand_assets=False)['revision']
+        return jsonify({'error': 'Client was changed since it was read', 'revision': current}), 409
+    except Exception as e:
+        print(f"Error accessing client {client_id}: {str(e)}")
+        return jsonify({'error': 'Failed to access client'}), 500
+
+@app.route('/api/clients/<client_id>/reports', methods=['GET'])
+@api_key_required
+@isolated('lookup')
+def client_reports(client_id):
+    """Reports generated for a stored client, newest first"""
+    if not is_valid_client_id(client_id):
+        return jsonify({'error': 'Client not found'}), 404
+    try:
+        return jsonify({'success': True, 'reports': clients.list_reports(client_id)})
+    except Exception as e:
+        print(f"Error listing reports for client {client_id}: {str(e)}")
+        return jsonify({'error': 'Failed to list reports'}), 500
+
+@app.route('/api/clients/<client_id>/generate-report', methods=['POST'])
+@api_key_required
+@admission_controlled('render')
+def generate_client_report(client_id):
+    """Generate a report from a stored client; the body only carries reportType and filename"""
+    if not is_valid_client_id(client_id):
+        return jsonify({'error': 'Client not found'}), 404
+    try:
+        data = request.get_json(silent=True) or {}
+        report_type = str(data.get('reportType', 'pdf')).lower()
+        if report_type not in ['pdf', 'docx']:
+            return jsonify({'error': 'Only PDF and DOCX export are supported'}), 400
+
+        client = clients.get_client(client_id)
+
+        def render():
+            return render_form_report(client['form_data'], report_type, data.get('filename'), client_id=client_id)
+
+        # Keyed on the stored form's revision: a request after an edit starts a new render
+        key = request_key('client-report', client_id, client['revision'], request.get_data())
+        report, _ = coalesced('render', key, render, pool_name='render')
+        return send_rendered_report(report)
+    except ClientNotFound:
+        return jsonify({'error': 'Client not found'}), 404
+    except PoolSaturated as e:
+        return saturated_response(e)
+    except Exception as e:
+        import traceback
+        print(f"Error generating report for client {client_id}: {str(e)}")
+        print(traceback.format_exc())
+        return jsonify({'error': 'An error occurred while generating the report'}), 500
+
+@app.route('/api/clients/<client_id>/versions', methods=['GET'])
+@api_key_required
+@isolated('lookup')
+def client_versions(client_id):
+    """A stored client's report versions, newest first, with the fields each one changed"""
+    if not is_valid_client_id(client_id):
+        return jsonify({'error': 'Client not found'}), 404
+    try:
+        return jsonify({'success': True, 'versions': report_history.list_versions(client_id)})
+    except Exception as e:
+        print(f"Error listing versions for client {client_id}: {str(e)}")
+        return jsonify({'error': 'Failed to list versions'}), 500
+
+@app.route('/api/clients/<client_id>/versions/<int:version>', methods=['GET'])
+@api_key_required
+@isolated('lookup')
+def client_version(client_id, version):
+    """One version: its diff against the previous version and its full form data (asset references)"""
+    if not is_valid_client_id(client_id):
+        return jsonify({'error': 'Client not found'}), 404
+    try:
+        return jsonify({'success': True, 'version': report_history.get_version(client_id, version)})
+    except VersionNotFound:
+        return jsonify({'error': 'Version not found'}), 404
+    except Exception as e:
+        print(f"Error reading version {version} of client {client_id}: {str(e)}")
+        return jsonify({'error': 'Failed to read version'}), 500
+
+@app.route('/api/clients/<client_id>/versions/<int:version>/report', methods=['GET'])
+@api_key_required
+@admission_controlled('render')
+def client_version_report(client_id, version):
+    """Download a version's report, rendering it again from its form data if its file is no longer kept"""
+    if not is_valid_client_id(client_id):
+        return jsonify({'error': 'Client not found'}), 404
+    try:
+        record = report_history.get_version(client_id, version)
+        download_name = f"report_v{version}.{record['report_type']}"
+        if record['report_id'] and report_store.exists(record['report_id']):
+            return send_stored_report(record['report_id'], download_name)
+
+        def render():
+            from utils.report_generator import ReportGenerator
+            from utils.report_model import build_document
+            form_data = clients.expand_form(clients.connection(), record['form_data'])
+            # Same generation date as the original report
+            document = build_document(form_data, now=datetime.fromisoformat(record['created_at']))
+            generator = ReportGenerator(app.config['UPLOAD_FOLDER'])
+            if record['report_type'] == 'docx':
+                file_path = generator.generate_docx(form_data, document=document)
+            else:
+                file_path = generator.generate_pdf(form_data, document=document)
+
+            report_id = report_records.persist(file_path)
+            report_records.index(report_id, form_data, record['report_type'], client_id, version)
+            report_records.discard(report_history.attach_file(client_id, version, report_id))
+            return {'report_id': report_id, 'download_filename': download_name, 'version': version}
+
+        key = request_key('version-report', client_id, str(version))
+        report, _ = coalesced('render', key, render, pool_name='render')
+        return send_rendered_report(report)
+    except VersionNotFound:
+        return jsonify({'error': 'Version not found'}), 404
+    except PoolSaturated as e:
+        return saturated_response(e)
+    except Exception as e:
+        import traceback
+        print(f"Error rendering version {version} of client {client_id}: {str(e)}")
+        print(traceback.format_exc())
+        return jsonify({'error': 'An error occurred while generating the report'}), 500
+
+@app.route('/api/search/reports', methods=['GET'])
+@api_key_required
+@isolated('lookup')
+def search_reports():
+    """
+    Full-text search across generated reports, newest first
+
+    Query: q (required; "quoted phrase", word*), fields (comma-separated form
+    fields), client_id, limit, offset
+    """
+    try:
+        try:
+            limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+            offset = max(int(request.args.get('offset', 0)), 0)
+        except ValueError:
+            return jsonify({'error': 'limit and offset must be integers'}), 400
+        fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+
+        page = report_search.search(
+            request.args.get('q', ''),
+            fields=fields or None,
+            client_id=request.args.get('client_id') or None,
+            limit=limit,
+            offset=offset
+        )
+        return jsonify({'success': True, 'limit': limit, 'offset': offset, **page})
+    except InvalidSearchQuery as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error searching reports: {str(e)}")
+        return jsonify({'error': 'Failed to search reports'}), 500
+
+@app.route('/api/reports/<report_id>', methods=['GET'])
+@api_key_required
+@isolated('lookup')
+def download_report(report_id):
+    """Download a previously generated report by id"""
+    try:
+        if not is_valid_report_id(report_id) or not report_store.exists(report_id):
+            return jsonify({'error': 'Report not found'}), 404
+
+        local_path = report_store.path(report_id)
+        if local_path:
+            report_storage.touch(local_path)
+
+        return send_stored_report(report_id, report_id)
+    except Exception as e:
+        print(f"Error downloading report: {str(e)}")
+        return jsonify({'error': 'Failed to download report'}), 500
+
+@app.route('/api/generate-reports-bulk', methods=['POST'])
+@admission_controlled('render')
+def generate_reports_bulk():
+    """Render many clients' PDF reports in parallel and stream them as a zip"""
+    try:
+        content_type = request.mimetype
+
+        if content_type in ('application/x-ndjson', 'application/jsonl', 'application/x-jsonlines'):
+            # JSONL is consumed line by line as the archive is produced
+            entries = iter_bulk_entries(request.stream)
+        elif request.is_json:
+            data = request.json
+            if not isinstance(data, (list, dict)) or (isinstance(data, dict) and not isinstance(data.get('reports'), list)):
+                return jsonify({'error': 'Body must be an array of form data or an object with a reports array'}), 400
+            entries = iter_bulk_entries(data)
+        else:
+            return jsonify({'error': 'Content-Type must be application/json or application/x-ndjson'}), 400
+
+        # The render slot is held until the whole archive has been streamed
+        try:
+            body = hold_while_streaming(
+                'render',
+                lambda: stream_with_context(stream_reports_zip(entries, on_report=persist_bulk_report))
+            )
+        except PoolSaturated as e:
+            return saturated_response(e)
+
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        response = Response(body, mimetype='application/zip')
+        response.headers['Content-Disposition'] = f'attachment; filename=destiny_reports_{timestamp}.zip'
+        return response
+
+    except Exception as e:
+        import traceback
+        print(f"Error generating bulk reports: {str(e)}")
+        print(traceback.format_exc())
+        return jsonify({'error': 'An error occurred while generating the reports'}), 500
+
+@app.route('/api/export-clients-excel', methods=['POST'])
+@admission_controlled('render')
+@isolated('render')
+def export_clients_excel():
+    """Export many clients' form data into one spreadsheet, one row per client"""
+    try:
+        content_type = request.mimetype
+
+        if content_type in ('application/x-ndjson', 'application/jsonl', 'application/x-jsonlines'):
+            # JSONL is consumed line by line while rows are written
+            entries = iter_bulk_entries(request.stream)
+        elif request.is_json:
+            data = request.json
+            if isinstance(data, dict) and isinstance(data.get('clients'), list):
+                data = data['clients']
+            if not isinstance(data, (list, dict)) or (isinstance(data, dict) and not isinstance(data.get('reports'), list)):
+                return jsonify({'error': 'Body must be an array of form data or an object with a clients array'}), 400
+            entries = iter_bulk_entries(data)
+        else:
+            return jsonify({'error': 'Content-Type must be application/json or application/x-ndjson'}), 400
+
+        from utils.excel_export import export_clients_workbook
+
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+        file_path = os.path.join(app.config['UPLOAD_FOLDER'], f'destiny_clients_{timestamp}_{uuid.uuid4().hex[:8]}.xlsx')
+        result = export_clients_workbook(entries, file_path)
+        print(f"Exported {result['exported']} clients to Excel ({result['skipped']} skipped)")
+
+        report_id = report_records.persist(file_path)
+        return send_stored_report(report_id, f'destiny_clients_{timestamp}.xlsx')
+
+    except Exception as e:
+        import traceback
+        print(f"Error exporting clients to Excel: {str(e)}")
+        print(traceback.format_exc())
+        return jsonify({'error': 'An error occurred while exporting the clients'}), 500
+
 @app.errorhandler(413)
 def request_entity_too_large(error):
     """Handle file size limit exceeded"""
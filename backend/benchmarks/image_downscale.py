@@ -0,0 +1,123 @@
+"""
+House map image pipeline benchmark
+
+Compares full-resolution decoding (the previous pipeline) with decode-time
+downscaling on synthetic phone photos of floor plans (12MP and 48MP
+JPEGs plus a large PNG screenshot). It reports decode+encode time, the
+decoded pixel buffer size and the size of a PDF embedding four maps. Run
+from the backend directory:
+
+    python benchmarks/image_downscale.py --runs 5
+"""
+
+import argparse
+import base64
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from PIL import Image as PILImage, ImageDraw, ImageFilter  # noqa: E402
+from reportlab.lib.units import inch  # noqa: E402
+from reportlab.platypus import Image  # noqa: E402
+
+from utils.report_generator import ReportGenerator, IMAGE_TARGET_DPI  # noqa: E402
+
+
+def phone_photo(width, height, fmt='JPEG'):
+    """A floor-plan-like photo: paper gradient, sensor noise and drawn walls"""
+    gradient = PILImage.linear_gradient('L').resize((width, height)).convert('RGB')
+    noise = PILImage.effect_noise((width, height), 24).convert('RGB')
+    image = PILImage.blend(gradient, noise, 0.35)
+    draw = ImageDraw.Draw(image)
+    step = max(width, height) // 12
+    for x in range(step, width, step):
+        draw.line([(x, step), (x, height - step)], fill=(40, 40, 40), width=max(3, width // 600))
+    for y in range(step, height, step * 2):
+        draw.line([(step, y), (width - step, y)], fill=(40, 40, 40), width=max(3, width // 600))
+    image = image.filter(ImageFilter.GaussianBlur(1))
+
+    buffer = io.BytesIO()
+    if fmt == 'JPEG':
+        image.save(buffer, 'JPEG', quality=92)
+    else:
+        image.save(buffer, 'PNG')
+    return 'data:image/%s;base64,%s' % (fmt.lower(), base64.b64encode(buffer.getvalue()).decode('ascii'))
+
+
+class FullResolutionReportGenerator(ReportGenerator):
+    """The previous pipeline: decode everything at full size, let reportlab scale"""
+
+    def prepare_image(self, base64_string, max_width=6*inch):
+        if ',' in base64_string:
+            base64_string = base64_string.split(',')[1]
+        pil_image = PILImage.open(io.BytesIO(base64.b64decode(base64_string)))
+        if pil_image.mode in ('RGBA', 'P'):
+            pil_image = pil_image.convert('RGB')
+        img_io = io.BytesIO()
+        pil_image.save(img_io, format='JPEG', quality=85)
+        img_io.seek(0)
+        draw_width = min(pil_image.width, max_width)
+        return img_io, draw_width, draw_width * pil_image.height / pil_image.width
+
+    def base64_to_image(self, base64_string, max_width=6*inch):
+        img_io, draw_width, draw_height = self.prepare_image(base64_string, max_width)
+        return Image(img_io, width=draw_width, height=draw_height)
+
+
+def time_prepare(generator, sample, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        img_io, _, _ = generator.prepare_image(sample)
+        samples.append((time.perf_counter() - start) * 1000)
+    with PILImage.open(img_io) as encoded:
+        pixels = encoded.width * encoded.height * len(encoded.getbands())
+    return statistics.median(samples), pixels, len(img_io.getvalue())
+
+
+def pdf_size(generator, samples):
+    path = generator.generate_pdf({'name': 'Benchmark', 'houseMapImages': samples})
+    size = os.path.getsize(path)
+    os.remove(path)
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark house map image decoding')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print('Generating sample images...')
+    samples = {
+        '12MP JPEG (4032x3024)': phone_photo(4032, 3024),
+        '12MP portrait JPEG (3024x4032)': phone_photo(3024, 4032),
+        '48MP JPEG (8000x6000)': phone_photo(8000, 6000),
+        '6MP PNG screenshot (3000x2000)': phone_photo(3000, 2000, 'PNG')
+    }
+
+    with tempfile.TemporaryDirectory() as scratch:
+        before = FullResolutionReportGenerator(output_dir=scratch)
+        after = ReportGenerator(output_dir=scratch)
+
+        print(f'Target print resolution: {IMAGE_TARGET_DPI} DPI\n')
+        print(f"{'image':34} {'full ms':>9} {'draft ms':>9} {'full pxMB':>9} {'draft pxMB':>10} {'jpeg KB':>15}")
+        for label, sample in samples.items():
+            full_ms, full_pixels, full_bytes = time_prepare(before, sample, args.runs)
+            draft_ms, draft_pixels, draft_bytes = time_prepare(after, sample, args.runs)
+            print(f"{label:34} {full_ms:9.1f} {draft_ms:9.1f} "
+                  f"{full_pixels / 1e6:9.1f} {draft_pixels / 1e6:10.1f} "
+                  f"{full_bytes // 1024:7} -> {draft_bytes // 1024:<5}")
+
+        maps = [samples['12MP JPEG (4032x3024)'], samples['12MP portrait JPEG (3024x4032)']] * 2
+        print(f"\nPDF with 4 house maps: {pdf_size(before, maps) / 1e6:.2f} MB full resolution, "
+              f"{pdf_size(after, maps) / 1e6:.2f} MB downscaled")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Report render time benchmark: PDF vs DOCX
+
+Renders the same client (text-only and with house maps) as PDF and as
+DOCX through the template-clone renderer. As a reference, it also times
+DOCX with the template rebuilt for every report, i.e. all styles, borders
+and margins constructed from scratch. Run from the backend directory:
+
+    python benchmarks/report_render.py --runs 20
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from image_downscale import phone_photo  # noqa: E402
+from utils import docx_renderer  # noqa: E402
+from utils.report_generator import ReportGenerator  # noqa: E402
+from utils.report_model import SECTION_LAYOUT, build_document  # noqa: E402
+
+LONG_TEXT = 'North-East entrance is blocked\nKitchen in South-West\n- Toilet in the North-East zone\nBedroom in South'
+
+
+def sample_form(with_maps):
+    # Every field filled in, multi-line where the renderers split bullets
+    form = {'name': 'Benchmark Client', 'dateOfBirth': '1990-01-02', 'timeOfBirth': '10:30', 'placeOfBirth': 'Pune'}
+    for _, _, fields in SECTION_LAYOUT:
+        for key, _ in fields:
+            form.setdefault(key, LONG_TEXT)
+    for prefix in ('mahadasha', 'antardasha', 'pratyantardasha'):
+        form[f'{prefix}_planet'] = 'Jupiter'
+        form[f'{prefix}_source'] = '5, 9'
+    if with_maps:
+        form['houseMapImages'] = [phone_photo(4032, 3024)] * 2
+        form['houseMapAnalyses'] = ['Kitchen: South-East\nBedroom: South-West'] * 2
+    return form
+
+
+def median_ms(render, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        path = render()
+        samples.append((time.perf_counter() - start) * 1000)
+        os.remove(path)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark PDF and DOCX report rendering')
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        generator = ReportGenerator(output_dir=scratch)
+
+        start = time.perf_counter()
+        docx_renderer.get_template()
+        print(f'DOCX template build (once per process): {(time.perf_counter() - start) * 1000:.1f} ms\n')
+
+        def docx_from_scratch(form):
+            docx_renderer._template = None
+            return generator.generate_docx(form)
+
+        print(f"{'client':24} {'pdf ms':>9} {'docx ms':>9} {'docx (no template) ms':>22}")
+        for label, with_maps in (('text only', False), ('with 2 house maps', True)):
+            form = sample_form(with_maps)
+            # Kundli/merge logging is noise here
+            with contextlib.redirect_stdout(io.StringIO()):
+                pdf_ms = median_ms(lambda: generator.generate_pdf(form), args.runs)
+                docx_ms = median_ms(lambda: generator.generate_docx(form), args.runs)
+                scratch_ms = median_ms(lambda: docx_from_scratch(form), args.runs)
+            print(f"{label:24} {pdf_ms:9.1f} {docx_ms:9.1f} {scratch_ms:22.1f}")
+
+        form = sample_form(True)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            paths = generator.generate(form, ['pdf', 'docx'])
+        both_ms = (time.perf_counter() - start) * 1000
+        print(f"\nPDF + DOCX from one document model: {both_ms:.1f} ms "
+              f"(model build {median_ms_model(form):.2f} ms)")
+        for path in paths.values():
+            os.remove(path)
+
+
+def median_ms_model(form, runs=50):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        build_document(form)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+if __name__ == '__main__':
+    main()
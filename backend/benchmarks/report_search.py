@@ -0,0 +1,103 @@
+"""
+Report full-text search benchmark
+
+Indexes synthetic reports (every field filled with varied Vastu and
+astrology text) into a scratch client database and times typical searches:
+a phrase, a phrase that never occurs, common words, a prefix, a
+field-restricted search, each on the first page and on page 50. Run from
+the backend directory:
+
+    python benchmarks/report_search.py --reports 100000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from utils.client_store import ClientStore  # noqa: E402
+from utils.report_model import SECTION_LAYOUT  # noqa: E402
+from utils.report_search import ReportSearchIndex  # noqa: E402
+from utils.storage_backends import new_report_id  # noqa: E402
+
+DIRECTIONS = ['North', 'South', 'East', 'West', 'North-East', 'North-West', 'South-East', 'South-West']
+ROOMS = ['toilet', 'kitchen', 'bedroom', 'entrance', 'staircase', 'locker', 'temple', 'store room', 'balcony']
+OBJECTS = ['plants', 'mirror', 'water fountain', 'red lamp', 'brass pyramid', 'crystal', 'laughing buddha',
+           'wind chime', 'copper strip', 'salt bowl']
+PLANETS = ['Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn', 'Rahu', 'Ketu']
+
+QUERIES = (
+    ('phrase', '"south-west toilet" crystal', None),
+    # Worst case: a phrase of very common words that never occurs
+    ('no-match phrase', '"toilet south-west"', None),
+    ('common words', 'kitchen north', None),
+    ('prefix', 'laugh* buddha', None),
+    ('field filter', 'toilet', ['whatToPlace', 'vastuAnalysis']),
+)
+
+
+def field_text(rng):
+    lines = []
+    for _ in range(rng.randint(1, 4)):
+        if rng.random() < 0.05:
+            lines.append(f"Remove {rng.choice(OBJECTS)} from the {rng.choice(DIRECTIONS)} {rng.choice(ROOMS)}")
+            continue
+        lines.append(f"{rng.choice(ROOMS).capitalize()} in the {rng.choice(DIRECTIONS)} zone, "
+                     f"place {rng.choice(OBJECTS)} and avoid {rng.choice(OBJECTS)} ({rng.choice(PLANETS)})")
+    return '\n'.join(lines)
+
+
+def sample_form(rng, number):
+    form = {'name': f'Client {number}', 'dateOfBirth': f'19{rng.randint(50, 99)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}',
+            'placeOfBirth': rng.choice(['Pune', 'Delhi', 'Mumbai', 'Chennai'])}
+    for key, _, fields in SECTION_LAYOUT:
+        if key == 'about':
+            continue
+        for field, _ in fields:
+            form[field] = field_text(rng)
+    for prefix in ('mahadasha', 'antardasha', 'pratyantardasha'):
+        form[f'{prefix}_planet'] = rng.choice(PLANETS)
+    return form
+
+
+def median_ms(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark full-text report search')
+    parser.add_argument('--reports', type=int, default=100000)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as scratch:
+        index = ReportSearchIndex(ClientStore(os.path.join(scratch, 'clients.db')))
+
+        start = time.perf_counter()
+        for number in range(args.reports):
+            index.index_report(new_report_id('pdf'), sample_form(rng, number), 'pdf')
+        elapsed = time.perf_counter() - start
+        print(f'Indexed {args.reports} reports in {elapsed:.1f} s '
+              f'({elapsed / args.reports * 1000:.2f} ms per report, incremental)\n')
+
+        print(f"{'query':16} {'page 1 ms':>10} {'page 50 ms':>11}")
+        for label, text, fields in QUERIES:
+            first = median_ms(lambda: index.search(text, fields=fields), args.runs)
+            deep = median_ms(lambda: index.search(text, fields=fields, offset=49 * 20), args.runs)
+            print(f"{label:16} {first:10.1f} {deep:11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Cold-start budget check for the API process
+
+Imports app.py in fresh interpreters, reports the median import time and
+exits non-zero when it exceeds the budget, when a heavy rendering library
+is loaded at import time or when the import creates files (report
+directories, the client database) in its working directory. Runs as part
+of the test suite (tests/test_startup_budget.py), or directly:
+
+    python benchmarks/startup_budget.py --budget-ms 400
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must only be imported by the endpoints that need them
+HEAVY_MODULES = ['reportlab', 'docx', 'openpyxl', 'PyPDF2', 'PIL', 'numpy', 'pdf2image', 'boto3']
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({'ms': elapsed, 'modules': [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def measure(runs):
+    """
+    Returns:
+        tuple: (import times in ms, heavy modules loaded, files created in the working directory)
+    """
+    samples = []
+    loaded = set()
+    created = set()
+    # Storage locations come from the environment; the defaults are relative
+    env = {key: value for key, value in os.environ.items()
+           if key not in ('CLIENT_DB_PATH', 'REPORT_STORAGE_ROOT')}
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [BACKEND_DIR, env.get('PYTHONPATH')]))
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as cwd:
+            output = subprocess.run(
+                [sys.executable, '-c', PROBE],
+                cwd=cwd,
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True
+            ).stdout
+            created.update(os.listdir(cwd))
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result['ms'])
+        loaded.update(result['modules'])
+    return samples, sorted(loaded), sorted(created)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check app.py import time against a budget')
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('STARTUP_BUDGET_MS', '400')))
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    samples, loaded, created = measure(args.runs)
+    median = statistics.median(samples)
+
+    print(f"app import time: median {median:.1f} ms, min {min(samples):.1f} ms, "
+          f"max {max(samples):.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(loaded)}")
+        failed = True
+    if created:
+        print(f"FAIL: import created files in the working directory: {', '.join(created)}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"FAIL: import time over budget by {median - args.budget_ms:.1f} ms")
+        failed = True
+
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
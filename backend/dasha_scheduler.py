@@ -0,0 +1,88 @@
+"""
+Dasha rollover scheduler
+
+Runs beside the web server, from the same directory (it shares the
+client database, report store and retention index). A stored client is
+scheduled by /api/clients/<id>/generate-report when their report shows a
+pratyantardasha end date. Shortly before that date the scheduler moves
+each client to their next period, following the Vimshottari sequence from
+the form's mahadasha, antardasha and pratyantardasha planets, and
+regenerates the report, which then appears in /api/clients/<id>/reports,
+the client's versions and search; or it marks the report stale when the
+form lacks those planets. Regeneration runs at low CPU priority, in small
+batches and under a renders-per-minute cap, so it never competes with
+interactive traffic.
+
+    python -m backend.dasha_scheduler
+    python backend/dasha_scheduler.py --once      # e.g. from cron
+    python backend/dasha_scheduler.py --status
+"""
+
+import argparse
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from utils.client_store import ClientStore  # noqa: E402
+from utils.dasha_schedule import (  # noqa: E402
+    ClientScheduleStore, DashaRolloverScheduler, DASHA_REGEN_LEAD_HOURS,
+    DASHA_REGEN_BATCH_SIZE, DASHA_REGEN_MAX_PER_MINUTE, DASHA_REGEN_WORKERS
+)
+from utils.report_history import ReportHistory  # noqa: E402
+from utils.report_records import ReportRecords  # noqa: E402
+from utils.report_search import ReportSearchIndex  # noqa: E402
+from utils.storage_backends import create_report_store  # noqa: E402
+from utils.storage_manager import (  # noqa: E402
+    ReportStorageManager, REPORT_STORAGE_MAX_BYTES, REPORT_STORAGE_MAX_AGE_SECONDS
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Regenerate reports before each client\'s pratyantardasha ends')
+    parser.add_argument('--reports-dir', default=os.getenv("REPORT_STORAGE_ROOT", "generated_reports"),
+                        help='Report store root (local backend; defaults to REPORT_STORAGE_ROOT)')
+    parser.add_argument('--lead-hours', type=float, default=DASHA_REGEN_LEAD_HOURS)
+    parser.add_argument('--batch-size', type=int, default=DASHA_REGEN_BATCH_SIZE)
+    parser.add_argument('--max-per-minute', type=float, default=DASHA_REGEN_MAX_PER_MINUTE)
+    parser.add_argument('--workers', type=int, default=DASHA_REGEN_WORKERS)
+    parser.add_argument('--nice', type=int, default=10, help='CPU priority increment for the scheduler and workers')
+    parser.add_argument('--once', action='store_true', help='Regenerate what is due now, then exit')
+    parser.add_argument('--status', action='store_true', help='Print client counts by status and exit')
+    args = parser.parse_args(argv)
+
+    clients = ClientStore()
+    store = ClientScheduleStore(clients)
+    if args.status:
+        for status, count in sorted(store.status_counts().items()):
+            print(f"{status:12} {count}")
+        return 0
+
+    if args.nice and hasattr(os, 'nice'):
+        os.nice(args.nice)  # inherited by the worker processes
+
+    # Registers its reports in the web app's retention index; eviction stays with the app's janitor
+    storage = ReportStorageManager(args.reports_dir, REPORT_STORAGE_MAX_BYTES, REPORT_STORAGE_MAX_AGE_SECONDS,
+                                   run_janitor=False)
+    records = ReportRecords(create_report_store(args.reports_dir), storage, clients, ReportHistory(clients),
+                            ReportSearchIndex(clients))
+    storage.on_evict = records.evicted
+
+    scheduler = DashaRolloverScheduler(
+        store, records, lead_hours=args.lead_hours,
+        batch_size=max(1, args.batch_size), max_per_minute=args.max_per_minute, workers=max(1, args.workers),
+        staging_dir=os.path.join(args.reports_dir, '.rendering')
+    )
+    try:
+        stats = scheduler.run(once=args.once)
+    except KeyboardInterrupt:
+        stats = scheduler.stats
+    print(f"Regenerated {stats['regenerated']}, marked stale {stats['stale']}, failed {stats['failed']}, "
+          f"removed {stats['removed']}")
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
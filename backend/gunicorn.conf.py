@@ -0,0 +1,27 @@
+# Gunicorn configuration
+# Usage: gunicorn -c gunicorn.conf.py app:app
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5001')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+# Threaded workers: heavy endpoints are capped by per-workload bulkheads
+# (utils/bulkheads.py), so spare threads stay free for health checks and lookups
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "16"))
+
+# Each worker keeps its own pool of report render processes for bulk zips
+# (BULK_REPORT_WORKERS, default 2), so a host runs up to workers x
+# BULK_REPORT_WORKERS renderers; keep that product near the CPU count
+
+# Load the app once in the master and fork workers from it, so the warmed-up
+# libraries and tables below are shared copy-on-write between workers
+preload_app = True
+
+
+def when_ready(server):
+    """Runs in the master after the app is loaded and before workers fork"""
+    from utils.warmup import warmup
+    warmup()
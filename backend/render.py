@@ -0,0 +1,210 @@
+"""
+Offline bulk report renderer
+
+Reads JSONL records of formData (one object per line, or
+{"formData": {...}, "filename": "..."}) from a file or stdin, renders them
+with ReportGenerator on a pool of worker processes and writes the reports
+to a directory. Progress is appended to a progress file as each report
+finishes, so an interrupted run picks up where it stopped: records that
+already rendered are skipped, failed ones are retried. A record repeated
+within the input renders once and is counted as a duplicate.
+
+    python -m backend.render clients.jsonl --out-dir month_end --workers 8
+    cat clients.jsonl | python backend/render.py - --out-dir month_end --format docx
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from utils.bulk_reports import iter_bulk_entries, render_report  # noqa: E402
+
+EXTENSIONS = {'pdf': 'pdf', 'docx': 'docx'}
+# Failures listed in the summary
+_MAX_LISTED_FAILURES = 20
+
+
+def record_key(form_data, filename):
+    """Content hash identifying a record across runs, independent of its line number"""
+    payload = json.dumps({'formData': form_data, 'filename': filename}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def load_progress(progress_path):
+    """Keys of records rendered successfully by previous runs"""
+    done = set()
+    if not os.path.exists(progress_path):
+        return done
+    with open(progress_path, encoding='utf-8') as progress:
+        for line in progress:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # partially written last line of an interrupted run
+            if entry.get('status') == 'ok':
+                done.add(entry['key'])
+    return done
+
+
+def _final_path(out_dir, path, filename, extension):
+    """Move a rendered report out of staging, under the requested filename if any, never overwriting"""
+    if not filename:
+        target = os.path.join(out_dir, os.path.basename(path))
+        shutil.move(path, target)
+        return target
+    base = os.path.basename(str(filename))
+    target = os.path.join(out_dir, f"{base}.{extension}")
+    suffix = 1
+    while os.path.exists(target):
+        suffix += 1
+        target = os.path.join(out_dir, f"{base}_{suffix}.{extension}")
+    shutil.move(path, target)
+    return target
+
+
+def _ignore_interrupt():
+    # Ctrl+C is handled by the parent, which cancels outstanding work
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def new_stats():
+    return {'read': 0, 'resumed': 0, 'duplicates': 0, 'rendered': 0, 'failed': 0, 'failures': []}
+
+
+def render_all(entries, out_dir, report_type, workers, progress_path, stats):
+    """
+    Render entries on a process pool, appending each outcome to the progress file
+
+    Args:
+        stats (dict): Counters from new_stats(), updated as reports finish
+    """
+    done_keys = load_progress(progress_path)
+    seen_keys = set()
+
+    # Workers render into a staging directory; a report only moves into
+    # out_dir once it is logged, so an interrupted run leaves no strays
+    staging_dir = os.path.join(out_dir, '.rendering')
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+
+    def record_failure(line, error):
+        stats['failed'] += 1
+        if len(stats['failures']) < _MAX_LISTED_FAILURES:
+            stats['failures'].append(f"record {line}: {error}")
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_ignore_interrupt)
+    window = workers * 2
+    pending = {}
+    entries = enumerate(entries, 1)
+    exhausted = False
+
+    with open(progress_path, 'a', encoding='utf-8') as progress:
+        def log(key, line, status, **details):
+            progress.write(json.dumps({'key': key, 'line': line, 'status': status, **details}) + '\n')
+            progress.flush()
+
+        try:
+            while True:
+                # Bounded number of renders in flight: input is read lazily
+                while not exhausted and len(pending) < window:
+                    try:
+                        line, (form_data, filename, error) = next(entries)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    stats['read'] += 1
+                    if error:
+                        record_failure(line, error)
+                        continue
+                    key = record_key(form_data, filename)
+                    if key in done_keys:
+                        stats['resumed'] += 1
+                        continue
+                    if key in seen_keys:
+                        stats['duplicates'] += 1  # repeated in the input: renders once
+                        continue
+                    seen_keys.add(key)
+                    future = pool.submit(render_report, line, form_data, report_type, staging_dir)
+                    pending[future] = (key, filename)
+
+                if not pending:
+                    break
+
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    key, filename = pending.pop(future)
+                    try:
+                        line, path, error = future.result()
+                    except BrokenProcessPool:
+                        raise RuntimeError('A render worker crashed; rerun to resume')
+
+                    if error:
+                        record_failure(line, error)
+                        log(key, line, 'failed', error=error)
+                        continue
+
+                    path = _final_path(out_dir, path, filename, EXTENSIONS[report_type])
+                    stats['rendered'] += 1
+                    log(key, line, 'ok', file=os.path.basename(path))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def print_summary(stats, elapsed, interrupted=False):
+    rate = stats['rendered'] / elapsed if elapsed > 0 else 0.0
+    print(f"{'Interrupted' if interrupted else 'Finished'} after {elapsed:.1f} s")
+    print(f"  records read:     {stats['read']}")
+    print(f"  already rendered: {stats['resumed']} (resumed from the progress file)")
+    print(f"  duplicates:       {stats['duplicates']}")
+    print(f"  rendered:         {stats['rendered']} ({rate:.1f} reports/s)")
+    print(f"  failed:           {stats['failed']}")
+    for failure in stats['failures']:
+        print(f"    {failure}")
+    if stats['failed'] > len(stats['failures']):
+        print(f"    ... and {stats['failed'] - len(stats['failures'])} more")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render Destiny Reports from JSONL form data without the web server')
+    parser.add_argument('input', nargs='?', default='-', help="JSONL file of formData records, or '-' for stdin")
+    parser.add_argument('--out-dir', default='rendered_reports', help='Directory for the rendered reports')
+    parser.add_argument('--format', choices=sorted(EXTENSIONS), default='pdf', help='Report format')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Worker processes')
+    parser.add_argument('--progress-file', help='Progress log used to resume (default: <out-dir>/.render_progress.jsonl)')
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    progress_path = args.progress_file or os.path.join(args.out_dir, '.render_progress.jsonl')
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    stats = new_stats()
+    start = time.perf_counter()
+    try:
+        render_all(iter_bulk_entries(source), args.out_dir, args.format, max(1, args.workers), progress_path, stats)
+    except KeyboardInterrupt:
+        print_summary(stats, time.perf_counter() - start, interrupted=True)
+        print(f"Progress saved to {progress_path}; rerun the same command to resume")
+        return 130
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    print_summary(stats, time.perf_counter() - start)
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
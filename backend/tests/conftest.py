@@ -0,0 +1,35 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+# Tests import the backend the way app.py does (from utils...)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# app.py and utils read these at import time: keep the app's storage in a
+# scratch directory and give it a known API key
+SCRATCH_DIR = tempfile.mkdtemp(prefix='backend-tests-')
+atexit.register(shutil.rmtree, SCRATCH_DIR, True)
+API_KEY = 'test-key'
+os.environ.update({
+    'CLIENT_DB_PATH': os.path.join(SCRATCH_DIR, 'clients.db'),
+    'REPORT_STORAGE_ROOT': os.path.join(SCRATCH_DIR, 'reports'),
+    'API_KEYS': API_KEY,
+})
+
+
+@pytest.fixture(scope='session')
+def backend_app():
+    from app import app
+    return app
+
+
+@pytest.fixture
+def api(backend_app):
+    """Test client for the Flask app"""
+    return backend_app.test_client()
@@ -0,0 +1,91 @@
+import pytest
+from flask import Flask
+
+from utils import admission
+from utils.admission import TokenBucketRegistry, admission_controlled, client_key
+
+
+@pytest.fixture
+def buckets(monkeypatch):
+    # Room for one 'render' request (48MB base) per client, refilling slowly
+    registry = TokenBucketRegistry(capacity=60, refill_per_second=2, max_clients=10)
+    monkeypatch.setattr(admission, '_client_buckets', registry)
+    monkeypatch.setattr(admission, 'ADMISSION_ENABLED', True)
+    monkeypatch.setattr(admission, 'current_rss_mb', lambda: None)
+    return registry
+
+
+@pytest.fixture
+def client(buckets):
+    app = Flask(__name__)
+
+    @app.route('/render', methods=['POST'])
+    @admission_controlled('render')
+    def render():
+        return 'rendered'
+
+    return app.test_client()
+
+
+def post(client, forwarded_for):
+    return client.post('/render', headers={'X-Forwarded-For': forwarded_for}, environ_base={'REMOTE_ADDR': '10.0.0.1'})
+
+
+def test_empty_bucket_is_throttled_with_429(client):
+    assert post(client, '203.0.113.7').status_code == 200
+
+    response = post(client, '203.0.113.7')
+    assert response.status_code == 429
+    # 48MB needed, 12MB left, 2MB/s refill
+    assert response.headers['Retry-After'] == '18'
+    assert response.get_json()['estimatedCostMb'] == 48
+
+    assert post(client, '198.51.100.2').status_code == 200  # another client's own bucket
+
+
+def test_spoofed_forwarded_for_does_not_get_a_fresh_bucket(client):
+    assert post(client, 'spoof-1, 203.0.113.7').status_code == 200
+    assert post(client, 'spoof-2, 203.0.113.7').status_code == 429
+
+
+def test_shedding_does_not_spend_tokens(client, buckets, monkeypatch):
+    monkeypatch.setattr(admission, 'MAX_QUEUE_DEPTH', 0)
+    response = post(client, '203.0.113.7')
+    assert response.status_code == 503
+    assert 'Retry-After' in response.headers
+
+    monkeypatch.setattr(admission, 'MAX_QUEUE_DEPTH', 4)
+    assert post(client, '203.0.113.7').status_code == 200
+
+
+@pytest.mark.parametrize('hops, headers, expected', [
+    (1, ['spoof, 203.0.113.7'], '203.0.113.7'),
+    (2, ['spoof, 198.51.100.2, 203.0.113.7'], '198.51.100.2'),
+    (2, ['spoof, 198.51.100.2', '203.0.113.7'], '198.51.100.2'),  # one header line per proxy
+    (2, ['203.0.113.7'], '10.0.0.1'),  # fewer hops than trusted proxies
+    (0, ['spoof'], '10.0.0.1'),
+    (1, [], '10.0.0.1'),
+])
+def test_client_key_takes_the_outermost_trusted_hop(monkeypatch, hops, headers, expected):
+    monkeypatch.setattr(admission, 'TRUSTED_PROXY_HOPS', hops)
+    app = Flask(__name__)
+    with app.test_request_context(headers=[('X-Forwarded-For', value) for value in headers],
+                                  environ_base={'REMOTE_ADDR': '10.0.0.1'}):
+        assert client_key() == expected
+
+
+def test_registry_refills_and_forgets_least_recent_clients(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(admission.time, 'monotonic', lambda: now[0])
+    registry = TokenBucketRegistry(capacity=10, refill_per_second=1, max_clients=2)
+
+    assert registry.take('a', 8) == 0
+    assert registry.take('a', 8) == 6
+    now[0] += 6
+    assert registry.take('a', 8) == 0
+    assert registry.take('a', 50) == 10  # capped at the burst size
+
+    registry.take('b', 1)
+    registry.take('c', 1)
+    assert len(registry) == 2
+    assert registry.take('a', 10) == 0  # 'a' was forgotten, so it starts full again
@@ -0,0 +1,82 @@
+import io
+import json
+import os
+import zipfile
+
+import pytest
+
+from utils import bulk_reports
+from utils.bulk_reports import iter_bulk_entries, stream_reports_zip
+
+
+def fake_render(index, form_data, report_type='pdf', output_dir='generated_reports'):
+    if form_data.get('crash'):
+        os._exit(1)  # a renderer killed mid-report (e.g. by the OOM killer)
+    if form_data.get('fail'):
+        return index, None, 'Invalid house map'
+    path = os.path.join(form_data['dir'], f"{form_data['name']}.pdf")
+    with open(path, 'wb') as f:
+        f.write(form_data['name'].encode())
+    return index, path, None
+
+
+@pytest.fixture(autouse=True)
+def report_pool(monkeypatch):
+    # A fresh pool per test; workers are forked, so they see the patched renderer
+    monkeypatch.setattr(bulk_reports, 'render_report', fake_render)
+    monkeypatch.setattr(bulk_reports, '_pool', None)
+    yield
+    if bulk_reports._pool is not None:
+        bulk_reports._pool.shutdown()
+
+
+def build_zip(entries, **kwargs):
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(stream_reports_zip(entries, **kwargs))))
+    manifest = json.loads(archive.read('manifest.json'))
+    return archive, manifest
+
+
+def forms(tmp_path, *names, **extra):
+    return [dict({'name': name, 'dir': str(tmp_path)}, **extra) for name in names]
+
+
+def test_zip_holds_reports_in_input_order_with_manifest(tmp_path):
+    body = [{'formData': form, 'filename': f'client_{form["name"]}'} for form in forms(tmp_path, 'a', 'b')]
+    body.insert(1, 'not a form')
+    body.append(dict(forms(tmp_path, 'c')[0], fail=True))
+
+    archive, manifest = build_zip(iter_bulk_entries(body), max_items=10)
+
+    assert archive.namelist()[-1] == 'manifest.json'
+    assert sorted(archive.namelist()[:-1]) == ['0001_client_a.pdf', '0003_client_b.pdf']
+    assert archive.read('0003_client_b.pdf') == b'b'
+    assert (manifest['total'], manifest['succeeded'], manifest['failed']) == (4, 2, 2)
+    assert [entry['status'] for entry in manifest['reports']] == ['ok', 'failed', 'ok', 'failed']
+    assert manifest['reports'][3]['error'] == 'Invalid house map'
+
+
+def test_entries_past_the_limit_fail(tmp_path):
+    _, manifest = build_zip(iter_bulk_entries(forms(tmp_path, 'a', 'b', 'c')), max_items=2)
+    assert [entry['status'] for entry in manifest['reports']] == ['ok', 'ok', 'failed']
+
+
+def test_failed_callback_is_recorded_and_the_zip_stays_valid(tmp_path):
+    def on_report(path, form_data):
+        if form_data['name'] == 'a':
+            raise OSError('disk full')
+
+    archive, manifest = build_zip(iter_bulk_entries(forms(tmp_path, 'a', 'b')), on_report=on_report)
+
+    first, second = manifest['reports']
+    assert first['status'] == 'failed' and 'disk full' in first['error']
+    assert second['status'] == 'ok'
+    assert not (tmp_path / 'a.pdf').exists()
+    assert archive.testzip() is None
+
+
+def test_crashed_worker_fails_its_entry_and_the_pool_is_rebuilt(tmp_path):
+    _, manifest = build_zip(iter_bulk_entries(forms(tmp_path, 'a', crash=True)))
+    assert manifest['reports'][0]['error'] == 'Report worker crashed'
+
+    _, manifest = build_zip(iter_bulk_entries(forms(tmp_path, 'b')))
+    assert manifest['reports'][0]['status'] == 'ok'
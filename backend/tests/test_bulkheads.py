@@ -0,0 +1,86 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flask import Flask
+
+from utils import bulkheads
+from utils.bulkheads import Bulkhead, PoolSaturated, hold_while_streaming, isolated
+
+
+def wait_until(predicate):
+    deadline = time.monotonic() + 5
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    bulkhead = Bulkhead('test', max_concurrent=1, max_queue=1, queue_timeout=0.2, retry_after=7)
+    monkeypatch.setitem(bulkheads.BULKHEADS, 'test', bulkhead)
+    return bulkhead
+
+
+@pytest.fixture
+def client(pool):
+    app = Flask(__name__)
+
+    @app.route('/work')
+    @isolated('test')
+    def work():
+        return 'done'
+
+    @app.route('/stream')
+    def stream():
+        return app.response_class(hold_while_streaming('test', lambda: iter(['a', 'b'])))
+
+    return app.test_client()
+
+
+def test_saturated_pool_answers_503_with_retry_after(client, pool):
+    release = pool.acquire()
+    try:
+        response = client.get('/work')  # waits out the queue timeout
+    finally:
+        release()
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '7'
+    assert response.get_json()['pool'] == 'test'
+    assert client.get('/work').data == b'done'
+    stats = pool.stats()
+    assert (stats['timed_out'], stats['completed'], stats['active']) == (1, 2, 0)
+
+
+def test_full_queue_is_rejected_without_waiting(pool):
+    release = pool.acquire()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        queued = executor.submit(pool.acquire)
+        wait_until(lambda: pool.waiting == 1)
+        with pytest.raises(PoolSaturated):
+            pool.acquire()
+        release()
+        queued.result(5)()  # the queued request got the freed slot
+
+    assert pool.stats()['rejected'] == 1
+    assert pool.stats()['timed_out'] == 0
+
+
+def test_streamed_body_holds_its_slot_until_closed(client, pool):
+    response = client.get('/stream')
+    assert pool.stats()['active'] == 1
+    assert client.get('/work').status_code == 503
+
+    assert response.data == b'ab'
+    response.close()
+    assert pool.stats()['active'] == 0
+    assert client.get('/work').status_code == 200
+
+
+def test_release_is_idempotent(pool):
+    release = pool.acquire()
+    release()
+    release()
+    assert pool.stats()['active'] == 0
+    pool.acquire()()
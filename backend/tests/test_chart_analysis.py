@@ -0,0 +1,64 @@
+import pytest
+
+from utils.astro_vastu_logic import get_planet_strength_in_sign, get_recommendation
+from utils.chart_analysis import analyze_chart, parse_chart
+from utils.core_model import DIRECTION_NAMES, PLANET_NAMES
+from utils.vastu_directions import VASTU_DIRECTIONS
+
+FULL_CHART = {
+    'Sun': 'Aries', 'Moon': 'Taurus', 'Mars': 'Cancer', 'Mercury': 'Virgo', 'Jupiter': 'Cancer',
+    'Venus': 'Virgo', 'Saturn': 'Libra', 'Rahu': 'Gemini', 'Ketu': 'Sagittarius'
+}
+
+
+@pytest.mark.parametrize('body', [
+    {'chart': FULL_CHART, 'limit': True},
+    {'chart': FULL_CHART, 'limit': 0},
+    {'chart': [{'planet': ['Sun'], 'sign': 'Aries'}]},
+    {'chart': [{'planet': {'name': 'Sun'}, 'sign': 'Aries'}]},
+    {'chart': [{'sign': 'Aries'}]},
+    {'chart': {'Sun': ['Aries']}},
+    {'chart': 'Sun in Aries'},
+])
+def test_malformed_requests_are_rejected(api, body):
+    response = api.post('/api/chart-analysis', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def expected_ranking(chart, action, limit):
+    """Rank planet/direction pairs straight from the knowledge tables"""
+    weights = {'exalted': 1.0, 'own_sign': 0.75, 'debilitated': -1.0, 'neutral': 0.0}
+    scored = []
+    for planet_index, planet in enumerate(PLANET_NAMES):
+        weight = weights[get_planet_strength_in_sign(planet, chart[planet])]
+        for direction_index, direction in enumerate(DIRECTION_NAMES):
+            planets = VASTU_DIRECTIONS[direction]['planets']
+            if planet in planets:
+                score = weight / len(planets) * (1 if action == 'place' else -1)
+                if score > 0:
+                    scored.append((-score, planet_index, direction_index, planet, direction, round(score, 4)))
+    return [(planet, direction, score) for *_, planet, direction, score in sorted(scored)][:limit]
+
+
+@pytest.mark.parametrize('limit', [3, 100])
+def test_recommendations_are_ranked_by_strength_and_direction_share(limit):
+    codes, errors = parse_chart([{'planet': planet, 'sign': sign} for planet, sign in FULL_CHART.items()])
+    assert errors == []
+
+    analysis = analyze_chart(codes, limit)
+
+    for action in ('place', 'remove'):
+        ranked = analysis[f'{action}_recommendations']
+        assert [(r['planet'], r['direction'], r['score']) for r in ranked] == \
+            expected_ranking(FULL_CHART, action, limit)
+        assert all(r['recommendation'] == get_recommendation(r['planet'], r['direction'], action) for r in ranked)
+    # The chart has exalted, own-sign and debilitated planets
+    assert analysis['place_recommendations'] and analysis['remove_recommendations']
+    assert {p['planet']: p['strength'] for p in analysis['planets']}['Sun'] == 'exalted'
+
+
+def test_incomplete_chart_lists_missing_planets(api):
+    response = api.post('/api/chart-analysis', json={'chart': {'Sun': 'Aries'}})
+    assert response.status_code == 400
+    assert 'Moon' in response.get_json()['details'][0]
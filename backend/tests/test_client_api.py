@@ -0,0 +1,53 @@
+import pytest
+
+from conftest import API_KEY
+from utils import api_auth
+
+AUTH = {'X-API-Key': API_KEY}
+FORM = {'name': 'Asha Rao', 'dateOfBirth': '1988-04-02', 'placeOfBirth': 'Pune'}
+
+
+def create(api):
+    return api.post('/api/clients', json={'formData': FORM}, headers=AUTH).get_json()['client_id']
+
+
+@pytest.mark.parametrize('path', [
+    '/api/clients?name=asha',
+    '/api/clients/' + '0' * 32,
+    '/api/clients/' + '0' * 32 + '/versions',
+    '/api/search/reports?q=pune',
+    '/api/reports/' + '0' * 32 + '.pdf',
+])
+def test_client_data_needs_the_api_key(api, path):
+    assert api.get(path).status_code == 401
+    assert api.get(path, headers={'X-API-Key': 'wrong'}).status_code == 401
+    assert api.get(path, headers={'Authorization': f'Bearer {API_KEY}'}).status_code != 401
+
+
+def test_client_data_is_disabled_without_keys(api, monkeypatch):
+    monkeypatch.setattr(api_auth, 'API_KEYS', ())
+    assert api.get('/api/clients', headers=AUTH).status_code == 503
+    assert api.get('/api/health').status_code == 200
+
+
+def test_put_with_a_stale_revision_conflicts(api):
+    client_id = create(api)
+    read = api.get(f'/api/clients/{client_id}', headers=AUTH)
+    revision = read.get_json()['client']['revision']
+    assert read.headers['ETag'] == f'"{revision}"'
+
+    first = api.put(f'/api/clients/{client_id}', headers=dict(AUTH, **{'If-Match': f'"{revision}"'}),
+                    json={'formData': dict(FORM, placeOfBirth='Mumbai')})
+    assert first.status_code == 200
+    assert first.get_json()['revision'] != revision
+
+    # A second editor still holding the old revision, sent in the body
+    second = api.put(f'/api/clients/{client_id}', headers=AUTH,
+                     json={'formData': dict(FORM, placeOfBirth='Delhi'), 'revision': revision})
+    assert second.status_code == 409
+    assert second.get_json()['revision'] == first.get_json()['revision']
+    assert api.get(f'/api/clients/{client_id}', headers=AUTH).get_json()['client']['form_data']['placeOfBirth'] == \
+        'Mumbai'
+
+    # Without a revision the update is unconditional
+    assert api.put(f'/api/clients/{client_id}', headers=AUTH, json={'formData': FORM}).status_code == 200
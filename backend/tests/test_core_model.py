@@ -0,0 +1,85 @@
+import pytest
+
+from utils.astro_vastu_logic import PLANET_RECORDS, PLANET_ZODIAC_CLASSICAL, STRENGTH_TABLE
+from utils.core_model import (
+    DIRECTION_NAMES,
+    DIRECTION_RECORDS,
+    PLANET_NAMES,
+    SIGN_COUNT,
+    SIGN_NAMES,
+    STRENGTH_NAMES,
+    Direction,
+    Planet,
+    Sign,
+    Strength,
+    chart_strengths,
+    direction_from_name,
+    encode_chart,
+    names_from_mask,
+    planet_from_name,
+    sign_from_name,
+)
+from utils.vastu_directions import VASTU_DIRECTIONS
+
+
+@pytest.mark.parametrize('enum, names, from_name', [
+    (Planet, PLANET_NAMES, planet_from_name),
+    (Sign, SIGN_NAMES, sign_from_name),
+    (Direction, DIRECTION_NAMES, direction_from_name),
+])
+def test_names_round_trip_through_enums(enum, names, from_name):
+    assert len(names) == len(enum)
+    for member in enum:
+        assert from_name(names[member]) is member
+    assert from_name('Pluto') is None
+    assert from_name(['Sun']) is None  # unhashable JSON input
+
+
+def test_directions_follow_the_table_numbering():
+    assert set(DIRECTION_NAMES) == set(VASTU_DIRECTIONS)
+    for name, info in VASTU_DIRECTIONS.items():
+        assert direction_from_name(name) == info['number'] - 1
+
+
+def test_masks_round_trip_to_the_tables():
+    for record in DIRECTION_RECORDS:
+        assert set(names_from_mask(record.planets_mask, PLANET_NAMES)) == \
+            set(VASTU_DIRECTIONS[DIRECTION_NAMES[record.direction]]['planets'])
+
+    for record in PLANET_RECORDS:
+        name = PLANET_NAMES[record.planet]
+        info = PLANET_ZODIAC_CLASSICAL[name]
+        assert set(names_from_mask(record.ruled_signs_mask, SIGN_NAMES)) == set(info['ruled_signs'])
+        assert SIGN_NAMES[record.exaltation] == info['exaltation_sign']
+        assert SIGN_NAMES[record.debilitation] == info['debilitation_sign']
+        assert set(names_from_mask(record.directions_mask, DIRECTION_NAMES)) == {
+            direction for direction, direction_info in VASTU_DIRECTIONS.items() if name in direction_info['planets']
+        }
+
+
+def test_strength_table_matches_the_classical_rules():
+    for planet in Planet:
+        info = PLANET_ZODIAC_CLASSICAL[PLANET_NAMES[planet]]
+        for sign in Sign:
+            name = SIGN_NAMES[sign]
+            if name == info['exaltation_sign']:
+                expected = 'exalted'
+            elif name in info['ruled_signs']:
+                expected = 'own_sign'
+            elif name == info['debilitation_sign']:
+                expected = 'debilitated'
+            else:
+                expected = 'neutral'
+            assert STRENGTH_NAMES[STRENGTH_TABLE[planet * SIGN_COUNT + sign]] == expected, (planet, sign)
+
+
+def test_encode_chart_keeps_known_entries_and_reports_the_rest():
+    codes, errors = encode_chart({'Sun': 'Aries', 'Moon': 'Leo', 'Pluto': 'Aries', 'Mars': 'Ophiuchus'})
+
+    assert codes[Planet.SUN] == Sign.ARIES and codes[Planet.MOON] == Sign.LEO
+    assert codes[Planet.MARS] == 255 and codes[Planet.KETU] == 255
+    assert errors == ['Unknown planet "Pluto"', 'Unknown sign "Ophiuchus" for Mars']
+
+    strengths = chart_strengths(STRENGTH_TABLE, codes)
+    assert strengths[Planet.SUN] == Strength.EXALTED  # Sun is exalted in Aries
+    assert strengths[Planet.MARS] == 255
@@ -0,0 +1,149 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils import dasha_schedule
+from utils.client_store import ClientStore
+from utils.dasha_schedule import ClientScheduleStore, DashaRolloverScheduler, advance_pratyantardasha
+
+FORM = {
+    'name': 'Ravi Kumar',
+    'mahadasha_planet': 'Sun',
+    'mahadasha_source': '1, 9',
+    'mahadasha_nl': 'Venus',
+    'antardasha_planet': 'Venus',
+    'pratyantardasha_planet': 'Venus',
+    'pratyantardasha_source': '2',
+    'pratyantardasha_period_from': '2026-09-01',
+    'pratyantardasha_period_to': '2026-10-20',
+}
+
+
+class Records:
+    """Stands in for ReportRecords; keeps what the scheduler recorded"""
+
+    def __init__(self):
+        self.recorded = []
+
+    def persist(self, path):
+        return path
+
+    def record(self, report_id, form_data, report_type, client_id=None):
+        self.recorded.append((report_id, form_data['pratyantardasha_planet'], client_id))
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    store = ClientScheduleStore(ClientStore(str(tmp_path / 'clients.db')))
+    return DashaRolloverScheduler(store, Records(), lead_hours=24 * 365, retry_base_seconds=60,
+                                  retry_max_seconds=90, staging_dir=str(tmp_path / 'staging'))
+
+
+def schedule(scheduler, form=FORM):
+    client_id = scheduler.clients.save_client(form)
+    scheduler.store.register(form, 'pdf', 'first.pdf', client_id)
+    return client_id
+
+
+def run_due(scheduler, now=None):
+    scheduler.refresh()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return scheduler.run_batch(pool, scheduler.pop_due(now or time.time()))
+
+
+def render_with(monkeypatch, tmp_path, error=None):
+    def render(index, form_data, report_type, output_dir):
+        if error:
+            return index, None, error
+        path = tmp_path / f"{form_data['pratyantardasha_planet']}.pdf"
+        path.write_bytes(b'%PDF')
+        return index, str(path), None
+    monkeypatch.setattr(dasha_schedule, 'render_report', render)
+
+
+def test_next_pratyantardasha_follows_the_vimshottari_sequence():
+    advanced = advance_pratyantardasha(FORM)
+
+    # Sun MD / Venus AD / Sun PD: 6 x 20 x 6 / 120^2 years = 18 days
+    assert advanced['pratyantardasha_planet'] == 'Sun'
+    assert advanced['pratyantardasha_period_from'] == '2026-10-21'
+    assert advanced['pratyantardasha_period_to'] == '2026-11-07'
+    # Sun's details come from the mahadasha level; Venus's source doesn't carry over
+    assert advanced['pratyantardasha_source'] == '1, 9'
+    assert advanced['pratyantardasha_nl'] == 'Venus'
+    assert advanced['antardasha_planet'] == 'Venus'
+
+
+def test_last_pratyantardasha_moves_the_antardasha_and_mahadasha_on():
+    # Ketu is Venus's last antardasha and Mercury is Ketu's last pratyantardasha
+    form = dict(FORM, mahadasha_planet='Venus', antardasha_planet='Ketu', pratyantardasha_planet='Mercury')
+
+    advanced = advance_pratyantardasha(form)
+
+    assert [advanced[f'{level}_planet'] for level in ('mahadasha', 'antardasha', 'pratyantardasha')] == \
+        ['Sun', 'Sun', 'Sun']
+    assert 'mahadasha_source' not in advanced and 'pratyantardasha_source' not in advanced
+    assert advance_pratyantardasha(dict(FORM, antardasha_planet='')) is None
+
+
+def test_register_keeps_client_id_not_form(scheduler):
+    client_id = schedule(scheduler)
+
+    (_, record, _), = scheduler.store.scan()
+    assert record['client_id'] == client_id
+    assert 'form_data' not in record
+    assert not scheduler.store.register({'name': 'No dates'}, 'pdf', 'other.pdf', client_id)
+
+
+def test_scan_resumes_after_the_last_save_seen(scheduler):
+    first = schedule(scheduler)
+    (_, _, cursor), = scheduler.store.scan()
+
+    # Saved right after the scan, within the same clock tick
+    second = schedule(scheduler, dict(FORM, name='Asha'))
+    scheduler.store.register(FORM, 'pdf', 'again.pdf', first)
+
+    assert [(client_id, record['report_id']) for client_id, record, _ in scheduler.store.scan(cursor)] == [
+        (second, 'first.pdf'), (first, 'again.pdf')
+    ]
+
+
+def test_failed_render_retries_with_backoff_then_records(scheduler, monkeypatch, tmp_path):
+    client_id = schedule(scheduler)
+    render_with(monkeypatch, tmp_path, error='renderer down')
+
+    assert run_due(scheduler) == 1
+    assert scheduler.next_due() == pytest.approx(time.time() + 60, abs=5)
+    assert run_due(scheduler) == 0  # not due again yet
+    assert run_due(scheduler, now=time.time() + 61) == 1
+    assert scheduler.next_due() == pytest.approx(time.time() + 90, abs=5)  # doubled, then capped
+
+    render_with(monkeypatch, tmp_path)
+    run_due(scheduler, now=time.time() + 91)
+
+    assert scheduler.records.recorded == [(str(tmp_path / 'Sun.pdf'), 'Sun', client_id)]
+    assert scheduler.clients.get_client(client_id)['form_data']['pratyantardasha_planet'] == 'Sun'
+    assert scheduler.stats == {'regenerated': 1, 'stale': 0, 'failed': 2, 'removed': 0}
+
+    # A success resets the backoff for the client's next period
+    render_with(monkeypatch, tmp_path, error='renderer down')
+    run_due(scheduler)
+    assert scheduler.next_due() == pytest.approx(time.time() + 60, abs=5)
+
+
+def test_forms_without_dasha_planets_are_marked_stale(scheduler):
+    schedule(scheduler, {key: value for key, value in FORM.items() if key != 'mahadasha_planet'})
+
+    assert run_due(scheduler) == 0
+    assert scheduler.stats['stale'] == 1
+    assert scheduler.store.status_counts() == {'stale': 1}
+
+
+def test_deleted_clients_are_unscheduled(scheduler):
+    client_id = schedule(scheduler)
+    scheduler.clients.delete_client(client_id)
+
+    assert run_due(scheduler) == 0
+    assert list(scheduler.store.scan()) == []
+    assert not scheduler.store.register(FORM, 'pdf', 'late.pdf', client_id)
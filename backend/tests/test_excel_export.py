@@ -0,0 +1,57 @@
+from openpyxl import load_workbook
+
+from utils.bulk_reports import iter_bulk_entries
+from utils.excel_export import export_clients_workbook, export_columns
+
+
+def export(tmp_path, body, **kwargs):
+    path = str(tmp_path / 'clients.xlsx')
+    result = export_clients_workbook(iter_bulk_entries(body), path, **kwargs)
+    workbook = load_workbook(path)
+    header, *rows = workbook['Clients'].iter_rows(values_only=True)
+    return result, dict(zip(header, zip(*rows))) if rows else {}, list(workbook['Summary'].iter_rows(values_only=True))
+
+
+def test_cells_hold_the_text_as_typed(tmp_path):
+    _, columns, _ = export(tmp_path, [{'name': 'Asha & Co <Rao>', 'gemstones': 'Ruby "Manik"'}])
+
+    assert columns['Name'] == ('Asha & Co <Rao>',)
+    assert columns['Gemstones'] == ('Ruby "Manik"',)
+
+
+def test_one_row_per_client_and_skipped_entries_are_counted(tmp_path):
+    body = [
+        {'name': 'Asha', 'placeOfBirth': 'Pune', 'mahadasha_planet': 'Sun', 'mahadasha_source': '1, 9'},
+        42,
+        {'formData': {'name': 'Bala'}, 'filename': 'bala'},
+        {'name': 'Chitra'},
+        {'name': 'Dev'},
+    ]
+
+    result, columns, summary = export(tmp_path, body, max_clients=2)
+
+    assert result == {'exported': 2, 'skipped': 3}
+    assert list(columns) == ['#'] + [label for _, label in export_columns()]
+    assert columns['#'] == (1, 2)
+    assert columns['Name'] == ('Asha', 'Bala')
+    assert columns['Place of Birth'] == ('Pune', None)  # empty fields write no cell
+    assert columns['Mahadasha'] == ('Sun(1, 9)', None)
+
+    rows = {row[0]: row[1] for row in summary}
+    assert (rows['Clients exported'], rows['Entries skipped']) == (2, 3)
+    assert rows['Entry 2'] == 'Form data must be an object'
+    assert rows['Entry 4'] == rows['Entry 5'] == 'Export is limited to 2 clients'
+
+
+def test_jsonl_lines_are_exported_as_they_stream(tmp_path):
+    lines = [b'{"name": "Asha"}\n', b'\n', b'{broken\n', b'{"formData": {"name": "Bala"}}\n']
+
+    result, columns, _ = export(tmp_path, lines)
+
+    assert result == {'exported': 2, 'skipped': 1}
+    assert columns['Name'] == ('Asha', 'Bala')
+
+
+def test_formula_like_text_stays_text(tmp_path):
+    _, columns, _ = export(tmp_path, [{'name': '=HYPERLINK("http://example.com")'}])
+    assert columns['Name'] == ('=HYPERLINK("http://example.com")',)
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from utils.astro_vastu_logic import (
+    PLANET_ZODIAC_CLASSICAL,
+    RECOMMENDATION_TABLE,
+    generate_placement_recommendation,
+    generate_removal_recommendation,
+    get_recommendation,
+)
+from utils.vastu_directions import VASTU_DIRECTIONS
+
+GENERATORS = {'place': generate_placement_recommendation, 'remove': generate_removal_recommendation}
+
+
+def test_table_holds_every_planet_direction_and_action():
+    assert len(PLANET_ZODIAC_CLASSICAL) * len(VASTU_DIRECTIONS) * 2 == 288
+    assert set(RECOMMENDATION_TABLE) == {
+        (action, planet, direction)
+        for action in GENERATORS for planet in PLANET_ZODIAC_CLASSICAL for direction in VASTU_DIRECTIONS
+    }
+
+
+@pytest.mark.parametrize('action', sorted(GENERATORS))
+def test_table_matches_per_call_computation(action):
+    for planet in PLANET_ZODIAC_CLASSICAL:
+        for direction in VASTU_DIRECTIONS:
+            assert RECOMMENDATION_TABLE[(action, planet, direction)] == GENERATORS[action](planet, direction), \
+                (planet, direction)
+
+
+def test_unknown_names_are_computed_on_demand():
+    assert get_recommendation('Pluto', 'North', 'place') == generate_placement_recommendation('Pluto', 'North')
+    assert 'error' in get_recommendation('Sun', 'Up', 'remove')
+    with pytest.raises(TypeError):
+        RECOMMENDATION_TABLE[('place', 'Pluto', 'North')] = {}
+
+
+@pytest.mark.parametrize('path, action', [('/api/placement-suggestion', 'place'),
+                                          ('/api/removal-suggestion', 'remove')])
+def test_endpoints_serve_the_table_unchanged(api, path, action):
+    planet, direction = next(iter(PLANET_ZODIAC_CLASSICAL)), next(iter(VASTU_DIRECTIONS))
+    for _ in range(2):
+        response = api.post(path, json={'planet': planet, 'direction': direction})
+        assert response.get_json()['recommendation'] == GENERATORS[action](planet, direction)
+    assert RECOMMENDATION_TABLE[(action, planet, direction)] == GENERATORS[action](planet, direction)
+
+
+def stream(api, placements, **body):
+    response = api.post('/api/batch-recommendations', json=dict(body, placements=placements, stream=True))
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.data.decode().splitlines()]
+
+
+def test_ndjson_reports_errors_per_entry_in_input_order(api):
+    lines = stream(api, [
+        {'planet': 'Sun', 'direction': 'East'},
+        'not an object',
+        {'planet': 'Sun'},
+        {'planet': 'Sun', 'direction': 'East', 'action': 'burn'},
+        {'planet': 'Sun', 'direction': 'Up'},
+        {'planet': 'Sun', 'direction': 'East', 'action': 'remove'},
+        {'planet': 'Sun', 'direction': 'East'},
+    ])
+
+    assert [line['index'] for line in lines] == list(range(7))
+    assert [('error' in line) for line in lines] == [False, True, True, True, True, False, False]
+    assert lines[4]['error'] == 'Direction "Up" not found'
+    assert lines[0]['recommendation'] == lines[6]['recommendation'] == generate_placement_recommendation('Sun', 'East')
+    assert (lines[5]['action'], lines[5]['recommendation']) == \
+        ('remove', generate_removal_recommendation('Sun', 'East'))
+
+
+def test_ndjson_is_chosen_by_the_accept_header(api):
+    response = api.post('/api/batch-recommendations', headers={'Accept': 'application/x-ndjson'},
+                        json={'placements': [{'planet': 'Sun', 'direction': 'East'}]})
+    assert response.mimetype == 'application/x-ndjson'
+    assert json.loads(response.data)['index'] == 0
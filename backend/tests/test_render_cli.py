@@ -0,0 +1,81 @@
+import json
+import os
+
+import pytest
+
+import render
+
+
+def fake_render(index, form_data, report_type='pdf', output_dir='generated_reports'):
+    if form_data.get('fail_until') and not os.path.exists(form_data['fail_until']):
+        return index, None, 'Invalid house map'
+    path = os.path.join(output_dir, f"report_{index}.{report_type}")
+    with open(path, 'w') as f:
+        f.write(form_data['name'])
+    return index, path, None
+
+
+@pytest.fixture(autouse=True)
+def renderer(monkeypatch):
+    # Workers are forked, so they see the patched renderer
+    monkeypatch.setattr(render, 'render_report', fake_render)
+
+
+def run(tmp_path, records):
+    source = tmp_path / 'clients.jsonl'
+    source.write_text(''.join(json.dumps(record) + '\n' for record in records))
+    stats = render.new_stats()
+    render.render_all(render.iter_bulk_entries(open(source)), str(tmp_path / 'out'), 'pdf', 2,
+                      str(tmp_path / 'progress.jsonl'), stats)
+    return stats
+
+
+def test_repeated_records_are_duplicates_not_resumed(tmp_path):
+    (tmp_path / 'out').mkdir()
+    asha = {'formData': {'name': 'Asha'}, 'filename': 'asha'}
+
+    stats = run(tmp_path, [asha, {'name': 'Bala'}, asha])
+
+    assert (stats['rendered'], stats['duplicates'], stats['resumed']) == (2, 1, 0)
+    assert sorted(os.listdir(tmp_path / 'out')) == ['asha.pdf', 'report_2.pdf']
+
+
+def test_rerun_resumes_and_retries_failures(tmp_path, capsys):
+    fixed = tmp_path / 'fixed'
+    source = tmp_path / 'clients.jsonl'
+    records = [{'name': 'Asha'}, {'name': 'Bala', 'fail_until': str(fixed)}, 'not json', {'name': 'Chitra'}]
+    source.write_text(''.join((r if isinstance(r, str) else json.dumps(r)) + '\n' for r in records))
+    argv = [str(source), '--out-dir', str(tmp_path / 'out'), '--workers', '2']
+
+    assert render.main(argv) == 1
+    assert sorted(os.listdir(tmp_path / 'out')) == ['.render_progress.jsonl', 'report_1.pdf', 'report_4.pdf']
+
+    fixed.touch()
+    capsys.readouterr()
+    assert render.main(argv) == 1  # the invalid line still fails
+    summary = capsys.readouterr().out
+    assert 'already rendered: 2' in summary
+    assert 'rendered:         1' in summary
+    assert 'record 3: Invalid JSON line' in summary
+    assert 'report_2.pdf' in os.listdir(tmp_path / 'out')
+    assert not os.path.exists(tmp_path / 'out' / '.rendering')
+
+    progress = [json.loads(line) for line in open(tmp_path / 'out' / '.render_progress.jsonl')]
+    assert sorted((entry['line'], entry['status']) for entry in progress) == [(1, 'ok'), (2, 'failed'), (2, 'ok'),
+                                                                              (4, 'ok')]
+
+
+def test_torn_last_progress_line_is_ignored(tmp_path):
+    progress = tmp_path / 'progress.jsonl'
+    progress.write_text(json.dumps({'key': 'a', 'line': 1, 'status': 'ok'}) + '\n'
+                        + json.dumps({'key': 'b', 'line': 2, 'status': 'failed'}) + '\n{"key": "c", "li')
+    assert render.load_progress(str(progress)) == {'a'}
+
+
+def test_progress_matches_records_by_content_not_line(tmp_path):
+    (tmp_path / 'out').mkdir()
+    run(tmp_path, [{'name': 'Asha'}])
+
+    stats = run(tmp_path, [{'name': 'Bala'}, {'name': 'Asha'}])
+
+    assert (stats['resumed'], stats['rendered']) == (1, 1)
@@ -0,0 +1,105 @@
+import pytest
+
+from utils.client_store import ClientStore
+from utils.report_history import ReportHistory, VersionNotFound, apply_diff, field_diff
+
+from conftest import API_KEY
+
+AUTH = {'X-API-Key': API_KEY}
+IMAGE = 'data:image/png;base64,' + 'iVBORw0KGgo' * 40
+
+
+@pytest.fixture
+def history(tmp_path):
+    return ReportHistory(ClientStore(str(tmp_path / 'clients.db')), keyframe_interval=3, keep_files=2)
+
+
+def forms():
+    """Seven edits of one client: fields change, appear and disappear, and an image comes and goes"""
+    form = {'name': 'Asha', 'placeOfBirth': 'Pune'}
+    yield dict(form)
+    for step in range(1, 7):
+        form['gemstones'] = f'Ruby {step}'
+        if step == 2:
+            form['houseMapImages'] = [IMAGE]
+        if step == 3:
+            del form['placeOfBirth']
+        if step == 5:
+            del form['houseMapImages']
+        yield dict(form)
+
+
+def test_diffs_apply_back_to_the_new_form():
+    old, new = {'a': '1', 'b': '2'}, {'a': '1', 'b': '3', 'c': '4'}
+    diff = field_diff(old, new)
+    assert diff == {'set': {'b': '3', 'c': '4'}, 'unset': []}
+    assert apply_diff(new, field_diff(new, old)) == old
+
+
+def test_every_version_rebuilds_from_its_keyframe(history):
+    client_id = history.store.save_client({'name': 'Asha'})
+    recorded = []
+    for number, form in enumerate(forms(), 1):
+        version, _ = history.record_version(client_id, f'r{number}.pdf', 'pdf', form)
+        assert version == number
+        recorded.append(form)
+
+    conn = history.store.connection()
+    for version, form in enumerate(recorded, 1):
+        rebuilt = history.get_version(client_id, version)['form_data']
+        assert history.store.expand_form(conn, rebuilt) == form
+    # Versions 1, 4 and 7 are keyframes
+    assert history.stats()['keyframes'] == 3
+
+    v4 = history.get_version(client_id, 4)
+    assert v4['changed_fields'] == ['gemstones', 'placeOfBirth']
+    assert v4['diff'] == {'set': {'gemstones': 'Ruby 3'}, 'unset': ['placeOfBirth']}
+    with pytest.raises(VersionNotFound):
+        history.get_version(client_id, 8)
+
+
+def test_only_the_newest_versions_keep_their_file(history):
+    client_id = history.store.save_client({'name': 'Asha'})
+    released = [history.record_version(client_id, f'r{number}.pdf', 'pdf', form)[1]
+                for number, form in enumerate(forms(), 1)]
+
+    assert released[:3] == [[], [], ['r1.pdf']]
+    assert [v['report_id'] for v in history.list_versions(client_id)] == ['r7.pdf', 'r6.pdf'] + [None] * 5
+
+    # A version rendered again keeps its new file until it is replaced
+    assert history.attach_file(client_id, 2, 'again.pdf') == []
+    assert history.attach_file(client_id, 2, 'again-2.pdf') == ['again.pdf']
+    assert history.get_version(client_id, 2)['report_id'] == 'again-2.pdf'
+
+
+def test_released_version_is_rendered_again_on_download(api, monkeypatch):
+    import app
+    monkeypatch.setattr(app.report_history, 'keep_files', 1)
+
+    client_id = api.post('/api/clients', headers=AUTH,
+                         json={'formData': {'name': 'Ravi', 'gemstones': 'Emerald'}}).get_json()['client_id']
+    first = api.post(f'/api/clients/{client_id}/generate-report', headers=AUTH, json={'reportType': 'docx'})
+    assert first.headers['X-Report-Version'] == '1'
+    api.put(f'/api/clients/{client_id}', headers=AUTH, json={'formData': {'name': 'Ravi', 'gemstones': 'Pearl'}})
+    second = api.post(f'/api/clients/{client_id}/generate-report', headers=AUTH, json={'reportType': 'docx'})
+    assert second.headers['X-Report-Version'] == '2'
+
+    versions = api.get(f'/api/clients/{client_id}/versions', headers=AUTH).get_json()['versions']
+    assert [v['report_id'] for v in versions] == [second.headers['X-Report-Id'], None]
+    assert not app.report_store.exists(first.headers['X-Report-Id'])
+
+    again = api.get(f'/api/clients/{client_id}/versions/1/report', headers=AUTH)
+    assert again.status_code == 200
+    assert again.headers['Content-Disposition'].endswith('report_v1.docx')
+    assert again.headers['X-Report-Id'] != first.headers['X-Report-Id']
+
+    # The new file is kept and served as is next time
+    versions = api.get(f'/api/clients/{client_id}/versions', headers=AUTH).get_json()['versions']
+    assert versions[1]['report_id'] == again.headers['X-Report-Id']
+    assert api.get(f'/api/clients/{client_id}/versions/1/report',
+                   headers=AUTH).headers['X-Report-Id'] == again.headers['X-Report-Id']
+
+    # And search points at it
+    results = api.get('/api/search/reports?q=emerald', headers=AUTH).get_json()['results']
+    assert [(r['client_id'], r['version'], r['report_id']) for r in results] == \
+        [(client_id, 1, again.headers['X-Report-Id'])]
@@ -0,0 +1,116 @@
+import base64
+import html
+import io
+import re
+
+import docx
+from docx.oxml.ns import qn
+import pytest
+from PyPDF2 import PdfReader
+
+from utils.report_generator import ReportGenerator
+from utils.report_model import build_document
+
+FORM = {
+    'name': 'Asha & Co <Rao>',
+    'placeOfBirth': 'Pune',
+    'vastuAnalysis': 'Kitchen in the south-east\nToilet "north" & east',
+    'gemstones': 'Ruby',
+    'whatToPlace': 'Brass pyramid in the North-East, a money plant in the South-East, '
+                   'a water feature in the North',
+    'mahadasha_planet': 'Sun',
+    'mahadasha_source': '1, 9',
+    'saturnRelation': 'Friendly',
+}
+
+
+def normalized(text):
+    # PDF text is re-flowed into page-width lines and bullets come out in the font's encoding
+    return re.sub(r'\s+', ' ', text.replace('\x7f', '•')).strip()
+
+
+@pytest.fixture(scope='module')
+def rendered(tmp_path_factory):
+    generator = ReportGenerator(str(tmp_path_factory.mktemp('reports')))
+    document = build_document(FORM)
+    return document, generator.generate_pdf(FORM, document), generator.generate_docx(FORM, document)
+
+
+def docx_text(path):
+    """Non-empty paragraph texts in body order, including those inside the section tables"""
+    body = docx.Document(path).element.body
+    paragraphs = body.iter(qn('w:p'))
+    return [text for text in (''.join(node.text or '' for node in p.iter(qn('w:t'))) for p in paragraphs) if text]
+
+
+def test_docx_has_the_document_model_text_unescaped(rendered):
+    document, _, docx_path = rendered
+    lines = docx_text(docx_path)
+
+    assert 'Asha & Co <Rao>' in lines
+    assert '• Toilet "north" & east' in lines
+    assert not any('&amp;' in line or '&lt;' in line for line in lines)
+    assert lines[-1] == f"Generated on: {document['generated_at']}"
+
+
+def test_pdf_and_docx_print_the_same_document(rendered):
+    document, pdf_path, docx_path = rendered
+    pdf_text = normalized(' '.join(page.extract_text() for page in PdfReader(pdf_path).pages))
+    lines = docx_text(docx_path)
+
+    expected = [document['title']]
+    for section in document['sections']:
+        if section['fields']:
+            expected.append(section['title'])
+        for field in section['fields']:
+            expected.append(f"{field['label']}:")
+            expected += [html.unescape(line) for line in field['lines']]
+    expected.append(f"Generated on: {document['generated_at']}")
+
+    # Same text in the same order in both formats
+    assert lines == expected
+    position = 0
+    for line in expected:
+        position = pdf_text.index(normalized(line), position)
+
+    # The long comma-separated value became bullets in both
+    assert '• a money plant in the South-East' in lines
+
+
+def test_generate_renders_every_format_from_one_model(tmp_path, monkeypatch):
+    from utils import report_generator
+    calls = []
+    monkeypatch.setattr(report_generator, 'build_document', lambda form: calls.append(form) or build_document(form))
+
+    paths = ReportGenerator(str(tmp_path)).generate(FORM, ['pdf', 'docx'])
+
+    assert len(calls) == 1
+    assert sorted(path.rsplit('.', 1)[1] for path in paths.values()) == ['docx', 'pdf']
+
+
+def png(colour):
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new('RGB', (40, 20), colour).save(buffer, format='PNG')
+    return 'data:image/png;base64,' + base64.b64encode(buffer.getvalue()).decode()
+
+
+def test_house_maps_are_decoded_on_the_shared_pool(tmp_path, monkeypatch):
+    from utils import report_generator
+    monkeypatch.setattr(report_generator, 'IMAGE_DECODE_THREADS', 2)
+    monkeypatch.setattr(report_generator, '_decode_pool', None)
+    form = dict(FORM, houseMapImages=[png('red'), 'not an image', png('blue')],
+                houseMapAnalyses=['Kitchen: South-East', '', 'Toilet: West'])
+    generator = ReportGenerator(str(tmp_path))
+
+    path = generator.generate_pdf(form)
+    pool = report_generator._decode_pool
+    generator.generate_pdf(form)
+
+    assert report_generator._decode_pool is pool  # reused, not one pool per report
+    text = normalized(' '.join(page.extract_text() for page in PdfReader(path).pages))
+    assert 'Room Directions (Map 1): Kitchen: South-East' in text
+    assert 'Map 2' not in text  # the broken image is left out with its directions
+    assert 'Room Directions (Map 3): Toilet: West' in text
+    xobjects = [page['/Resources'].get('/XObject', {}) for page in PdfReader(path).pages]
+    assert sum(len(objects) for objects in xobjects) == 2
@@ -0,0 +1,56 @@
+import pytest
+
+from utils.client_store import ClientStore
+from utils.report_search import ReportSearchIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    return ReportSearchIndex(ClientStore(str(tmp_path / 'clients.db')))
+
+
+def form(name, analysis):
+    return {'name': name, 'vastuAnalysis': analysis, 'whatToPlace': 'Brass pyramid in the North-East'}
+
+
+def found(index, text, **filters):
+    return [result['report_id'] for result in index.search(text, **filters)['results']]
+
+
+def test_search_newest_first_with_filters(index):
+    index.index_report('a.pdf', form('Asha', 'Toilet in the south-west'), 'pdf', client_id='c1')
+    index.index_report('b.pdf', form('Bala', 'Kitchen in the south-west'), 'pdf', client_id='c2')
+
+    assert found(index, 'south-west') == ['b.pdf', 'a.pdf']
+    assert found(index, 'toilets') == ['a.pdf']
+    assert found(index, 'south-west', client_id='c1') == ['a.pdf']
+    assert found(index, 'pyramid', fields=['vastuAnalysis']) == []
+
+
+def test_removed_reports_leave_the_index(index):
+    index.index_report('a.pdf', form('Asha', 'Toilet in the south-west'), 'pdf', client_id='c1')
+    index.index_report('b.pdf', form('Bala', 'Kitchen in the south-west'), 'pdf', client_id='c2')
+    index.index_report('c.pdf', form('Asha', 'Locker in the south-west'), 'pdf', client_id='c1')
+
+    index.remove_reports(['b.pdf', 'missing.pdf'])
+    assert found(index, 'south-west') == ['c.pdf', 'a.pdf']
+
+    index.remove_client('c1')
+    assert found(index, 'pyramid') == []
+    assert index.stats() == {'reports': 0}
+    conn = index.store.connection()
+    assert conn.execute('SELECT COUNT(*) FROM report_text').fetchone()[0] == 0
+
+
+def test_released_client_versions_stay_searchable(index):
+    index.index_report('v1.pdf', form('Asha', 'Toilet in the south-west'), 'pdf', client_id='c1', version=1)
+    index.index_report('v2.pdf', form('Asha', 'Kitchen in the south-west'), 'pdf', client_id='c1', version=2)
+
+    index.remove_reports(['v1.pdf'])
+    result, = index.search('toilet')['results']
+    assert (result['report_id'], result['client_id'], result['version']) == (None, 'c1', 1)
+
+    # Rendered again on demand: the same row points at the new file
+    index.index_report('v1-again.pdf', form('Asha', 'Toilet in the south-west'), 'pdf', client_id='c1', version=1)
+    assert found(index, 'south-west') == ['v2.pdf', 'v1-again.pdf']
+    assert index.stats() == {'reports': 2}
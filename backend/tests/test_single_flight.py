@@ -0,0 +1,90 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.bulkheads import Bulkhead, PoolSaturated
+from utils.single_flight import SingleFlight
+
+
+def wait_until(predicate):
+    deadline = time.monotonic() + 5
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def start_leader(flight, key='key', result='report'):
+    """Start a call that runs until the returned event is set"""
+    started, finish = threading.Event(), threading.Event()
+
+    def fn():
+        started.set()
+        finish.wait(5)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    leader = pool.submit(flight.do, key, fn)
+    pool.shutdown(wait=False)
+    assert started.wait(5)
+    return leader, finish
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight('test')
+    leader, finish = start_leader(flight)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        waiters = [pool.submit(flight.do, 'key', lambda: 'not run') for _ in range(3)]
+        wait_until(lambda: flight.stats()['waiting'] == 3)
+        finish.set()
+
+        assert leader.result(5) == ('report', False)
+        assert [waiter.result(5) for waiter in waiters] == [('report', True)] * 3
+    assert flight.stats() == {'executed': 1, 'coalesced': 3, 'in_flight': 0, 'waiting': 0}
+
+
+def test_error_reaches_every_waiter():
+    flight = SingleFlight('test')
+    leader, finish = start_leader(flight, result=ValueError('bad form'))
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        waiter = pool.submit(flight.do, 'key', lambda: 'not run')
+        wait_until(lambda: flight.stats()['waiting'] == 1)
+        finish.set()
+
+        with pytest.raises(ValueError, match='bad form'):
+            leader.result(5)
+        with pytest.raises(ValueError, match='bad form'):
+            waiter.result(5)
+
+
+def test_call_after_completion_runs_again():
+    flight = SingleFlight('test')
+    assert flight.do('key', lambda: 1) == (1, False)
+    assert flight.do('key', lambda: 2) == (2, False)
+    assert flight.stats()['executed'] == 2
+
+
+def test_waiters_queue_in_the_bulkhead():
+    flight = SingleFlight('test')
+    bulkhead = Bulkhead('render', max_concurrent=1, max_queue=1, queue_timeout=0.2, retry_after=7)
+    leader, finish = start_leader(flight)
+    try:
+        # The one queue place runs out after the timeout; a second duplicate is turned away
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            waiter = pool.submit(flight.do, 'key', lambda: 'not run', wait=bulkhead.wait)
+            wait_until(lambda: bulkhead.stats()['waiting'] == 1)
+            with pytest.raises(PoolSaturated) as rejected:
+                flight.do('key', lambda: 'not run', wait=bulkhead.wait)
+            with pytest.raises(PoolSaturated):
+                waiter.result(5)
+    finally:
+        finish.set()
+
+    assert rejected.value.retry_after == 7
+    assert leader.result(5) == ('report', False)
+    stats = bulkhead.stats()
+    assert (stats['rejected'], stats['timed_out'], stats['waiting']) == (1, 1, 0)
+    assert flight.stats()['waiting'] == 0
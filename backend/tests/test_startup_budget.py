@@ -0,0 +1,12 @@
+import os
+import subprocess
+import sys
+
+BENCHMARK = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'benchmarks', 'startup_budget.py')
+
+
+def test_app_import_stays_within_the_startup_budget():
+    # STARTUP_BUDGET_MS raises the budget on slow machines
+    result = subprocess.run([sys.executable, BENCHMARK, '--runs', '3'], capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
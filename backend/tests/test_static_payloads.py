@@ -0,0 +1,63 @@
+import gzip
+import json
+
+import pytest
+
+from utils.vastu_directions import PLANET_COLORS
+
+
+def test_body_matches_the_table(api):
+    response = api.get('/api/planet-colors', headers={'Accept-Encoding': 'identity'})
+
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json() == {'success': True, 'data': json.loads(json.dumps(PLANET_COLORS))}
+    assert 'max-age=' in response.headers['Cache-Control']
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+
+def test_gzip_when_accepted(api):
+    plain = api.get('/api/planet-colors')
+    response = api.get('/api/planet-colors', headers={'Accept-Encoding': 'gzip, deflate'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data) == plain.data
+    # Each encoding has its own ETag so caches never mix the bytes up
+    assert response.headers['ETag'] != plain.headers['ETag']
+
+
+def test_brotli_preferred_when_available(api):
+    brotli = pytest.importorskip('brotli')
+    response = api.get('/api/planet-colors', headers={'Accept-Encoding': 'gzip, br'})
+
+    assert response.headers['Content-Encoding'] == 'br'
+    assert json.loads(brotli.decompress(response.data))['success'] is True
+
+
+def test_gzip_refused_with_q_zero(api):
+    response = api.get('/api/planet-colors', headers={'Accept-Encoding': 'gzip;q=0, br;q=0'})
+    assert 'Content-Encoding' not in response.headers
+
+
+@pytest.mark.parametrize('encoding', ['identity', 'gzip'])
+def test_current_etag_gets_304(api, encoding):
+    etag = api.get('/api/zodiac-mapping', headers={'Accept-Encoding': encoding}).headers['ETag']
+
+    for if_none_match in (etag, f'W/{etag}', f'"other", {etag}', '*'):
+        response = api.get('/api/zodiac-mapping', headers={'Accept-Encoding': encoding,
+                                                           'If-None-Match': if_none_match})
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+
+
+def test_etag_of_another_encoding_still_matches(api):
+    # A cache that revalidates a gzip copy without Accept-Encoding
+    gzip_etag = api.get('/api/zodiac-mapping', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    assert api.get('/api/zodiac-mapping', headers={'If-None-Match': gzip_etag}).status_code == 304
+
+
+def test_stale_etag_gets_the_body(api):
+    response = api.get('/api/zodiac-mapping', headers={'If-None-Match': '"stale"'})
+    assert response.status_code == 200
+    assert response.get_json()['success'] is True
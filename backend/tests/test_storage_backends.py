@@ -0,0 +1,73 @@
+import pytest
+from flask import Flask, send_file
+
+boto3 = pytest.importorskip('boto3')
+moto = pytest.importorskip('moto')
+
+from botocore.stub import Stubber  # noqa: E402
+from botocore.exceptions import ClientError  # noqa: E402
+
+from utils.storage_backends import S3ReportStore, create_report_store, shard_path  # noqa: E402
+
+BUCKET = 'destiny-reports'
+BODY = b'%PDF-1.4\n' + b'report' * 2000
+
+
+@pytest.fixture
+def store(monkeypatch):
+    # moto stands in for S3/MinIO; no request leaves the process
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    with moto.mock_aws():
+        boto3.client('s3', region_name='us-east-1').create_bucket(Bucket=BUCKET)
+        yield S3ReportStore(BUCKET, prefix='reports', region='us-east-1')
+
+
+def test_save_uploads_under_sharded_key(store, tmp_path):
+    source = tmp_path / 'report.pdf'
+    source.write_bytes(BODY)
+
+    report_id = store.save(str(source))
+
+    assert report_id.endswith('.pdf')
+    assert not source.exists()
+    assert store.path(report_id) is None
+    head = store.client.head_object(Bucket=BUCKET, Key=f'reports/{shard_path(report_id)}')
+    assert head['ContentLength'] == len(BODY)
+
+
+def test_exists_open_and_delete(store, tmp_path):
+    source = tmp_path / 'report.pdf'
+    source.write_bytes(BODY)
+    report_id = store.save(str(source))
+
+    assert store.exists(report_id)
+    assert not store.exists('0' * 32 + '.pdf')
+
+    # The download endpoint streams the object body straight into send_file
+    app = Flask(__name__)
+    with app.test_request_context():
+        response = send_file(store.open(report_id), as_attachment=True, download_name='report.pdf')
+        response.direct_passthrough = False
+        assert response.get_data() == BODY
+        assert 'report.pdf' in response.headers['Content-Disposition']
+
+    store.delete(report_id)
+    assert not store.exists(report_id)
+    store.delete(report_id)  # deleting a missing report is not an error
+
+
+def test_exists_raises_on_other_errors(store):
+    with Stubber(store.client) as stubber:
+        stubber.add_client_error('head_object', service_error_code='403', http_status_code=403)
+        with pytest.raises(ClientError):
+            store.exists('0' * 32 + '.pdf')
+
+
+def test_create_report_store_selects_s3(store, monkeypatch):
+    monkeypatch.setenv('REPORT_STORAGE_BACKEND', 's3')
+    monkeypatch.setenv('S3_BUCKET', BUCKET)
+    created = create_report_store('unused')
+    assert isinstance(created, S3ReportStore)
+    assert created.prefix == 'reports'
@@ -0,0 +1,111 @@
+import os
+import time
+
+import pytest
+
+from utils import storage_manager
+from utils.storage_manager import ReportStorageManager
+
+
+def write(root, name, size):
+    path = os.path.join(root, name)
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    return path
+
+
+def workers(root, count=2, **kwargs):
+    # Separate managers on one root behave like separate worker processes
+    options = {'max_bytes': 1000, 'max_age_seconds': 3600, 'janitor_interval': 3600}
+    options.update(kwargs)
+    managers = [ReportStorageManager(str(root), **options) for _ in range(count)]
+    for manager in managers:
+        manager._started_pid = os.getpid()  # no janitor threads in tests
+    return managers
+
+
+def test_size_cap_covers_every_worker(tmp_path):
+    first, second = workers(tmp_path)
+    a = write(tmp_path, 'a.pdf', 400)
+    first.register(a)
+    b = write(tmp_path, 'b.pdf', 400)
+    second.register(b)
+    c = write(tmp_path, 'c.pdf', 400)
+    first.register(c)
+
+    assert not os.path.exists(a)
+    assert os.path.exists(b) and os.path.exists(c)
+    assert second.usage()['total_bytes'] == 800
+
+
+def test_download_on_one_worker_protects_from_another(tmp_path):
+    first, second = workers(tmp_path)
+    old = write(tmp_path, 'old.pdf', 100)
+    first.register(old)
+    newer = write(tmp_path, 'newer.pdf', 100)
+    first.register(newer)
+
+    second.touch(old)
+    evicted = []
+    first.on_evict = evicted.extend
+    first.max_bytes = 150
+    first.evict()
+
+    assert os.path.exists(old)
+    assert evicted == [newer]
+
+
+def test_missing_files_are_dropped_but_not_counted(tmp_path):
+    (manager,) = workers(tmp_path, count=1, max_age_seconds=0)
+    path = write(tmp_path, 'gone.pdf', 100)
+    manager.register(path)
+    os.remove(path)
+
+    assert manager.evict(now=time.time() + 1) == 0
+    usage = manager.usage()
+    assert usage['files'] == 0 and usage['total_bytes'] == 0
+    assert usage['evicted_files'] == 0 and usage['evicted_bytes'] == 0
+
+
+def test_files_are_deleted_outside_the_index_lock(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_manager, 'INDEX_BUSY_TIMEOUT_SECONDS', 0.1)
+    first, second = workers(tmp_path)
+    old = write(tmp_path, 'old.pdf', 600)
+    first.register(old)
+    other = write(tmp_path, 'other.pdf', 10)
+    second.register(other)
+
+    remove = os.remove
+
+    def remove_while_another_worker_writes(path):
+        second.touch(other)  # would hit "database is locked" inside the eviction transaction
+        remove(path)
+
+    monkeypatch.setattr(os, 'remove', remove_while_another_worker_writes)
+    first.register(write(tmp_path, 'new.pdf', 600))
+
+    assert not os.path.exists(old)
+    assert first.usage()['evicted_files'] == 1
+
+
+def test_existing_files_are_scanned_once(tmp_path):
+    write(tmp_path, 'a.pdf', 100)
+    os.makedirs(tmp_path / 'ab' / 'cd')
+    write(tmp_path / 'ab' / 'cd', 'b.pdf', 50)
+    first, second = workers(tmp_path)
+
+    first._scan()
+    write(tmp_path, 'later.pdf', 10)
+    second._scan()
+
+    assert second.usage()['files'] == 2
+    assert second.usage()['total_bytes'] == 150
+
+
+@pytest.mark.skipif(storage_manager.fcntl is None, reason='janitor election needs flock')
+def test_one_janitor_per_host(tmp_path):
+    first, second = workers(tmp_path)
+    assert first._acquire_janitor_lock()
+    assert not second._acquire_janitor_lock()
+    first._janitor_lock.close()  # the holder exits
+    assert second._acquire_janitor_lock()
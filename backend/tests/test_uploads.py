@@ -0,0 +1,37 @@
+from io import BytesIO
+
+import pytest
+from flask import Flask, request
+
+from utils.single_flight import request_key
+from utils.uploads import SpooledUploadRequest, open_upload
+
+BODY = b'%PDF-1.4\n' + b'x' * 6000
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.request_class = SpooledUploadRequest
+    return app
+
+
+@pytest.mark.parametrize('filename, content_type', [
+    ('blob', 'application/octet-stream'),  # kept in memory (BytesIO)
+    ('chart.pdf', 'application/pdf'),      # spooled to disk and memory-mapped
+])
+def test_upload_request_key(app, filename, content_type):
+    data = {'file': (BytesIO(BODY), filename, content_type)}
+    with app.test_request_context('/', method='POST', data=data, content_type='multipart/form-data'):
+        with open_upload(request.files['file']) as upload:
+            assert upload.size == len(BODY)
+            assert request_key('convert', upload.buffer) == request_key('convert', BODY)
+            with open(upload.path, 'rb') as f:
+                assert f.read() == BODY
+        # Hashing must not leave a buffer export that stops the request closing its files
+        request.files['file'].close()
+
+
+def test_request_key_separates_parts():
+    assert request_key('ab', 'c') != request_key('a', 'bc')
+    assert request_key(b'ab', BytesIO(b'c')) == request_key('ab', 'c')
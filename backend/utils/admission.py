@@ -0,0 +1,226 @@
+# Admission control and load shedding for upload/render endpoints
+# Every heavy request is priced up front (estimated peak memory in MB, from
+# Content-Length and an estimated page count) before its body is read. The
+# request is shed with a fast 503 when process memory or the bulkhead queues
+# are already too high, and throttled with 429 when its client's token bucket
+# is empty, instead of being OOM-killed halfway through a rasterization.
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import jsonify, request
+
+from .bulkheads import BULKHEADS
+
+# Cost profile per workload class, all in MB of estimated peak memory:
+#   base: fixed overhead of the code path
+#   upload_factor: copies of the request body held at once (bytes, parsers, decoded images)
+#   per_page: memory per rendered page (200 DPI A4 RGB is ~12MB)
+#   bytes_per_page: average upload bytes per page, to estimate the page count
+COST_PROFILES = {
+    'pdf_text': {'base': 8, 'upload_factor': 3, 'per_page': 0, 'bytes_per_page': 100 * 1024},
+    'raster': {'base': 16, 'upload_factor': 2, 'per_page': 12, 'bytes_per_page': 100 * 1024},
+    'render': {'base': 48, 'upload_factor': 8, 'per_page': 0, 'bytes_per_page': 100 * 1024}
+}
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+# Per-client budget: burst capacity and refill rate in cost units (MB)
+CLIENT_BUCKET_CAPACITY = float(os.getenv("ADMISSION_CLIENT_BURST", "600"))
+CLIENT_BUCKET_REFILL = float(os.getenv("ADMISSION_CLIENT_REFILL_PER_SECOND", "20"))
+MAX_TRACKED_CLIENTS = int(os.getenv("ADMISSION_MAX_TRACKED_CLIENTS", "10000"))
+# Shed when resident memory plus the request's estimate would exceed this
+MAX_RSS_MB = float(os.getenv("ADMISSION_MAX_RSS_MB", "1536"))
+# Shed when this many requests are already waiting in the heavy bulkheads
+MAX_QUEUE_DEPTH = int(os.getenv("ADMISSION_MAX_QUEUE_DEPTH", "4"))
+SHED_RETRY_AFTER = int(os.getenv("ADMISSION_SHED_RETRY_AFTER", "10"))
+# Proxies in front of the app that append to X-Forwarded-For (0: clients connect directly)
+TRUSTED_PROXY_HOPS = int(os.getenv("ADMISSION_TRUSTED_PROXY_HOPS", "1"))
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+_MB = 1024 * 1024
+
+
+def current_rss_mb():
+    """
+    Resident set size of this process
+
+    Returns:
+        float: RSS in MB, or None where /proc is unavailable (e.g. macOS)
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * _PAGE_SIZE / _MB
+
+
+def heavy_queue_depth():
+    """Requests currently waiting for a slot in any non-lookup bulkhead"""
+    return sum(bulkhead.waiting for name, bulkhead in BULKHEADS.items() if name != 'lookup')
+
+
+def estimate_cost(workload, content_length, pages=None):
+    """
+    Estimate a request's peak memory in MB
+
+    Args:
+        workload (str): Key of COST_PROFILES
+        content_length (int): Request body size in bytes (0 if unknown)
+        pages (int): Page count if known, otherwise estimated from the size
+
+    Returns:
+        float: Estimated cost in MB
+    """
+    profile = COST_PROFILES[workload]
+    content_length = content_length or 0
+    if pages is None:
+        pages = max(1, math.ceil(content_length / profile['bytes_per_page']))
+    upload_mb = content_length / _MB
+    return profile['base'] + upload_mb * profile['upload_factor'] + pages * profile['per_page']
+
+
+class TokenBucketRegistry:
+    """Per-client token buckets, keeping only the most recently seen clients"""
+
+    def __init__(self, capacity, refill_per_second, max_clients):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()  # client -> (tokens, last_refill)
+        self._lock = threading.Lock()
+
+    def take(self, client, cost):
+        """
+        Take cost tokens from the client's bucket
+
+        Returns:
+            float: 0 if admitted, otherwise seconds until enough tokens refill
+        """
+        # A request bigger than the burst can still run once the bucket is full
+        cost = min(cost, self.capacity)
+        now = time.monotonic()
+        with self._lock:
+            tokens, last_refill = self._buckets.pop(client, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last_refill) * self.refill_per_second)
+
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / self.refill_per_second if self.refill_per_second > 0 else 60.0
+
+            self._buckets[client] = (tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+_client_buckets = TokenBucketRegistry(CLIENT_BUCKET_CAPACITY, CLIENT_BUCKET_REFILL, MAX_TRACKED_CLIENTS)
+
+_stats_lock = threading.Lock()
+_stats = {'admitted': 0, 'throttled': 0, 'shed_memory': 0, 'shed_queue': 0}
+
+
+def _count(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def client_key():
+    """
+    Identify the caller by the address the outermost trusted proxy received it from
+
+    Every proxy appends the address it saw to X-Forwarded-For, so only the
+    last TRUSTED_PROXY_HOPS entries can be trusted; earlier entries are
+    whatever the client sent and would let it pick a fresh bucket per request.
+    """
+    if TRUSTED_PROXY_HOPS > 0:
+        forwarded = ','.join(request.headers.getlist('X-Forwarded-For'))
+        hops = [hop.strip() for hop in forwarded.split(',') if hop.strip()]
+        if len(hops) >= TRUSTED_PROXY_HOPS:
+            return hops[-TRUSTED_PROXY_HOPS]
+    return request.remote_addr or 'unknown'
+
+
+def _reject(status, message, retry_after, cost):
+    response = jsonify({'error': message, 'estimatedCostMb': round(cost, 1)})
+    response.status_code = status
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def check_admission(workload, content_length, client, pages=None):
+    """
+    Decide whether a request may start
+
+    Returns:
+        Response: 429/503 rejection, or None when the request is admitted
+    """
+    cost = estimate_cost(workload, content_length, pages)
+
+    # Shedding comes first so rejected requests don't spend client tokens
+    if heavy_queue_depth() >= MAX_QUEUE_DEPTH:
+        _count('shed_queue')
+        return _reject(503, 'Server is busy, please retry shortly', BULKHEADS[workload].retry_after, cost)
+
+    rss = current_rss_mb()
+    if rss is not None and rss + cost > MAX_RSS_MB:
+        _count('shed_memory')
+        return _reject(503, 'Server is low on memory, please retry shortly', SHED_RETRY_AFTER, cost)
+
+    wait = _client_buckets.take(client, cost)
+    if wait > 0:
+        _count('throttled')
+        return _reject(429, 'Too many large requests, please slow down', wait, cost)
+
+    _count('admitted')
+    return None
+
+
+def admission_controlled(workload, pages=None):
+    """
+    Admit a Flask view only if the request's estimated cost fits right now
+
+    Args:
+        workload (str): Key of COST_PROFILES
+        pages (callable): Returns the number of pages the request will
+            render, or None to estimate it from the size
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if ADMISSION_ENABLED:
+                # content_length comes from the header; the body is only read
+                # when pages() needs a form field (uploads are spooled to disk)
+                page_count = pages() if pages is not None else None
+                rejection = check_admission(workload, request.content_length, client_key(), page_count)
+                if rejection is not None:
+                    return rejection
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def admission_stats():
+    """Counters and current pressure for the metrics endpoint"""
+    with _stats_lock:
+        stats = dict(_stats)
+    rss = current_rss_mb()
+    stats.update({
+        'enabled': ADMISSION_ENABLED,
+        'rss_mb': round(rss, 1) if rss is not None else None,
+        'max_rss_mb': MAX_RSS_MB,
+        'queue_depth': heavy_queue_depth(),
+        'max_queue_depth': MAX_QUEUE_DEPTH,
+        'tracked_clients': len(_client_buckets)
+    })
+    return stats
@@ -0,0 +1,50 @@
+# Shared API key check for stored client data
+# Stored clients hold personal data (name, date and place of birth, house
+# maps, the Kundli PDF), so every endpoint that lists, returns, changes or
+# deletes clients, their reports or report search results requires one of
+# the keys in API_KEYS, sent as X-API-Key or "Authorization: Bearer <key>".
+# CORS only restricts browsers; this also covers direct calls. Without
+# API_KEYS those endpoints are disabled rather than open.
+
+import hmac
+import os
+from functools import wraps
+
+from flask import jsonify, request
+
+API_KEYS = tuple(key.strip() for key in os.getenv("API_KEYS", "").split(",") if key.strip())
+
+
+def request_api_key():
+    """The API key the current request carries, or None"""
+    key = request.headers.get('X-API-Key')
+    if key:
+        return key.strip()
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() == 'bearer' and token.strip():
+        return token.strip()
+    return None
+
+
+def is_valid_api_key(key, keys=None):
+    """Compare a key against the configured keys in constant time"""
+    keys = API_KEYS if keys is None else keys
+    if not key:
+        return False
+    key = key.encode('utf-8')
+    return any(hmac.compare_digest(key, expected.encode('utf-8')) for expected in keys)
+
+
+def api_key_required(view):
+    """Reject a Flask view's requests without a valid API key (401), or all of them without API_KEYS (503)"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not API_KEYS:
+            return jsonify({'error': 'Client data endpoints are disabled: API_KEYS is not configured'}), 503
+        if not is_valid_api_key(request_api_key()):
+            response = jsonify({'error': 'Invalid or missing API key'})
+            response.status_code = 401
+            response.headers['WWW-Authenticate'] = 'Bearer'
+            return response
+        return view(*args, **kwargs)
+    return wrapper
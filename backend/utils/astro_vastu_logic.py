@@ -1,7 +1,19 @@
 # Astro Vastu Logic - Links Planets, Directions, Colors, and Body Parts
 
+from types import MappingProxyType
+
 from .vastu_directions import get_direction_info, get_colors_for_planet, VASTU_DIRECTIONS
 from .zodiac_mapping import ZODIAC_BODY_MAPPING
+from .core_model import (
+    SIGN_COUNT,
+    STRENGTH_NAMES,
+    DIRECTION_RECORDS,
+    planet_from_name,
+    sign_from_name,
+    direction_from_name,
+    build_planet_records,
+    build_strength_table
+)
 
 # Classical Navagraha (9 Planets) - Zodiac Sign (Rāśi) Association
 # Includes rulership, exaltation, debilitation, and nature
@@ -110,6 +122,11 @@ PLANET_ZODIAC_CLASSICAL = {
     }
 }
 
+# Integer form of the classical table: PlanetRecord per Planet enum value and
+# the precomputed strength code for every planet/sign pair
+PLANET_RECORDS = build_planet_records(PLANET_ZODIAC_CLASSICAL)
+STRENGTH_TABLE = build_strength_table(PLANET_RECORDS)
+
 # Legacy mapping for backward compatibility
 PLANET_ZODIAC_RULERSHIP = {
     'Sun': ['Leo'],
@@ -123,6 +140,25 @@ PLANET_ZODIAC_RULERSHIP = {
     'Ketu': ['Scorpio']
 }
 
+def _build_planet_body_parts_index():
+    index = {}
+    for planet, ruled_signs in PLANET_ZODIAC_RULERSHIP.items():
+        entries = []
+        for sign in ruled_signs:
+            zodiac_info = ZODIAC_BODY_MAPPING.get(sign)
+            if zodiac_info:
+                entries.append(MappingProxyType({
+                    'zodiac_sign': sign,
+                    'body_part': zodiac_info['body_part'],
+                    'placement_zone': zodiac_info['placement_zone'],
+                    'accessories': zodiac_info['accessories']
+                }))
+        index[planet] = tuple(entries)
+    return MappingProxyType(index)
+
+# Read-only planet -> body parts index (built once from the rulership table)
+PLANET_BODY_PARTS_INDEX = _build_planet_body_parts_index()
+
 def get_planet_classical_info(planet):
     """
     Get complete classical information for a planet
@@ -146,10 +182,10 @@ def is_planet_exalted_in_sign(planet, sign):
     Returns:
         bool: True if planet is exalted in the sign
     """
-    planet_info = PLANET_ZODIAC_CLASSICAL.get(planet)
-    if planet_info:
-        return planet_info['exaltation_sign'] == sign
-    return False
+    planet_code = planet_from_name(planet)
+    if planet_code is None:
+        return False
+    return PLANET_RECORDS[planet_code].exaltation == sign_from_name(sign)
 
 def is_planet_debilitated_in_sign(planet, sign):
     """
@@ -162,10 +198,10 @@ def is_planet_debilitated_in_sign(planet, sign):
     Returns:
         bool: True if planet is debilitated in the sign
     """
-    planet_info = PLANET_ZODIAC_CLASSICAL.get(planet)
-    if planet_info:
-        return planet_info['debilitation_sign'] == sign
-    return False
+    planet_code = planet_from_name(planet)
+    if planet_code is None:
+        return False
+    return PLANET_RECORDS[planet_code].debilitation == sign_from_name(sign)
 
 def get_planet_strength_in_sign(planet, sign):
     """
@@ -178,19 +214,33 @@ def get_planet_strength_in_sign(planet, sign):
     Returns:
         str: 'exalted', 'own_sign', 'debilitated', or 'neutral'
     """
-    planet_info = PLANET_ZODIAC_CLASSICAL.get(planet)
-    if not planet_info:
+    planet_code = planet_from_name(planet)
+    if planet_code is None:
         return 'unknown'
 
-    if planet_info['exaltation_sign'] == sign:
-        return 'exalted'
-    elif sign in planet_info['ruled_signs']:
-        return 'own_sign'
-    elif planet_info['debilitation_sign'] == sign:
-        return 'debilitated'
-    else:
+    sign_code = sign_from_name(sign)
+    if sign_code is None:
         return 'neutral'
 
+    return STRENGTH_NAMES[STRENGTH_TABLE[planet_code * SIGN_COUNT + sign_code]]
+
+def is_planet_in_direction(planet, direction):
+    """
+    Check if a planet is associated with a direction
+
+    Args:
+        planet (str): Planet name
+        direction (str): Direction name
+
+    Returns:
+        bool: True if the direction lists the planet among its influences
+    """
+    planet_code = planet_from_name(planet)
+    direction_code = direction_from_name(direction)
+    if planet_code is None or direction_code is None:
+        return False
+    return bool(DIRECTION_RECORDS[direction_code].planets_mask >> planet_code & 1)
+
 def get_body_parts_for_planet(planet):
     """
     Get body parts associated with a planet based on zodiac rulership
@@ -201,20 +251,7 @@ def get_body_parts_for_planet(planet):
     Returns:
         list: List of dicts containing zodiac signs and their body parts
     """
-    ruled_signs = PLANET_ZODIAC_RULERSHIP.get(planet, [])
-    body_parts = []
-
-    for sign in ruled_signs:
-        zodiac_info = ZODIAC_BODY_MAPPING.get(sign)
-        if zodiac_info:
-            body_parts.append({
-                'zodiac_sign': sign,
-                'body_part': zodiac_info['body_part'],
-                'placement_zone': zodiac_info['placement_zone'],
-                'accessories': zodiac_info['accessories']
-            })
-
-    return body_parts
+    return [dict(entry) for entry in PLANET_BODY_PARTS_INDEX.get(planet, ())]
 
 def get_placement_suggestions_for_direction(direction, planet=None):
     """
@@ -258,9 +295,9 @@ def get_placement_suggestions_for_direction(direction, planet=None):
             suggestions['all_body_parts'].append(bp_info['body_part'])
             suggestions['all_accessories'].extend(bp_info['accessories'])
 
-    # Remove duplicates
-    suggestions['all_body_parts'] = list(set(suggestions['all_body_parts']))
-    suggestions['all_accessories'] = list(set(suggestions['all_accessories']))
+    # Remove duplicates (order-preserving so results are deterministic)
+    suggestions['all_body_parts'] = list(dict.fromkeys(suggestions['all_body_parts']))
+    suggestions['all_accessories'] = list(dict.fromkeys(suggestions['all_accessories']))
 
     return suggestions
 
@@ -283,7 +320,7 @@ def generate_placement_recommendation(planet, direction):
         }
 
     # Check if planet is associated with this direction
-    if planet not in direction_info['planets']:
+    if not is_planet_in_direction(planet, direction):
         return {
             'warning': f'Planet "{planet}" is not typically associated with direction "{direction}"',
             'direction_planets': direction_info['planets']
@@ -315,8 +352,8 @@ def generate_placement_recommendation(planet, direction):
         })
         recommendation['accessories'].extend(bp_info['accessories'])
 
-    # Remove duplicate accessories
-    recommendation['accessories'] = list(set(recommendation['accessories']))
+    # Remove duplicate accessories (order-preserving so results are deterministic)
+    recommendation['accessories'] = list(dict.fromkeys(recommendation['accessories']))
 
     # Generate formatted suggestion
     if recommendation['body_parts'] and recommendation['colors']:
@@ -375,8 +412,8 @@ def generate_removal_recommendation(planet, direction):
         })
         recommendation['avoid_accessories'].extend(bp_info['accessories'])
 
-    # Remove duplicate accessories
-    recommendation['avoid_accessories'] = list(set(recommendation['avoid_accessories']))
+    # Remove duplicate accessories (order-preserving so results are deterministic)
+    recommendation['avoid_accessories'] = list(dict.fromkeys(recommendation['avoid_accessories']))
 
     # Generate formatted suggestion
     if recommendation['body_parts'] and recommendation['avoid_colors']:
@@ -412,11 +449,88 @@ def batch_generate_recommendations(placements, action='place'):
         if not planet or not direction:
             continue
 
-        if action == 'place':
-            rec = generate_placement_recommendation(planet, direction)
-        else:
-            rec = generate_removal_recommendation(planet, direction)
-
-        recommendations.append(rec)
+        recommendations.append(get_recommendation(planet, direction, action))
 
     return recommendations
+
+def _build_recommendation_table():
+    table = {}
+    for planet in PLANET_ZODIAC_CLASSICAL:
+        for direction in VASTU_DIRECTIONS:
+            table[('place', planet, direction)] = generate_placement_recommendation(planet, direction)
+            table[('remove', planet, direction)] = generate_removal_recommendation(planet, direction)
+    return MappingProxyType(table)
+
+# Every place/remove recommendation for the 9 planets x 16 directions,
+# computed once at import. Entries are shared - treat them as read-only.
+RECOMMENDATION_TABLE = _build_recommendation_table()
+
+def get_recommendation(planet, direction, action='place'):
+    """
+    Get a placement or removal recommendation, served from the precomputed table
+
+    Args:
+        planet (str): Planet name
+        direction (str): Direction name
+        action (str): Either 'place' or 'remove'
+
+    Returns:
+        dict: Recommendation dict (shared, do not mutate). Unknown planet or
+        direction names fall back to computing the recommendation directly.
+    """
+    rec = RECOMMENDATION_TABLE.get((action, planet, direction))
+    if rec is not None:
+        return rec
+
+    if action == 'place':
+        return generate_placement_recommendation(planet, direction)
+    return generate_removal_recommendation(planet, direction)
+
+RECOMMENDATION_ACTIONS = ('place', 'remove')
+
+def iter_batch_recommendations(placements, action='place'):
+    """
+    Lazily resolve a large batch of planet-direction entries in input order
+
+    Each unique (action, planet, direction) is computed once; repeats reuse
+    the first result. Entries may override the batch action with their own
+    'action' key, so place and remove requests can be mixed.
+
+    Args:
+        placements (iterable): Dicts with 'planet', 'direction' and optional 'action'
+        action (str): Default action for entries without one
+
+    Yields:
+        tuple: (index, key, recommendation, error) where key is the
+        (action, planet, direction) tuple and exactly one of recommendation
+        or error is set
+    """
+    resolved = {}
+
+    for index, placement in enumerate(placements):
+        if not isinstance(placement, dict):
+            yield index, None, None, 'Entry must be an object with planet and direction'
+            continue
+
+        planet = placement.get('planet')
+        direction = placement.get('direction')
+        entry_action = placement.get('action', action)
+
+        if not isinstance(planet, str) or not isinstance(direction, str) or not planet or not direction:
+            yield index, None, None, 'Both planet and direction are required'
+            continue
+
+        if entry_action not in RECOMMENDATION_ACTIONS:
+            yield index, None, None, 'action must be either "place" or "remove"'
+            continue
+
+        key = (entry_action, planet, direction)
+        rec = resolved.get(key)
+        if rec is None:
+            rec = get_recommendation(planet, direction, entry_action)
+            resolved[key] = rec
+
+        if 'error' in rec:
+            yield index, key, None, rec['error']
+        else:
+            yield index, key, rec, None
@@ -0,0 +1,239 @@
+# Multi-client bulk report generation
+# Reports are rendered in parallel on a process pool and written into a zip
+# archive that is streamed to the client as each report finishes. Nothing
+# but the current chunk of the archive is held in memory.
+
+import io
+import json
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+# Render processes per gunicorn worker (see gunicorn.conf.py for the sizing)
+BULK_REPORT_WORKERS = int(os.getenv("BULK_REPORT_WORKERS", "2"))
+BULK_REPORT_MAX_ITEMS = int(os.getenv("BULK_REPORT_MAX_ITEMS", "500"))
+
+_COPY_CHUNK_SIZE = 64 * 1024
+
+_pool = None
+_pool_pid = None
+
+
+def get_report_pool():
+    """Return the process pool used for rendering, creating it per process"""
+    global _pool, _pool_pid
+    # A pool inherited across fork (e.g. gunicorn workers) is not usable
+    if _pool is None or _pool_pid != os.getpid():
+        _pool = ProcessPoolExecutor(max_workers=BULK_REPORT_WORKERS)
+        _pool_pid = os.getpid()
+    return _pool
+
+
+def discard_report_pool(pool):
+    """Drop a pool that a crashed worker broke, so the next get_report_pool builds a new one"""
+    global _pool
+    if _pool is pool:
+        _pool = None
+        pool.shutdown(wait=False)
+
+
+def _submit_render(index, form_data):
+    """Submit a render; returns (future, pool)"""
+    pool = get_report_pool()
+    try:
+        return pool.submit(render_report, index, form_data), pool
+    except BrokenProcessPool:
+        discard_report_pool(pool)
+        pool = get_report_pool()
+        return pool.submit(render_report, index, form_data), pool
+
+
+def render_report(index, form_data, report_type='pdf', output_dir='generated_reports'):
+    """
+    Render one report in a worker process
+
+    Args:
+        index (int): Position of the entry, passed back to the caller
+        form_data (dict): Form data
+        report_type (str): 'pdf' or 'docx'
+        output_dir (str): Directory the report is written to
+
+    Returns:
+        tuple: (index, file path or None, error message or None)
+    """
+    try:
+        from .report_generator import ReportGenerator
+        generator = ReportGenerator(output_dir=output_dir)
+        if report_type == 'docx':
+            return index, generator.generate_docx(form_data), None
+        return index, generator.generate_pdf(form_data), None
+    except Exception as e:
+        return index, None, str(e)
+
+
+def iter_bulk_entries(data):
+    """
+    Normalize a bulk request body into (form_data, filename) entries
+
+    Args:
+        data: Parsed JSON (a list, or an object with a 'reports' list) or an
+            iterable of JSONL lines (bytes or str)
+
+    Yields:
+        tuple: (form_data or None, filename or None, error or None)
+    """
+    if isinstance(data, dict):
+        data = data.get('reports')
+    if data is None:
+        return
+
+    for item in data:
+        if isinstance(item, (bytes, str)):
+            line = item.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                yield None, None, 'Invalid JSON line'
+                continue
+
+        if isinstance(item, dict) and isinstance(item.get('formData'), dict):
+            yield item['formData'], item.get('filename'), None
+        elif isinstance(item, dict):
+            yield item, None, None
+        else:
+            yield None, None, 'Form data must be an object'
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only, unseekable buffer that zipfile writes into and we drain"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _archive_name(index, path, filename):
+    if filename:
+        name = f"{os.path.basename(str(filename))}.pdf"
+    else:
+        name = os.path.basename(path)
+    # Index prefix keeps names unique and in input order when unpacked
+    return f"{index + 1:04d}_{name}"
+
+
+def stream_reports_zip(entries, max_items=BULK_REPORT_MAX_ITEMS, on_report=None):
+    """
+    Render reports in parallel and stream them as a zip archive
+
+    Args:
+        entries (iterable): (form_data, filename, error) tuples from iter_bulk_entries
+        max_items (int): Entries beyond this count are recorded as failures
+        on_report (callable, optional): Called with each rendered file path and
+            its form data once the file is in the archive; an entry whose
+            callback fails is recorded as failed in the manifest
+
+    Yields:
+        bytes: Consecutive chunks of the zip archive. The last member is
+        manifest.json with the status of every entry.
+    """
+    sink = _ZipSink()
+    archive = zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED)
+    window = BULK_REPORT_WORKERS * 2
+    manifest = {}
+    filenames = {}
+    forms = {}
+    pending = {}
+    entries = enumerate(entries)
+    exhausted = False
+
+    try:
+        while True:
+            # Keep a bounded number of renders in flight so large batches
+            # never hold every client's form data in the pool queue at once
+            while not exhausted and len(pending) < window:
+                try:
+                    index, (form_data, filename, error) = next(entries)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if error is None and index >= max_items:
+                    error = f'Batch limit of {max_items} reports exceeded'
+                if error:
+                    manifest[index] = {'index': index, 'status': 'failed', 'error': error}
+                    continue
+                filenames[index] = filename
+                forms[index] = form_data
+                future, pool = _submit_render(index, form_data)
+                pending[future] = (index, pool)
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, pool = pending.pop(future)
+                filename = filenames.pop(index, None)
+                form_data = forms.pop(index, None)
+                try:
+                    _, path, error = future.result()
+                except BrokenProcessPool:
+                    # Renders still queued on this pool fail the same way; later ones get a new pool
+                    discard_report_pool(pool)
+                    path, error = None, 'Report worker crashed'
+
+                if error:
+                    manifest[index] = {'index': index, 'status': 'failed', 'error': error}
+                    continue
+
+                name = _archive_name(index, path, filename)
+                with archive.open(name, 'w') as member, open(path, 'rb') as source:
+                    while True:
+                        chunk = source.read(_COPY_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        member.write(chunk)
+                        data = sink.drain()
+                        if data:
+                            yield data
+
+                manifest[index] = {'index': index, 'status': 'ok', 'file': name}
+                if on_report:
+                    try:
+                        on_report(path, form_data)
+                    except Exception as e:
+                        print(f"Could not store bulk report {index}: {str(e)}")
+                        manifest[index].update(status='failed', error=f'Report could not be stored: {str(e)}')
+                        if os.path.exists(path):
+                            os.remove(path)
+
+            data = sink.drain()
+            if data:
+                yield data
+
+        entries_list = [manifest[index] for index in sorted(manifest)]
+        archive.writestr('manifest.json', json.dumps({
+            'total': len(entries_list),
+            'succeeded': sum(1 for e in entries_list if e['status'] == 'ok'),
+            'failed': sum(1 for e in entries_list if e['status'] != 'ok'),
+            'reports': entries_list
+        }, indent=2))
+        archive.close()
+        yield sink.drain()
+    finally:
+        # Client went away or rendering failed: don't keep rendering for nobody
+        for future in pending:
+            future.cancel()
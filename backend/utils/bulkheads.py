@@ -0,0 +1,212 @@
+# Workload-isolated execution pools (bulkheads)
+# Each workload class gets its own concurrency limit and wait queue, so a
+# burst of heavy rasterization or rendering can only exhaust its own pool
+# while health checks and lookups keep being served. A saturated pool
+# answers immediately with 503 and a Retry-After hint.
+
+import os
+import threading
+from functools import wraps
+
+from flask import jsonify
+
+
+class PoolSaturated(Exception):
+    """Raised when a bulkhead has no free slot and its wait queue is full or timed out"""
+
+    def __init__(self, pool, retry_after):
+        super().__init__(f'{pool} pool is saturated')
+        self.pool = pool
+        self.retry_after = retry_after
+
+
+class Bulkhead:
+    """Bounded concurrency slots plus a bounded queue of waiting requests"""
+
+    def __init__(self, name, max_concurrent, max_queue, queue_timeout, retry_after):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiting = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    @property
+    def waiting(self):
+        return self._waiting
+
+    def acquire(self):
+        """
+        Take a slot, waiting in the queue if needed
+
+        Returns:
+            callable: Releases the slot; safe to call more than once
+
+        Raises:
+            PoolSaturated: Queue full, or no slot freed up within queue_timeout
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                if self._waiting >= self.max_queue:
+                    self._rejected += 1
+                    raise PoolSaturated(self.name, self.retry_after)
+                self._waiting += 1
+            acquired = self._slots.acquire(timeout=self.queue_timeout)
+            with self._lock:
+                self._waiting -= 1
+                if not acquired:
+                    self._timed_out += 1
+            if not acquired:
+                raise PoolSaturated(self.name, self.retry_after)
+
+        with self._lock:
+            self._active += 1
+
+        released = False
+
+        def release():
+            nonlocal released
+            if released:
+                return
+            released = True
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+            self._slots.release()
+
+        return release
+
+    def wait(self, event):
+        """
+        Wait for another request's work in this pool (a coalesced duplicate)
+        without taking a slot; the wait holds a place in the queue
+
+        Raises:
+            PoolSaturated: Queue full, or the event was not set within queue_timeout
+        """
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                self._rejected += 1
+                raise PoolSaturated(self.name, self.retry_after)
+            self._waiting += 1
+        done = event.wait(self.queue_timeout)
+        with self._lock:
+            self._waiting -= 1
+            if not done:
+                self._timed_out += 1
+        if not done:
+            raise PoolSaturated(self.name, self.retry_after)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'active': self._active,
+                'waiting': self._waiting,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'timed_out': self._timed_out
+            }
+
+
+def _pool_from_env(name, concurrency, queue, queue_timeout, retry_after):
+    prefix = f"BULKHEAD_{name.upper()}"
+    return Bulkhead(
+        name,
+        max_concurrent=int(os.getenv(f"{prefix}_CONCURRENCY", str(concurrency))),
+        max_queue=int(os.getenv(f"{prefix}_QUEUE", str(queue))),
+        queue_timeout=float(os.getenv(f"{prefix}_QUEUE_TIMEOUT", str(queue_timeout))),
+        retry_after=int(os.getenv(f"{prefix}_RETRY_AFTER", str(retry_after)))
+    )
+
+
+# Per-process pools, sized per workload class. The heavy pools' slots plus
+# queues (11 by default) stay below the gunicorn thread count (16) so that
+# lookups always find a free thread.
+BULKHEADS = {
+    'lookup': _pool_from_env('lookup', concurrency=32, queue=64, queue_timeout=2, retry_after=1),
+    'pdf_text': _pool_from_env('pdf_text', concurrency=2, queue=2, queue_timeout=15, retry_after=5),
+    'raster': _pool_from_env('raster', concurrency=1, queue=2, queue_timeout=30, retry_after=15),
+    'render': _pool_from_env('render', concurrency=2, queue=2, queue_timeout=30, retry_after=10)
+}
+
+
+def saturated_response(error):
+    """503 response for a saturated pool"""
+    response = jsonify({
+        'error': 'Server is busy, please retry shortly',
+        'pool': error.pool
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+
+def isolated(pool_name):
+    """Run a Flask view inside the named bulkhead"""
+    bulkhead = BULKHEADS[pool_name]
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                release = bulkhead.acquire()
+            except PoolSaturated as e:
+                return saturated_response(e)
+            try:
+                return view(*args, **kwargs)
+            finally:
+                release()
+        return wrapper
+    return decorator
+
+
+class _HeldStream:
+    """Response body that releases its bulkhead slot when the server closes it"""
+
+    def __init__(self, iterable, release):
+        self._iterable = iterable
+        self._release = release
+
+    def __iter__(self):
+        return iter(self._iterable)
+
+    def close(self):
+        # WSGI servers call close() even if the body was never iterated
+        try:
+            if hasattr(self._iterable, 'close'):
+                self._iterable.close()
+        finally:
+            self._release()
+
+
+def hold_while_streaming(pool_name, make_body):
+    """
+    Keep a bulkhead slot for the lifetime of a streamed response body
+
+    Args:
+        pool_name (str): Bulkhead to take the slot from
+        make_body (callable): Builds the response iterable once the slot is held
+
+    Raises:
+        PoolSaturated: Raised before the body is built, so the view can 503
+    """
+    release = BULKHEADS[pool_name].acquire()
+    try:
+        return _HeldStream(make_body(), release)
+    except Exception:
+        release()
+        raise
+
+
+def bulkhead_stats():
+    """Snapshot of every pool for the metrics endpoint"""
+    return {name: bulkhead.stats() for name, bulkhead in BULKHEADS.items()}
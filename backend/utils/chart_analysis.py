@@ -0,0 +1,150 @@
+# Whole-chart Astro Vastu analysis
+# Scores all 9 planets against all 16 directions in one pass using NumPy
+# arrays built from the classical planet table and VASTU_DIRECTIONS.
+
+import numpy as np
+
+from .core_model import (
+    PLANET_COUNT,
+    DIRECTION_COUNT,
+    PLANET_NAMES,
+    SIGN_NAMES,
+    DIRECTION_NAMES,
+    STRENGTH_NAMES,
+    DIRECTION_RECORDS,
+    Strength,
+    encode_chart
+)
+from .astro_vastu_logic import STRENGTH_TABLE, get_recommendation
+
+# Weight of each Strength code: strong planets should be placed/activated in
+# their directions, debilitated planets removed from them, neutral ones left alone
+STRENGTH_WEIGHTS = np.zeros(len(Strength), dtype=np.float64)
+STRENGTH_WEIGHTS[Strength.EXALTED] = 1.0
+STRENGTH_WEIGHTS[Strength.OWN_SIGN] = 0.75
+STRENGTH_WEIGHTS[Strength.DEBILITATED] = -1.0
+
+# (planet, sign) -> Strength code, shared with astro_vastu_logic
+STRENGTH_MATRIX = np.frombuffer(STRENGTH_TABLE, dtype=np.uint8).reshape(PLANET_COUNT, -1)
+
+
+def _build_association_matrix():
+    # A planet that rules a direction alone carries full weight; shared
+    # directions split the weight between their planets
+    matrix = np.zeros((PLANET_COUNT, DIRECTION_COUNT), dtype=np.float64)
+    for record in DIRECTION_RECORDS:
+        planets = [p for p in range(PLANET_COUNT) if record.planets_mask >> p & 1]
+        for planet in planets:
+            matrix[planet, record.direction] = 1.0 / len(planets)
+    return matrix
+
+
+ASSOCIATION_MATRIX = _build_association_matrix()
+_PLANET_AXIS = np.arange(PLANET_COUNT)
+
+
+def score_charts(sign_codes):
+    """
+    Score many charts at once
+
+    Args:
+        sign_codes (array-like): Shape (N, 9) sign codes, one row per chart
+            in Planet enum order
+
+    Returns:
+        tuple: (strength codes of shape (N, 9), relevance of shape (N, 9, 16)).
+        Positive relevance favours placing, negative favours removing.
+    """
+    sign_codes = np.asarray(sign_codes, dtype=np.intp).reshape(-1, PLANET_COUNT)
+    strengths = STRENGTH_MATRIX[_PLANET_AXIS, sign_codes]
+    relevance = STRENGTH_WEIGHTS[strengths][:, :, None] * ASSOCIATION_MATRIX[None, :, :]
+    return strengths, relevance
+
+
+def _ranked(relevance, action, limit):
+    # Stable sort keeps ties in planet/direction order so output is deterministic
+    signed = relevance if action == 'place' else -relevance
+    flat = signed.ravel()
+    order = np.argsort(-flat, kind='stable')
+    ranked = []
+    for position in order:
+        score = flat[position]
+        if score <= 0 or len(ranked) >= limit:
+            break
+        planet, direction = divmod(int(position), DIRECTION_COUNT)
+        planet_name = PLANET_NAMES[planet]
+        direction_name = DIRECTION_NAMES[direction]
+        ranked.append({
+            'planet': planet_name,
+            'direction': direction_name,
+            'score': round(float(score), 4),
+            'recommendation': get_recommendation(planet_name, direction_name, action)
+        })
+    return ranked
+
+
+def parse_chart(chart):
+    """
+    Validate a full chart and encode it as sign codes
+
+    Args:
+        chart (dict or list): {planet: sign} or [{'planet': ..., 'sign': ...}]
+
+    Returns:
+        tuple: (sign codes as bytes, list of error strings)
+    """
+    if isinstance(chart, list):
+        entries = {}
+        for entry in chart:
+            if not isinstance(entry, dict) or not isinstance(entry.get('planet'), str):
+                return None, ['Each chart entry must be an object with planet and sign']
+            entries[entry['planet']] = entry.get('sign')
+        chart = entries
+
+    if not isinstance(chart, dict):
+        return None, ['chart must be an object or an array']
+
+    codes, errors = encode_chart(chart)
+    missing = [PLANET_NAMES[p] for p, sign in enumerate(codes) if sign == 255]
+    if missing and not errors:
+        errors.append(f'Chart is missing planets: {", ".join(missing)}')
+    return codes, errors
+
+
+def analyze_chart(sign_codes, limit=10):
+    """
+    Compute strengths, the planet x direction relevance matrix and ranked
+    place/remove recommendations for one encoded chart
+
+    Args:
+        sign_codes (bytes): Nine sign codes from parse_chart
+        limit (int): Maximum recommendations per action
+
+    Returns:
+        dict: Analysis ready to be returned as JSON
+    """
+    strengths, relevance = score_charts([list(sign_codes)])
+    strengths = strengths[0]
+    relevance = relevance[0]
+
+    planets = []
+    for planet, sign in enumerate(sign_codes):
+        code = int(strengths[planet])
+        planets.append({
+            'planet': PLANET_NAMES[planet],
+            'sign': SIGN_NAMES[sign],
+            'strength': STRENGTH_NAMES[code],
+            'is_exalted': code == Strength.EXALTED,
+            'is_debilitated': code == Strength.DEBILITATED
+        })
+
+    return {
+        'planets': planets,
+        'relevance_matrix': {
+            'planets': list(PLANET_NAMES),
+            'directions': list(DIRECTION_NAMES),
+            'values': np.round(relevance, 4).tolist()
+        },
+        'place_recommendations': _ranked(relevance, 'place', limit),
+        'remove_recommendations': _ranked(relevance, 'remove', limit)
+    }
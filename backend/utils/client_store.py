@@ -0,0 +1,414 @@
+# SQLite client record store
+# Keeps each client's normalized form data server side so a report can be
+# regenerated from a client id instead of the browser re-sending the whole
+# form. Large base64 blobs (house map images, the Kundli PDF) are stored
+# once per content hash in an assets table and referenced from the form
+# data as {"$asset": "<sha256>"}. Every client form and report version
+# lists the assets it uses in asset_refs, and an asset is deleted as soon
+# as nothing refers to it. Name, date of birth and place of birth are
+# indexed for lookups. The database runs in WAL mode so readers never
+# block the single writer; connections are per thread and per process.
+
+import base64
+import binascii
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+
+CLIENT_DB_PATH = os.getenv("CLIENT_DB_PATH", "clients.db")
+CLIENT_DB_BUSY_TIMEOUT_MS = int(os.getenv("CLIENT_DB_BUSY_TIMEOUT_MS", "5000"))
+
+CLIENT_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+# Form fields holding base64 blobs: a single data URL or a list of them
+ASSET_FIELDS = ('houseMapImages', 'kundliPdf')
+ASSET_REF = '$asset'
+# Asset references in stored JSON (form_json, version data), for the asset_refs backfill
+_ASSET_REF_JSON = re.compile(r'"\$asset":"([0-9a-f]{64})"')
+_DATA_URL = re.compile(r'^(data:[\w.+-]+/[\w.+-]+;base64,)(.*)$', re.DOTALL)
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS clients (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL DEFAULT '',
+        name_key TEXT NOT NULL DEFAULT '',
+        date_of_birth TEXT NOT NULL DEFAULT '',
+        place_of_birth TEXT NOT NULL DEFAULT '',
+        place_key TEXT NOT NULL DEFAULT '',
+        form_json TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS clients_name ON clients (name_key)",
+    "CREATE INDEX IF NOT EXISTS clients_dob ON clients (date_of_birth, name_key)",
+    "CREATE INDEX IF NOT EXISTS clients_place ON clients (place_key, name_key)",
+    """CREATE TABLE IF NOT EXISTS assets (
+        hash TEXT PRIMARY KEY,
+        prefix TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        data BLOB NOT NULL,
+        created_at TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS client_reports (
+        report_id TEXT PRIMARY KEY,
+        client_id TEXT NOT NULL REFERENCES clients (id) ON DELETE CASCADE,
+        report_type TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS client_reports_client ON client_reports (client_id, created_at)",
+    # version 0 is the client's current form, n > 0 is report version n (see report_history)
+    """CREATE TABLE IF NOT EXISTS asset_refs (
+        client_id TEXT NOT NULL REFERENCES clients (id) ON DELETE CASCADE,
+        version INTEGER NOT NULL,
+        hash TEXT NOT NULL,
+        PRIMARY KEY (client_id, version, hash)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS asset_refs_hash ON asset_refs (hash)",
+)
+SCHEMA_VERSION = 1
+
+
+class ClientNotFound(LookupError):
+    """No stored client with the requested id"""
+
+
+class ClientChanged(RuntimeError):
+    """The stored client was updated since the revision the caller read"""
+
+
+def is_valid_client_id(client_id):
+    """Check a client-supplied client id before querying with it"""
+    return bool(CLIENT_ID_PATTERN.match(client_id or ''))
+
+
+def normalize_text(value):
+    """Lookup form of a name or place: 'New  Delhi ' and 'new delhi' match"""
+    return ' '.join(str(value or '').split()).casefold()
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def _revision(form_json):
+    return hashlib.sha256(form_json.encode('utf-8')).hexdigest()[:16]
+
+
+def asset_hashes(form):
+    """Hashes of the assets a normalized form (or a diff's 'set' part) refers to"""
+    hashes = set()
+    for key in ASSET_FIELDS:
+        value = form.get(key)
+        for ref in value if isinstance(value, list) else [value]:
+            if isinstance(ref, dict) and ASSET_REF in ref:
+                hashes.add(ref[ASSET_REF])
+    return hashes
+
+
+def _split_asset(value):
+    """
+    Split a base64 blob into (prefix, raw bytes)
+
+    Returns:
+        tuple: ('data:image/png;base64,', bytes), ('', bytes) for bare base64,
+            or None when the value is not decodable base64
+    """
+    match = _DATA_URL.match(value)
+    prefix, payload = (match.group(1), match.group(2)) if match else ('', value)
+    try:
+        return prefix, base64.b64decode(payload, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+
+
+class ClientStore:
+    """Client records, their assets and generated report ids in one SQLite file"""
+
+    def __init__(self, path=CLIENT_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def connection(self):
+        """This thread's connection, opened on first use (and again after a fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=CLIENT_DB_BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA foreign_keys=ON')
+        with self._schema_lock:
+            if not self._schema_ready:
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+                self._migrate(conn)
+                self._schema_ready = True
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _migrate(self, conn):
+        if conn.execute('PRAGMA user_version').fetchone()[0] >= SCHEMA_VERSION:
+            return
+        with _Transaction(conn):
+            # Databases from before asset_refs: reference every asset still in use
+            # so the first update or delete doesn't remove shared assets
+            rows = [(row[0], 0, row[1]) for row in conn.execute('SELECT id, form_json FROM clients')]
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'client_versions'").fetchone():
+                rows += list(conn.execute('SELECT client_id, version, data FROM client_versions'))
+            conn.executemany(
+                'INSERT OR IGNORE INTO asset_refs (client_id, version, hash) VALUES (?, ?, ?)',
+                [(client_id, version, digest) for client_id, version, data in rows
+                 for digest in set(_ASSET_REF_JSON.findall(data))]
+            )
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def transaction(self):
+        """Context manager for one write transaction (BEGIN IMMEDIATE ... COMMIT)"""
+        return _Transaction(self.connection())
+
+    # Assets
+
+    def _store_asset(self, conn, value):
+        """Store a base64 blob once by content hash; returns its reference or the value unchanged"""
+        if not isinstance(value, str) or not value:
+            return value
+        split = _split_asset(value)
+        if split is None:
+            return value
+        prefix, data = split
+        digest = hashlib.sha256(data).hexdigest()
+        conn.execute(
+            'INSERT OR IGNORE INTO assets (hash, prefix, size, data, created_at) VALUES (?, ?, ?, ?, ?)',
+            (digest, prefix, len(data), data, _now())
+        )
+        return {ASSET_REF: digest}
+
+    def _load_asset(self, conn, ref):
+        if not isinstance(ref, dict) or ASSET_REF not in ref:
+            return ref
+        row = conn.execute('SELECT prefix, data FROM assets WHERE hash = ?', (ref[ASSET_REF],)).fetchone()
+        if row is None:
+            return None
+        return row['prefix'] + base64.b64encode(row['data']).decode('ascii')
+
+    def add_asset_refs(self, conn, client_id, version, hashes):
+        """Record that a client's form (version 0) or report version uses these assets"""
+        conn.executemany(
+            'INSERT OR IGNORE INTO asset_refs (client_id, version, hash) VALUES (?, ?, ?)',
+            [(client_id, version, digest) for digest in hashes]
+        )
+
+    def _release_assets(self, conn, hashes):
+        """Delete those of these assets that no client form or report version uses any more"""
+        conn.executemany(
+            'DELETE FROM assets WHERE hash = ? AND NOT EXISTS (SELECT 1 FROM asset_refs WHERE hash = ?)',
+            [(digest, digest) for digest in hashes]
+        )
+
+    def normalize_form(self, conn, form_data):
+        """
+        Normalized copy of form data: strings trimmed, empty values dropped and
+        blobs replaced by asset references
+        """
+        normalized = {}
+        for key, value in form_data.items():
+            if key in ASSET_FIELDS:
+                if isinstance(value, list):
+                    value = [self._store_asset(conn, item) for item in value]  # positions pair with houseMapAnalyses
+                else:
+                    value = self._store_asset(conn, value)
+            elif isinstance(value, str):
+                value = value.strip()
+            if value is None or value == '' or value == []:
+                continue
+            normalized[key] = value
+        return normalized
+
+    def expand_form(self, conn, normalized):
+        """Form data with asset references replaced by their base64 blobs again"""
+        form_data = dict(normalized)
+        for key in ASSET_FIELDS:
+            value = form_data.get(key)
+            if isinstance(value, list):
+                form_data[key] = [self._load_asset(conn, ref) or '' for ref in value]
+            elif value is not None:
+                form_data[key] = self._load_asset(conn, value)
+        return form_data
+
+    # Clients
+
+    def save_client(self, form_data, client_id=None, expected_revision=None):
+        """
+        Insert a client, or replace an existing client's form data
+
+        Args:
+            expected_revision (str): Only replace the form if it is still at
+                this revision (see get_client)
+
+        Returns:
+            str: Client id
+
+        Raises:
+            ClientNotFound: client_id was given but is not stored
+            ClientChanged: The stored form is no longer at expected_revision
+        """
+        now = _now()
+        with self.transaction() as conn:
+            normalized = self.normalize_form(conn, form_data)
+            columns = (
+                str(normalized.get('name', '')),
+                normalize_text(normalized.get('name')),
+                str(normalized.get('dateOfBirth', '')),
+                str(normalized.get('placeOfBirth', '')),
+                normalize_text(normalized.get('placeOfBirth')),
+                json.dumps(normalized, ensure_ascii=False, separators=(',', ':'))
+            )
+            if client_id is None:
+                client_id = uuid.uuid4().hex
+                conn.execute(
+                    'INSERT INTO clients (name, name_key, date_of_birth, place_of_birth, place_key, form_json, '
+                    'id, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    columns + (client_id, now, now)
+                )
+                self.add_asset_refs(conn, client_id, 0, asset_hashes(normalized))
+            else:
+                if expected_revision is not None:
+                    row = conn.execute('SELECT form_json FROM clients WHERE id = ?', (client_id,)).fetchone()
+                    if row is not None and _revision(row['form_json']) != expected_revision:
+                        raise ClientChanged(client_id)
+                updated = conn.execute(
+                    'UPDATE clients SET name = ?, name_key = ?, date_of_birth = ?, place_of_birth = ?, '
+                    'place_key = ?, form_json = ?, updated_at = ? WHERE id = ?',
+                    columns + (now, client_id)
+                ).rowcount
+                if not updated:
+                    raise ClientNotFound(client_id)
+                previous = {row[0] for row in conn.execute(
+                    'SELECT hash FROM asset_refs WHERE client_id = ? AND version = 0', (client_id,))}
+                current = asset_hashes(normalized)
+                conn.execute('DELETE FROM asset_refs WHERE client_id = ? AND version = 0', (client_id,))
+                self.add_asset_refs(conn, client_id, 0, current)
+                self._release_assets(conn, previous - current)
+        return client_id
+
+    def get_client(self, client_id, expand_assets=True):
+        """
+        Stored client as {'id', 'created_at', 'updated_at', 'revision', 'form_data'}
+
+        revision is a hash of the stored form; it changes with every update.
+
+        Args:
+            expand_assets (bool): Inline the base64 blobs (False keeps asset references)
+
+        Raises:
+            ClientNotFound: No client with this id
+        """
+        conn = self.connection()
+        # One read snapshot, so a concurrent update can't release assets between the two reads
+        conn.execute('BEGIN')
+        try:
+            row = conn.execute('SELECT id, form_json, created_at, updated_at FROM clients WHERE id = ?',
+                               (client_id,)).fetchone()
+            if row is None:
+                raise ClientNotFound(client_id)
+            form_data = json.loads(row['form_json'])
+            if expand_assets:
+                form_data = self.expand_form(conn, form_data)
+        finally:
+            conn.execute('COMMIT')
+        return {'id': row['id'], 'created_at': row['created_at'], 'updated_at': row['updated_at'],
+                'revision': _revision(row['form_json']),
+                'form_data': form_data}
+
+    def find_clients(self, name=None, date_of_birth=None, place=None, limit=50, offset=0):
+        """
+        Look up clients by name prefix, exact date of birth and/or place of birth
+
+        Every filter is served by an index: names are matched as a range on
+        the normalized name, so a prefix search never scans the table.
+
+        Returns:
+            list: [{'id', 'name', 'date_of_birth', 'place_of_birth', 'updated_at'}]
+        """
+        clauses, params = [], []
+        name_key = normalize_text(name)
+        if name_key:
+            clauses.append('name_key >= ? AND name_key < ?')
+            params.extend([name_key, name_key + '\U0010ffff'])
+        if date_of_birth:
+            clauses.append('date_of_birth = ?')
+            params.append(str(date_of_birth).strip())
+        place_key = normalize_text(place)
+        if place_key:
+            clauses.append('place_key = ?')
+            params.append(place_key)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self.connection().execute(
+            f'SELECT id, name, date_of_birth, place_of_birth, updated_at FROM clients {where} '
+            'ORDER BY name_key, id LIMIT ? OFFSET ?',
+            params + [limit, offset]
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def delete_client(self, client_id):
+        """Delete a client, its report records and the assets only it used; returns whether it existed"""
+        with self.transaction() as conn:
+            hashes = {row[0] for row in conn.execute('SELECT hash FROM asset_refs WHERE client_id = ?', (client_id,))}
+            # Cascades to the client's reports, versions and asset_refs
+            deleted = bool(conn.execute('DELETE FROM clients WHERE id = ?', (client_id,)).rowcount)
+            self._release_assets(conn, hashes)
+        return deleted
+
+    # Reports
+
+    def add_report(self, client_id, report_id, report_type):
+        """Record a report generated for a stored client"""
+        with self.transaction() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO client_reports (report_id, client_id, report_type, created_at) '
+                'VALUES (?, ?, ?, ?)',
+                (report_id, client_id, report_type, _now())
+            )
+
+    def list_reports(self, client_id):
+        rows = self.connection().execute(
+            'SELECT report_id, report_type, created_at FROM client_reports WHERE client_id = ? '
+            'ORDER BY created_at DESC, report_id',
+            (client_id,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self):
+        conn = self.connection()
+        clients = conn.execute('SELECT COUNT(*) FROM clients').fetchone()[0]
+        assets, asset_bytes = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM assets').fetchone()
+        reports = conn.execute('SELECT COUNT(*) FROM client_reports').fetchone()[0]
+        return {'clients': clients, 'assets': assets, 'asset_bytes': asset_bytes, 'reports': reports}
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE so concurrent writers queue on the busy timeout instead of failing mid-transaction"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
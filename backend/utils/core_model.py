@@ -0,0 +1,237 @@
+# Compact core model for planets, zodiac signs and Vastu directions
+# Names are resolved to small int enums once at the API edge; associations
+# are stored as bitmasks and flat byte arrays so whole charts (or many
+# clients) can be evaluated with plain integer work.
+
+from array import array
+from enum import IntEnum
+
+from .vastu_directions import VASTU_DIRECTIONS
+
+
+class Planet(IntEnum):
+    SUN = 0
+    MOON = 1
+    MARS = 2
+    MERCURY = 3
+    JUPITER = 4
+    VENUS = 5
+    SATURN = 6
+    RAHU = 7
+    KETU = 8
+
+
+class Sign(IntEnum):
+    ARIES = 0
+    TAURUS = 1
+    GEMINI = 2
+    CANCER = 3
+    LEO = 4
+    VIRGO = 5
+    LIBRA = 6
+    SCORPIO = 7
+    SAGITTARIUS = 8
+    CAPRICORN = 9
+    AQUARIUS = 10
+    PISCES = 11
+
+
+class Direction(IntEnum):
+    # Same order as the 'number' field in VASTU_DIRECTIONS (minus one)
+    EAST = 0
+    WEST = 1
+    NORTH = 2
+    SOUTH = 3
+    NORTH_EAST = 4
+    NORTH_WEST = 5
+    SOUTH_EAST = 6
+    SOUTH_WEST = 7
+    EAST_NORTH_EAST = 8
+    EAST_SOUTH_EAST = 9
+    SOUTH_SOUTH_EAST = 10
+    SOUTH_SOUTH_WEST = 11
+    WEST_SOUTH_WEST = 12
+    WEST_NORTH_WEST = 13
+    NORTH_NORTH_WEST = 14
+    NORTH_NORTH_EAST = 15
+
+
+class Strength(IntEnum):
+    NEUTRAL = 0
+    EXALTED = 1
+    OWN_SIGN = 2
+    DEBILITATED = 3
+
+
+PLANET_COUNT = len(Planet)
+SIGN_COUNT = len(Sign)
+DIRECTION_COUNT = len(Direction)
+
+# Display names used by the knowledge tables and the API
+PLANET_NAMES = ('Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn', 'Rahu', 'Ketu')
+SIGN_NAMES = (
+    'Aries', 'Taurus', 'Gemini', 'Cancer', 'Leo', 'Virgo',
+    'Libra', 'Scorpio', 'Sagittarius', 'Capricorn', 'Aquarius', 'Pisces'
+)
+DIRECTION_NAMES = tuple(
+    name for name, _ in sorted(VASTU_DIRECTIONS.items(), key=lambda item: item[1]['number'])
+)
+STRENGTH_NAMES = ('neutral', 'exalted', 'own_sign', 'debilitated')
+
+_PLANET_BY_NAME = {name: Planet(i) for i, name in enumerate(PLANET_NAMES)}
+_SIGN_BY_NAME = {name: Sign(i) for i, name in enumerate(SIGN_NAMES)}
+_DIRECTION_BY_NAME = {name: Direction(i) for i, name in enumerate(DIRECTION_NAMES)}
+
+
+def planet_from_name(name):
+    """Resolve a planet name (e.g., 'Sun') to a Planet, or None if unknown"""
+    try:
+        return _PLANET_BY_NAME.get(name)
+    except TypeError:  # unhashable input from a JSON body
+        return None
+
+
+def sign_from_name(name):
+    """Resolve a zodiac sign name (e.g., 'Aries') to a Sign, or None if unknown"""
+    try:
+        return _SIGN_BY_NAME.get(name)
+    except TypeError:
+        return None
+
+
+def direction_from_name(name):
+    """Resolve a direction name (e.g., 'North-East') to a Direction, or None if unknown"""
+    try:
+        return _DIRECTION_BY_NAME.get(name)
+    except TypeError:
+        return None
+
+
+def names_from_mask(mask, names):
+    """Expand a bitmask back into display names (used at the API edge only)"""
+    return [name for i, name in enumerate(names) if mask >> i & 1]
+
+
+class PlanetRecord:
+    """Classical facts for one planet as enum values and bitmasks"""
+
+    __slots__ = ('planet', 'ruled_signs_mask', 'exaltation', 'debilitation', 'directions_mask')
+
+    def __init__(self, planet, ruled_signs_mask, exaltation, debilitation, directions_mask):
+        self.planet = planet
+        self.ruled_signs_mask = ruled_signs_mask
+        self.exaltation = exaltation
+        self.debilitation = debilitation
+        self.directions_mask = directions_mask
+
+
+class DirectionRecord:
+    """Planets that influence one Vastu direction, as a bitmask"""
+
+    __slots__ = ('direction', 'planets_mask')
+
+    def __init__(self, direction, planets_mask):
+        self.direction = direction
+        self.planets_mask = planets_mask
+
+
+def _build_direction_records():
+    records = []
+    for direction in Direction:
+        info = VASTU_DIRECTIONS[DIRECTION_NAMES[direction]]
+        mask = 0
+        for name in info['planets']:
+            mask |= 1 << _PLANET_BY_NAME[name]
+        records.append(DirectionRecord(direction, mask))
+    return tuple(records)
+
+
+DIRECTION_RECORDS = _build_direction_records()
+
+
+def build_planet_records(classical):
+    """
+    Build PlanetRecord entries from the classical planet table
+
+    Args:
+        classical (dict): Table shaped like PLANET_ZODIAC_CLASSICAL
+
+    Returns:
+        tuple: PlanetRecord per Planet, indexable by the enum value
+    """
+    records = []
+    for planet in Planet:
+        info = classical[PLANET_NAMES[planet]]
+        ruled_mask = 0
+        for name in info['ruled_signs']:
+            ruled_mask |= 1 << _SIGN_BY_NAME[name]
+        directions_mask = 0
+        for record in DIRECTION_RECORDS:
+            if record.planets_mask >> planet & 1:
+                directions_mask |= 1 << record.direction
+        records.append(PlanetRecord(
+            planet,
+            ruled_mask,
+            _SIGN_BY_NAME[info['exaltation_sign']],
+            _SIGN_BY_NAME[info['debilitation_sign']],
+            directions_mask
+        ))
+    return tuple(records)
+
+
+def build_strength_table(planet_records):
+    """
+    Precompute the Strength code for every planet/sign pair
+
+    Precedence matches the classical rules used throughout the app:
+    exalted, then own sign, then debilitated, otherwise neutral.
+
+    Returns:
+        array: Flat byte array indexed by planet * SIGN_COUNT + sign
+    """
+    table = array('B', bytes(PLANET_COUNT * SIGN_COUNT))
+    for record in planet_records:
+        for sign in Sign:
+            if record.exaltation == sign:
+                code = Strength.EXALTED
+            elif record.ruled_signs_mask >> sign & 1:
+                code = Strength.OWN_SIGN
+            elif record.debilitation == sign:
+                code = Strength.DEBILITATED
+            else:
+                code = Strength.NEUTRAL
+            table[record.planet * SIGN_COUNT + sign] = code
+    return table
+
+
+def encode_chart(chart):
+    """
+    Encode a {planet name: sign name} chart as one sign code per planet
+
+    Args:
+        chart (dict): Mapping of planet names to sign names
+
+    Returns:
+        tuple: (bytes of length PLANET_COUNT, list of unresolved entries).
+        Missing or unknown planets are stored as 255.
+    """
+    codes = bytearray(b'\xff' * PLANET_COUNT)
+    errors = []
+    for planet_name, sign_name in chart.items():
+        planet = planet_from_name(planet_name)
+        sign = sign_from_name(sign_name)
+        if planet is None:
+            errors.append(f'Unknown planet "{planet_name}"')
+        elif sign is None:
+            errors.append(f'Unknown sign "{sign_name}" for {planet_name}')
+        else:
+            codes[planet] = sign
+    return bytes(codes), errors
+
+
+def chart_strengths(strength_table, chart_codes):
+    """Look up the Strength code for each planet of an encoded chart (255 stays 255)"""
+    return bytes(
+        strength_table[planet * SIGN_COUNT + sign] if sign != 255 else 255
+        for planet, sign in enumerate(chart_codes)
+    )
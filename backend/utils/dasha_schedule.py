@@ -0,0 +1,408 @@
+# Dasha rollover scheduling
+# A report prints the client's current pratyantardasha period, so it goes
+# stale when that period ends. A stored client is scheduled when a report
+# with a period end date is generated for them, with one row per client
+# (rollover time, status) in the client store's database; ad-hoc reports
+# from the anonymous endpoint are never kept or scheduled. Every save takes
+# a new sequence number, which the scheduler uses as its scan cursor.
+# A separate, low-priority scheduler process keeps their rollover times in
+# a heap and, shortly before a period ends, moves each client to the next
+# period and regenerates the report in small, rate-limited batches
+# on a process pool. Regenerated reports are recorded like interactive
+# ones (retention index, the client's report list and versions, search).
+# The next period follows from the form's dasha planets (Vimshottari order);
+# clients whose form lacks them are marked stale. Failed renders are
+# retried with exponential backoff.
+
+import heapq
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from .bulk_reports import render_report
+from .client_store import ClientChanged, ClientNotFound
+
+DASHA_REGEN_LEAD_HOURS = float(os.getenv("DASHA_REGEN_LEAD_HOURS", "24"))
+DASHA_REGEN_BATCH_SIZE = int(os.getenv("DASHA_REGEN_BATCH_SIZE", "10"))
+DASHA_REGEN_MAX_PER_MINUTE = float(os.getenv("DASHA_REGEN_MAX_PER_MINUTE", "30"))
+DASHA_REGEN_WORKERS = int(os.getenv("DASHA_REGEN_WORKERS", "1"))
+DASHA_POLL_SECONDS = float(os.getenv("DASHA_POLL_SECONDS", "60"))
+DASHA_RETRY_BASE_SECONDS = float(os.getenv("DASHA_RETRY_BASE_SECONDS", "60"))
+DASHA_RETRY_MAX_SECONDS = float(os.getenv("DASHA_RETRY_MAX_SECONDS", "3600"))
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS dasha_schedule (
+        client_id TEXT PRIMARY KEY REFERENCES clients (id) ON DELETE CASCADE,
+        report_type TEXT NOT NULL,
+        report_id TEXT,
+        status TEXT NOT NULL,
+        rollover_at TEXT NOT NULL,
+        stale_since TEXT,
+        regenerated_at TEXT,
+        updated_at TEXT NOT NULL,
+        seq INTEGER NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS dasha_schedule_by_seq ON dasha_schedule (seq)",
+    # Every save takes the next number inside its write transaction, so saves
+    # commit in sequence order and numbers are never reused: a scheduler
+    # that has seen sequence n has seen every save numbered n or lower
+    """CREATE TABLE IF NOT EXISTS dasha_schedule_seq (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        seq INTEGER NOT NULL DEFAULT 0
+    )""",
+    "INSERT OR IGNORE INTO dasha_schedule_seq (id) VALUES (0)",
+)
+_COLUMNS = ('client_id', 'report_type', 'report_id', 'status', 'rollover_at', 'stale_since', 'regenerated_at',
+            'updated_at')
+
+# Vimshottari dasha lords in sequence, with the years of each one's mahadasha
+VIMSHOTTARI_YEARS = (
+    ('Ketu', 7), ('Venus', 20), ('Sun', 6), ('Moon', 10), ('Mars', 7),
+    ('Rahu', 18), ('Jupiter', 16), ('Saturn', 19), ('Mercury', 17)
+)
+VIMSHOTTARI_TOTAL_YEARS = 120
+DAYS_PER_YEAR = 365.25
+
+DASHA_LEVELS = ('mahadasha', 'antardasha', 'pratyantardasha')
+# Per-planet details a dasha level shows next to its planet (see report_model.format_dasha)
+_PLANET_DETAILS = ('no_star', 'source', 'nl', 'nl_source', 'additional_house', 'sl', 'sl_source')
+
+_LORDS = tuple(planet for planet, _ in VIMSHOTTARI_YEARS)
+_YEARS = dict(VIMSHOTTARI_YEARS)
+_LORD_NAMES = {planet.casefold(): planet for planet in _LORDS}
+
+
+def rollover_time(form_data):
+    """
+    When the current pratyantardasha ends
+
+    Returns:
+        datetime: Midnight after pratyantardasha_period_to, or None if unknown
+    """
+    period_to = form_data.get('pratyantardasha_period_to')
+    if not isinstance(period_to, str):
+        return None
+    try:
+        return datetime.strptime(period_to, '%Y-%m-%d') + timedelta(days=1)
+    except ValueError:
+        return None
+
+
+def _next_lord(planet):
+    return _LORDS[(_LORDS.index(planet) + 1) % len(_LORDS)]
+
+
+def advance_pratyantardasha(form_data):
+    """
+    Move a client's form data to their next pratyantardasha
+
+    The next lords follow the Vimshottari sequence from the form's
+    mahadasha, antardasha and pratyantardasha planets: pratyantardashas run
+    from the antardasha lord onwards, and when the last one ends the
+    antardasha (and after its last antardasha, the mahadasha) moves on too.
+    A pratyantardasha lasts MD years x AD years x PD years / 120^2 years,
+    to the day. A level whose planet changes takes the planet's details
+    (NL, SL, sources, additional house, no star) from another level of the
+    form showing the same planet, and leaves them empty otherwise.
+
+    Returns:
+        dict: Updated copy of the form data, or None when a dasha planet or
+            the period end date is missing
+    """
+    current_end = rollover_time(form_data)
+    lords = [_LORD_NAMES.get(str(form_data.get(f'{level}_planet', '')).strip().casefold())
+             for level in DASHA_LEVELS]
+    if current_end is None or None in lords:
+        return None
+
+    mahadasha, antardasha, pratyantardasha = lords
+    pratyantardasha = _next_lord(pratyantardasha)
+    if pratyantardasha == antardasha:
+        antardasha = _next_lord(antardasha)
+        if antardasha == mahadasha:
+            mahadasha = antardasha = _next_lord(mahadasha)
+        pratyantardasha = antardasha
+
+    details = {}
+    for level, planet in zip(DASHA_LEVELS, lords):
+        details.setdefault(planet, {key: form_data[f'{level}_{key}'] for key in _PLANET_DETAILS
+                                    if f'{level}_{key}' in form_data})
+
+    advanced = dict(form_data)
+    for level, old, new in zip(DASHA_LEVELS, lords, (mahadasha, antardasha, pratyantardasha)):
+        if new == old:
+            continue
+        advanced[f'{level}_planet'] = new
+        for key in _PLANET_DETAILS:
+            advanced.pop(f'{level}_{key}', None)
+        advanced.update({f'{level}_{key}': value for key, value in details.get(new, {}).items()})
+
+    years = _YEARS[mahadasha] * _YEARS[antardasha] * _YEARS[pratyantardasha] / VIMSHOTTARI_TOTAL_YEARS ** 2
+    period_to = current_end + timedelta(days=round(years * DAYS_PER_YEAR) - 1)
+    advanced['pratyantardasha_period_from'] = current_end.strftime('%Y-%m-%d')
+    advanced['pratyantardasha_period_to'] = period_to.strftime('%Y-%m-%d')
+    return advanced
+
+
+class ClientScheduleStore:
+    """Scheduled clients, in the client store's database beside the clients they refer to"""
+
+    def __init__(self, clients):
+        self.clients = clients
+        self._schema_ready = False
+
+    def _connection(self):
+        conn = self.clients.connection()
+        if not self._schema_ready:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            self._schema_ready = True
+        return conn
+
+    def save(self, record):
+        """
+        Insert or replace a client's schedule under a new sequence number
+
+        Returns:
+            bool: False when the client has been deleted from the client store
+        """
+        self._connection()
+        with self.clients.transaction() as conn:
+            conn.execute('UPDATE dasha_schedule_seq SET seq = seq + 1 WHERE id = 0')
+            seq = conn.execute('SELECT seq FROM dasha_schedule_seq WHERE id = 0').fetchone()[0]
+            values = tuple(record.get(column) for column in _COLUMNS)
+            return bool(conn.execute(
+                f'INSERT INTO dasha_schedule ({", ".join(_COLUMNS)}, seq) '
+                f'SELECT {", ".join("?" * len(_COLUMNS))}, ? WHERE EXISTS (SELECT 1 FROM clients WHERE id = ?) '
+                f'ON CONFLICT (client_id) DO UPDATE SET '
+                f'{", ".join(f"{column} = excluded.{column}" for column in _COLUMNS[1:])}, seq = excluded.seq',
+                values + (seq, record['client_id'])
+            ).rowcount)
+
+    def remove(self, client_id):
+        self._connection().execute('DELETE FROM dasha_schedule WHERE client_id = ?', (client_id,))
+
+    def load(self, client_id):
+        """
+        Returns:
+            tuple: (record, version) or (None, None); version changes on every save
+        """
+        row = self._connection().execute(
+            f'SELECT {", ".join(_COLUMNS)}, seq FROM dasha_schedule WHERE client_id = ?', (client_id,)
+        ).fetchone()
+        if row is None:
+            return None, None
+        return {column: row[column] for column in _COLUMNS}, row['seq']
+
+    def scan(self, since_version=0):
+        """Yield (client id, record, version) for clients saved after since_version, in save order"""
+        rows = self._connection().execute(
+            f'SELECT {", ".join(_COLUMNS)}, seq FROM dasha_schedule WHERE seq > ? ORDER BY seq',
+            (since_version,)
+        )
+        for row in rows:
+            yield row['client_id'], {column: row[column] for column in _COLUMNS}, row['seq']
+
+    def register(self, form_data, report_type, report_id, client_id):
+        """
+        Schedule a stored client after a report was generated for them, if
+        the report has a period end date
+
+        Returns:
+            bool: Whether the client was scheduled
+        """
+        rollover = rollover_time(form_data)
+        if rollover is None:
+            return False
+        return self.save({
+            'client_id': client_id,
+            'report_type': report_type,
+            'report_id': report_id,
+            'status': 'scheduled',
+            'rollover_at': rollover.isoformat(),
+            'updated_at': datetime.now().isoformat()
+        })
+
+    def status_counts(self):
+        rows = self._connection().execute('SELECT status, COUNT(*) FROM dasha_schedule GROUP BY status')
+        return {status: count for status, count in rows}
+
+
+class DashaRolloverScheduler:
+    """
+    Min-heap of (regenerate at, client id, version) driving batch regeneration
+
+    Entries are invalidated lazily: a popped entry whose version no longer
+    matches the stored client (re-registered or already rolled over) is
+    dropped, and the newer entry stays in the heap. A failed render is
+    pushed back with the same version after an exponential backoff.
+    """
+
+    def __init__(self, store, records, lead_hours=DASHA_REGEN_LEAD_HOURS,
+                 batch_size=DASHA_REGEN_BATCH_SIZE, max_per_minute=DASHA_REGEN_MAX_PER_MINUTE,
+                 workers=DASHA_REGEN_WORKERS, retry_base_seconds=DASHA_RETRY_BASE_SECONDS,
+                 retry_max_seconds=DASHA_RETRY_MAX_SECONDS, staging_dir=None):
+        """
+        Args:
+            store (ClientScheduleStore): Scheduled clients
+            records (ReportRecords): Where regenerated reports are stored and recorded
+            staging_dir (str): Where reports are rendered before they are stored;
+                on the report store's filesystem they are moved, not copied
+        """
+        self.store = store
+        self.clients = store.clients
+        self.records = records
+        self.lead = timedelta(hours=lead_hours)
+        self.batch_size = batch_size
+        self.min_interval = 60.0 / max_per_minute if max_per_minute > 0 else 0.0
+        self.workers = workers
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+
+        self._heap = []
+        self._versions = {}
+        self._attempts = {}
+        self._scanned_version = 0
+        self._staging_dir = staging_dir or os.path.join(tempfile.gettempdir(), f'dasha-rendering-{os.getpid()}')
+        self.stats = {'regenerated': 0, 'stale': 0, 'failed': 0, 'removed': 0}
+
+    def _push(self, record, version):
+        rollover = datetime.fromisoformat(record['rollover_at'])
+        self._versions[record['client_id']] = version
+        heapq.heappush(self._heap, ((rollover - self.lead).timestamp(), record['client_id'], version))
+
+    def _retry(self, client_id, version, failed=True):
+        """
+        Queue a client again: after a backoff when its render failed, right
+        away when it only needs the stored client read again
+
+        Returns:
+            float: Seconds until the retry
+        """
+        delay = 0.0
+        if failed:
+            attempts = self._attempts[client_id] = self._attempts.get(client_id, 0) + 1
+            delay = min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempts - 1))
+        heapq.heappush(self._heap, (time.time() + delay, client_id, version))
+        return delay
+
+    def refresh(self):
+        """Pick up clients registered or changed since the last scan"""
+        for _, record, version in self.store.scan(self._scanned_version):
+            self._scanned_version = max(self._scanned_version, version)
+            if record.get('status') == 'scheduled' and record.get('rollover_at'):
+                self._push(record, version)
+
+    def next_due(self):
+        """Timestamp of the earliest pending regeneration, or None"""
+        while self._heap and self._versions.get(self._heap[0][1]) != self._heap[0][2]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        """Up to batch_size current (record, version) pairs whose regeneration time has come"""
+        batch = []
+        while len(batch) < self.batch_size and self.next_due() is not None and self._heap[0][0] <= now:
+            _, client_id, version = heapq.heappop(self._heap)
+            record, current_version = self.store.load(client_id)
+            if record is None or current_version != version or record.get('status') != 'scheduled':
+                continue
+            batch.append((record, version))
+        return batch
+
+    def run_batch(self, pool, batch):
+        """Roll a batch of clients over, rendering the ones with a known next period"""
+        os.makedirs(self._staging_dir, exist_ok=True)
+        futures = {}
+        for record, version in batch:
+            try:
+                client = self.clients.get_client(record['client_id'])
+            except ClientNotFound:
+                # Deleted from the client store since it was loaded
+                self.store.remove(record['client_id'])
+                self.stats['removed'] += 1
+                continue
+
+            rollover = rollover_time(client['form_data'])
+            if rollover is not None and rollover.isoformat() != record['rollover_at']:
+                # Edited since it was scheduled: follow the stored form's period instead
+                record.update(rollover_at=rollover.isoformat(), updated_at=datetime.now().isoformat())
+                self.store.save(record)
+                continue
+
+            advanced = advance_pratyantardasha(client['form_data'])
+            if advanced is None:
+                # Nothing new to print: flag the report instead of re-rendering it
+                record.update(status='stale', stale_since=record['rollover_at'], updated_at=datetime.now().isoformat())
+                self.store.save(record)
+                self.stats['stale'] += 1
+                continue
+            report_type = record.get('report_type') if record.get('report_type') in ('pdf', 'docx') else 'pdf'
+            future = pool.submit(render_report, 0, advanced, report_type, self._staging_dir)
+            futures[future] = (record, version, client, advanced, report_type)
+
+        wait(futures)
+        for future, (record, version, client, advanced, report_type) in futures.items():
+            client_id = record['client_id']
+            try:
+                _, path, error = future.result()
+            except Exception as e:
+                path, error = None, str(e)
+            if error:
+                delay = self._retry(client_id, version)
+                print(f"Dasha regeneration failed for client {client_id}: {error}; retrying in {delay:.0f}s")
+                self.stats['failed'] += 1
+                continue
+
+            try:
+                # Only move the client on if nobody edited it while the report rendered
+                self.clients.save_client(advanced, record['client_id'], expected_revision=client['revision'])
+            except (ClientChanged, ClientNotFound):
+                os.remove(path)
+                self._retry(client_id, version, failed=False)
+                continue
+
+            report_id = self.records.persist(path)
+            self.records.record(report_id, advanced, report_type, record['client_id'])
+            self._attempts.pop(client_id, None)
+            record.update(
+                report_id=report_id,
+                rollover_at=rollover_time(advanced).isoformat(),
+                regenerated_at=datetime.now().isoformat(),
+                updated_at=datetime.now().isoformat()
+            )
+            self.store.save(record)
+            self.stats['regenerated'] += 1
+        return len(futures)
+
+    def run(self, once=False, poll_seconds=DASHA_POLL_SECONDS):
+        """
+        Regenerate due reports until interrupted (or once, for cron-style runs)
+
+        Renders are paced to at most max_per_minute so the scheduler never
+        competes with interactive traffic for long.
+        """
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                while True:
+                    self.refresh()
+                    batch = self.pop_due(time.time())
+                    if batch:
+                        started = time.monotonic()
+                        rendered = self.run_batch(pool, batch)
+                        # Rate limit: spread the batch's renders over at least this long
+                        pause = rendered * self.min_interval - (time.monotonic() - started)
+                        if pause > 0:
+                            time.sleep(pause)
+                        continue
+                    if once:
+                        break
+                    next_due = self.next_due()
+                    sleep_for = poll_seconds if next_due is None else min(poll_seconds, max(1.0, next_due - time.time()))
+                    time.sleep(sleep_for)
+            finally:
+                shutil.rmtree(self._staging_dir, ignore_errors=True)
+        return self.stats
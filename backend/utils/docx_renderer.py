@@ -0,0 +1,155 @@
+# Template-clone DOCX renderer
+# The base document (styles and title), the bordered section table skeleton
+# and one prototype paragraph per style are built once per process. Each
+# report loads the base document from bytes and deep-copies the skeleton and
+# prototypes, so no border, margin or style XML is constructed (or looked up
+# by name) while rendering. Field values in the document model are
+# HTML-escaped for the PDF's paragraph markup; Word text is written as typed.
+
+import html
+from copy import deepcopy
+from io import BytesIO
+
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Pt, RGBColor
+
+from .report_model import REPORT_TITLE
+
+SECTION_TITLE_STYLE = 'Report Section Title'
+FIELD_LABEL_STYLE = 'Report Field Label'
+FIELD_VALUE_STYLE = 'Report Field Value'
+TIMESTAMP_STYLE = 'Report Timestamp'
+
+ORANGE = 'FF8C00'
+
+_template = None  # (base document bytes, section table skeleton, paragraph prototypes)
+
+
+def _add_paragraph_style(doc, name, size, bold=False, italic=False, color=None):
+    style = doc.styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
+    style.base_style = doc.styles['Normal']
+    style.font.name = 'Times New Roman'
+    style.font.size = Pt(size)
+    style.font.bold = bold
+    style.font.italic = italic
+    if color:
+        style.font.color.rgb = color
+    return style
+
+
+def _section_table_skeleton(doc):
+    """A one-cell table with orange borders and cell padding, detached from doc"""
+    table = doc.add_table(rows=1, cols=1)
+    table.autofit = False
+    table.allow_autofit = False
+
+    tblBorders = OxmlElement('w:tblBorders')
+    for border_name in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV']:
+        border = OxmlElement(f'w:{border_name}')
+        border.set(qn('w:val'), 'single')
+        border.set(qn('w:sz'), '16')
+        border.set(qn('w:color'), ORANGE)
+        tblBorders.append(border)
+    table._tbl.tblPr.append(tblBorders)
+
+    tcPr = table.rows[0].cells[0]._element.get_or_add_tcPr()
+    tcMar = OxmlElement('w:tcMar')
+    for margin_name in ['top', 'left', 'bottom', 'right']:
+        margin = OxmlElement(f'w:{margin_name}')
+        margin.set(qn('w:w'), '120')
+        margin.set(qn('w:type'), 'dxa')
+        tcMar.append(margin)
+    tcPr.append(tcMar)
+
+    tbl = table._tbl
+    tbl.getparent().remove(tbl)
+    return tbl
+
+
+def build_template():
+    """Build the base document, section table skeleton and paragraph prototypes"""
+    doc = Document()
+
+    _add_paragraph_style(doc, SECTION_TITLE_STYLE, 18, bold=True, color=RGBColor(255, 140, 0))
+    _add_paragraph_style(doc, FIELD_LABEL_STYLE, 11, bold=True, color=RGBColor(51, 51, 51))
+    _add_paragraph_style(doc, FIELD_VALUE_STYLE, 11)
+    _add_paragraph_style(doc, TIMESTAMP_STYLE, 11, italic=True)
+
+    # Main title with Times New Roman, same for every report
+    title = doc.add_heading(REPORT_TITLE, 0)
+    title.alignment = 1  # Center
+    for run in title.runs:
+        run.font.name = 'Times New Roman'
+        run.font.size = Pt(28)
+    doc.add_paragraph()
+
+    skeleton = _section_table_skeleton(doc)
+
+    # Styled paragraphs holding a single run; rendering only swaps the text
+    prototypes = {}
+    for style_name in (SECTION_TITLE_STYLE, FIELD_LABEL_STYLE, FIELD_VALUE_STYLE, TIMESTAMP_STYLE):
+        p = doc.add_paragraph('-', style_name)._p
+        p.getparent().remove(p)
+        p[-1][-1].set(qn('xml:space'), 'preserve')  # keep user text's spacing
+        prototypes[style_name] = p
+    prototypes[None] = OxmlElement('w:p')  # blank spacing paragraph
+
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue(), skeleton, prototypes
+
+
+def get_template():
+    """The per-process template, built on first use (or in the warmup)"""
+    global _template
+    if _template is None:
+        _template = build_template()
+    return _template
+
+
+def _paragraph(prototypes, style_name=None, text=None):
+    p = deepcopy(prototypes[style_name])
+    if text is not None:
+        p[-1][-1].text = text  # w:p > w:r > w:t
+    return p
+
+
+def render_docx(document, filepath):
+    """
+    Render a document model (see report_model) to a .docx file
+
+    Args:
+        document (dict): Document model
+        filepath (str): Output path
+    """
+    base_bytes, skeleton, prototypes = get_template()
+    doc = Document(BytesIO(base_bytes))
+    sect_pr = doc.element.body.sectPr
+
+    for section in document['sections']:
+        # Skip empty sections
+        if not section['fields']:
+            continue
+
+        tbl = deepcopy(skeleton)
+        sect_pr.addprevious(tbl)
+        tc = tbl.tr_lst[0].tc_lst[0]
+
+        tc.append(_paragraph(prototypes, SECTION_TITLE_STYLE, section['title']))
+        tc.append(_paragraph(prototypes))  # Add spacing
+
+        # Bullets are part of the lines; list styles don't work well in table cells
+        for field in section['fields']:
+            tc.append(_paragraph(prototypes, FIELD_LABEL_STYLE, f"{field['label']}:"))
+            for value_line in field['lines']:
+                tc.append(_paragraph(prototypes, FIELD_VALUE_STYLE, html.unescape(value_line)))
+            tc.append(_paragraph(prototypes))  # Add spacing after each field
+
+        sect_pr.addprevious(_paragraph(prototypes))  # Minimal spacing after section
+
+    sect_pr.addprevious(_paragraph(prototypes, TIMESTAMP_STYLE, f"Generated on: {document['generated_at']}"))
+
+    doc.save(filepath)
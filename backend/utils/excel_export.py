@@ -0,0 +1,125 @@
+# Multi-client Excel export
+# Streams any number of clients' normalized form data into one workbook,
+# one row per client, using openpyxl's write-only mode: rows go straight to
+# a temporary XML file as they are appended, so memory stays flat whether
+# the workbook holds 10 clients or 10,000. Cell styles are registered once
+# as named styles and only referenced by name per cell. Cells hold the text
+# as typed, not the HTML-escaped form the PDF renderer prints from.
+
+import html
+import os
+from datetime import datetime
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+from openpyxl.utils import get_column_letter
+
+from .report_model import DASHA_FIELDS, SECTION_LAYOUT, build_document
+
+EXCEL_EXPORT_MAX_CLIENTS = int(os.getenv("EXCEL_EXPORT_MAX_CLIENTS", "10000"))
+
+HEADER_STYLE = 'client_header'
+VALUE_STYLE = 'client_value'
+
+# Excel's limit for a single cell
+_MAX_CELL_CHARS = 32767
+# Only the first skipped entries are listed on the summary sheet
+_MAX_LISTED_ERRORS = 1000
+
+
+def export_columns():
+    """(field key, header) for every exported column, in report order"""
+    columns = []
+    for key, title, fields in SECTION_LAYOUT:
+        if key == 'astrology':
+            columns.extend(DASHA_FIELDS)
+        columns.extend(fields)
+    return columns
+
+
+def _named_styles():
+    header = NamedStyle(name=HEADER_STYLE)
+    header.font = Font(name='Times New Roman', bold=True, color='FFFFFF')
+    header.fill = PatternFill('solid', fgColor='FF8C00')
+    header.alignment = Alignment(wrap_text=True, vertical='center')
+
+    value = NamedStyle(name=VALUE_STYLE)
+    value.font = Font(name='Times New Roman')
+    value.alignment = Alignment(wrap_text=True, vertical='top')
+    return header, value
+
+
+def _cell(ws, value, style):
+    cell = WriteOnlyCell(ws, value)
+    if isinstance(value, str):
+        # Never let client text become a formula
+        cell.data_type = 's'
+    cell.style = style
+    return cell
+
+
+def export_clients_workbook(entries, filepath, max_clients=EXCEL_EXPORT_MAX_CLIENTS):
+    """
+    Write one row per client into a write-only workbook
+
+    Args:
+        entries (iterable): (form_data, filename, error) tuples, as from
+            bulk_reports.iter_bulk_entries
+        filepath (str): Output .xlsx path
+        max_clients (int): Entries beyond this count are skipped
+
+    Returns:
+        dict: {'exported': int, 'skipped': int}
+    """
+    wb = Workbook(write_only=True)
+    for style in _named_styles():
+        wb.add_named_style(style)
+
+    columns = export_columns()
+    ws = wb.create_sheet('Clients')
+    # Layout must be set before the first row is written
+    ws.column_dimensions['A'].width = 10
+    for index in range(len(columns)):
+        ws.column_dimensions[get_column_letter(index + 2)].width = 30
+    ws.freeze_panes = 'C2'
+
+    ws.append([_cell(ws, '#', HEADER_STYLE)] + [_cell(ws, label, HEADER_STYLE) for _, label in columns])
+
+    exported = 0
+    skipped = []
+    skipped_count = 0
+    for index, (form_data, _, error) in enumerate(entries):
+        if error is None and exported >= max_clients:
+            error = f'Export is limited to {max_clients} clients'
+        if error is not None:
+            skipped_count += 1
+            if len(skipped) < _MAX_LISTED_ERRORS:
+                skipped.append((index + 1, error))
+            continue
+
+        values = {}
+        for section in build_document(form_data)['sections']:
+            for field in section['fields']:
+                values[field['key']] = html.unescape(field['value'])[:_MAX_CELL_CHARS]
+
+        exported += 1
+        # Empty fields are left out entirely (None writes no cell)
+        ws.append([_cell(ws, exported, VALUE_STYLE)] + [
+            _cell(ws, values[key], VALUE_STYLE) if key in values else None
+            for key, _ in columns
+        ])
+
+    summary = wb.create_sheet('Summary')
+    summary.column_dimensions['A'].width = 20
+    summary.column_dimensions['B'].width = 60
+    summary.append([_cell(summary, 'Generated on', HEADER_STYLE),
+                    _cell(summary, datetime.now().strftime('%B %d, %Y at %I:%M %p'), VALUE_STYLE)])
+    summary.append([_cell(summary, 'Clients exported', HEADER_STYLE), _cell(summary, exported, VALUE_STYLE)])
+    summary.append([_cell(summary, 'Entries skipped', HEADER_STYLE), _cell(summary, skipped_count, VALUE_STYLE)])
+    for entry_number, error in skipped:
+        summary.append([_cell(summary, f'Entry {entry_number}', VALUE_STYLE), _cell(summary, error, VALUE_STYLE)])
+
+    wb.save(filepath)
+    return {'exported': exported, 'skipped': skipped_count}
+
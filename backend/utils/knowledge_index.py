@@ -0,0 +1,124 @@
+# Inverted indexes over the Vastu and zodiac knowledge tables
+# Built once at import time so reverse lookups (color, accessory, body zone)
+# are single dictionary hits instead of scans over every table entry.
+
+from types import MappingProxyType
+
+from .zodiac_mapping import ZODIAC_BODY_MAPPING
+from .vastu_directions import VASTU_DIRECTIONS, PLANET_COLORS, PLANET_DIRECTIONS_INDEX
+from .astro_vastu_logic import PLANET_BODY_PARTS_INDEX
+
+
+def normalize_key(value):
+    """Normalize a lookup term so 'Light Blue', 'light blue ' and 'LIGHT BLUE' match"""
+    return ' '.join(str(value).split()).casefold()
+
+
+def _freeze(index):
+    return MappingProxyType({key: tuple(values) for key, values in index.items()})
+
+
+def _add(index, key, value):
+    values = index.setdefault(normalize_key(key), [])
+    if value not in values:
+        values.append(value)
+
+
+def _build_color_indexes():
+    color_planets = {}
+    color_directions = {}
+    for planet, colors in PLANET_COLORS.items():
+        for color in colors:
+            _add(color_planets, color, planet)
+    for direction, info in VASTU_DIRECTIONS.items():
+        for color in info['suggested_colors']:
+            _add(color_directions, color, direction)
+    return _freeze(color_planets), _freeze(color_directions)
+
+
+def _build_zodiac_indexes():
+    accessory_signs = {}
+    zone_signs = {}
+    for sign, info in ZODIAC_BODY_MAPPING.items():
+        for accessory in info['accessories']:
+            _add(accessory_signs, accessory, sign)
+        # Both the precise zone ('Chest Left') and the broad category ('chest')
+        _add(zone_signs, info['placement_zone'], sign)
+        _add(zone_signs, info['category'], sign)
+    return _freeze(accessory_signs), _freeze(zone_signs)
+
+
+COLOR_PLANETS_INDEX, COLOR_DIRECTIONS_INDEX = _build_color_indexes()
+ACCESSORY_SIGNS_INDEX, ZONE_SIGNS_INDEX = _build_zodiac_indexes()
+
+
+def get_planets_for_color(color):
+    """
+    Get planets whose colors include the given color
+
+    Args:
+        color (str): Color name (case-insensitive, e.g., 'Light Grey')
+
+    Returns:
+        list: Planet names or empty list if the color is unknown
+    """
+    return list(COLOR_PLANETS_INDEX.get(normalize_key(color), ()))
+
+
+def get_directions_for_color(color):
+    """
+    Get directions that suggest the given color
+
+    Args:
+        color (str): Color name (case-insensitive)
+
+    Returns:
+        list: Direction names or empty list if the color is unknown
+    """
+    return list(COLOR_DIRECTIONS_INDEX.get(normalize_key(color), ()))
+
+
+def get_signs_for_accessory(accessory):
+    """
+    Get zodiac signs associated with an accessory
+
+    Args:
+        accessory (str): Accessory name (case-insensitive, e.g., 'Ring')
+
+    Returns:
+        list: Zodiac sign names or empty list if the accessory is unknown
+    """
+    return list(ACCESSORY_SIGNS_INDEX.get(normalize_key(accessory), ()))
+
+
+def get_signs_for_zone(zone):
+    """
+    Get zodiac signs for a body placement zone or category
+
+    Args:
+        zone (str): Placement zone (e.g., 'Chest Left') or category (e.g., 'chest')
+
+    Returns:
+        list: Zodiac sign names or empty list if the zone is unknown
+    """
+    return list(ZONE_SIGNS_INDEX.get(normalize_key(zone), ()))
+
+
+def get_planet_index_entry(planet):
+    """
+    Get every indexed association for a planet in one lookup
+
+    Args:
+        planet (str): Planet name (e.g., 'Sun')
+
+    Returns:
+        dict: Directions, colors and body parts, or None if the planet is unknown
+    """
+    if planet not in PLANET_COLORS:
+        return None
+    return {
+        'planet': planet,
+        'directions': list(PLANET_DIRECTIONS_INDEX.get(planet, ())),
+        'colors': list(PLANET_COLORS[planet]),
+        'body_parts': [dict(entry) for entry in PLANET_BODY_PARTS_INDEX.get(planet, ())]
+    }
@@ -0,0 +1,219 @@
+# Versioned report history for stored clients
+# Every report generated for a stored client adds a version holding a
+# field-level diff of the client's normalized form data against the
+# previous version. Every REPORT_HISTORY_KEYFRAME_INTERVAL versions the full
+# form is stored instead (a keyframe), so rebuilding any version applies a
+# bounded number of diffs. Blobs are asset references (see client_store),
+# so a diff never repeats an image; each version refers to the assets in
+# its own data, which keeps them stored while the version exists. Only the newest REPORT_HISTORY_KEEP_FILES
+# versions keep their rendered file; older versions are rendered again from
+# their form data when downloaded.
+
+import json
+import os
+from datetime import datetime
+
+from .client_store import asset_hashes
+
+REPORT_HISTORY_KEYFRAME_INTERVAL = int(os.getenv("REPORT_HISTORY_KEYFRAME_INTERVAL", "10"))
+REPORT_HISTORY_KEEP_FILES = int(os.getenv("REPORT_HISTORY_KEEP_FILES", "3"))
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS client_versions (
+        client_id TEXT NOT NULL REFERENCES clients (id) ON DELETE CASCADE,
+        version INTEGER NOT NULL,
+        keyframe INTEGER NOT NULL,
+        data TEXT NOT NULL,
+        changed TEXT NOT NULL,
+        report_id TEXT,
+        report_type TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        PRIMARY KEY (client_id, version)
+    ) WITHOUT ROWID""",
+)
+
+
+class VersionNotFound(LookupError):
+    """No such version for this client"""
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+
+
+def field_diff(old, new):
+    """
+    Field-level diff between two normalized forms
+
+    Returns:
+        dict: {'set': {field: new value}, 'unset': [removed fields]}; both
+            empty when nothing changed
+    """
+    changed = {key: value for key, value in new.items() if key not in old or old[key] != value}
+    removed = sorted(key for key in old if key not in new)
+    return {'set': changed, 'unset': removed}
+
+
+def apply_diff(form, diff):
+    """Apply a field_diff result to a normalized form (returns a new dict)"""
+    updated = dict(form)
+    updated.update(diff.get('set', {}))
+    for key in diff.get('unset', []):
+        updated.pop(key, None)
+    return updated
+
+
+class ReportHistory:
+    """Per-client version chain, sharing the client store's database and connections"""
+
+    def __init__(self, client_store, keyframe_interval=REPORT_HISTORY_KEYFRAME_INTERVAL,
+                 keep_files=REPORT_HISTORY_KEEP_FILES):
+        self.store = client_store
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.keep_files = max(1, keep_files)
+        self._schema_ready = False
+
+    def _connection(self):
+        conn = self.store.connection()
+        if not self._schema_ready:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            self._schema_ready = True
+        return conn
+
+    def _form_at(self, conn, client_id, version):
+        """Rebuild the normalized form of a version from its nearest keyframe"""
+        rows = conn.execute(
+            'SELECT version, keyframe, data FROM client_versions WHERE client_id = ? AND version <= ? '
+            'AND version >= (SELECT MAX(version) FROM client_versions '
+            '                WHERE client_id = ? AND version <= ? AND keyframe = 1) '
+            'ORDER BY version',
+            (client_id, version, client_id, version)
+        ).fetchall()
+        if not rows or rows[-1]['version'] != version:
+            raise VersionNotFound(f'{client_id} v{version}')
+        form = {}
+        for row in rows:
+            data = json.loads(row['data'])
+            form = data if row['keyframe'] else apply_diff(form, data)
+        return form
+
+    def record_version(self, client_id, report_id, report_type, form_data):
+        """
+        Add a version for a report just generated for a stored client
+
+        Args:
+            form_data (dict): The form the report was rendered from. The
+                client's stored form may already have been updated since.
+
+        Returns:
+            tuple: (version number, report ids whose files are no longer kept)
+        """
+        self._connection()
+        with self.store.transaction() as conn:
+            if conn.execute('SELECT 1 FROM clients WHERE id = ?', (client_id,)).fetchone() is None:
+                raise LookupError(client_id)
+            # Also stores any asset that an update removed while the report was rendering
+            form = self.store.normalize_form(conn, form_data)
+
+            latest = conn.execute('SELECT MAX(version) FROM client_versions WHERE client_id = ?',
+                                  (client_id,)).fetchone()[0]
+            version = (latest or 0) + 1
+            if latest is None:
+                diff = {'set': form, 'unset': []}
+            else:
+                diff = field_diff(self._form_at(conn, client_id, latest), form)
+            keyframe = (version - 1) % self.keyframe_interval == 0
+            changed = sorted(diff['set']) + diff['unset']
+
+            conn.execute(
+                'INSERT INTO client_versions (client_id, version, keyframe, data, changed, report_id, '
+                'report_type, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (client_id, version, int(keyframe), _dumps(form if keyframe else diff), _dumps(changed),
+                 report_id, report_type, datetime.now().isoformat(timespec='seconds'))
+            )
+            self.store.add_asset_refs(conn, client_id, version, asset_hashes(form if keyframe else diff['set']))
+            return version, self._release_old_files(conn, client_id, version)
+
+    def _release_old_files(self, conn, client_id, latest):
+        """Detach rendered files from versions outside the newest keep_files"""
+        cutoff = latest - self.keep_files
+        released = [row[0] for row in conn.execute(
+            'SELECT report_id FROM client_versions WHERE client_id = ? AND version <= ? AND report_id IS NOT NULL',
+            (client_id, cutoff)
+        )]
+        if released:
+            conn.execute('UPDATE client_versions SET report_id = NULL WHERE client_id = ? AND version <= ?',
+                         (client_id, cutoff))
+            # The client's report list only shows reports that still have a file
+            conn.execute(f"DELETE FROM client_reports WHERE report_id IN ({', '.join('?' * len(released))})",
+                         released)
+        return released
+
+    def attach_file(self, client_id, version, report_id):
+        """
+        Keep a file rendered on demand for an old version until the next version is recorded
+
+        Returns:
+            list: Report ids released now (a file previously attached to this version)
+        """
+        self._connection()
+        with self.store.transaction() as conn:
+            previous = conn.execute('SELECT report_id FROM client_versions WHERE client_id = ? AND version = ?',
+                                    (client_id, version)).fetchone()
+            conn.execute('UPDATE client_versions SET report_id = ? WHERE client_id = ? AND version = ?',
+                         (report_id, client_id, version))
+        return [previous[0]] if previous and previous[0] and previous[0] != report_id else []
+
+    def list_versions(self, client_id):
+        """
+        Returns:
+            list: [{'version', 'created_at', 'report_type', 'report_id', 'changed_fields'}], newest first
+        """
+        rows = self._connection().execute(
+            'SELECT version, created_at, report_type, report_id, changed FROM client_versions '
+            'WHERE client_id = ? ORDER BY version DESC',
+            (client_id,)
+        ).fetchall()
+        return [{
+            'version': row['version'],
+            'created_at': row['created_at'],
+            'report_type': row['report_type'],
+            'report_id': row['report_id'],
+            'changed_fields': json.loads(row['changed'])
+        } for row in rows]
+
+    def get_version(self, client_id, version):
+        """
+        A version's metadata, diff against the previous version and full normalized form
+
+        Raises:
+            VersionNotFound: No such version
+        """
+        conn = self._connection()
+        row = conn.execute(
+            'SELECT version, created_at, report_type, report_id, changed FROM client_versions '
+            'WHERE client_id = ? AND version = ?',
+            (client_id, version)
+        ).fetchone()
+        if row is None:
+            raise VersionNotFound(f'{client_id} v{version}')
+        form = self._form_at(conn, client_id, version)
+        previous = self._form_at(conn, client_id, version - 1) if version > 1 else {}
+        return {
+            'version': row['version'],
+            'created_at': row['created_at'],
+            'report_type': row['report_type'],
+            'report_id': row['report_id'],
+            'changed_fields': json.loads(row['changed']),
+            'diff': field_diff(previous, form),
+            'form_data': form
+        }
+
+    def stats(self):
+        conn = self._connection()
+        versions, keyframes, data_bytes = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(keyframe), 0), COALESCE(SUM(LENGTH(data)), 0) FROM client_versions'
+        ).fetchone()
+        kept = conn.execute('SELECT COUNT(*) FROM client_versions WHERE report_id IS NOT NULL').fetchone()[0]
+        return {'versions': versions, 'keyframes': keyframes, 'data_bytes': data_bytes, 'files_kept': kept}
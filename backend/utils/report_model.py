@@ -0,0 +1,244 @@
+# Normalized Destiny Report document model
+# The form data is sanitized, split into bullet lines and laid out into
+# sections once; the PDF, DOCX and Excel renderers only walk the result, so
+# rendering several formats for one client repeats none of that work.
+#
+# Document shape (plain dicts and lists, picklable for worker processes):
+#   {
+#       'title': 'DESTINY REPORT',
+#       'sections': [{'key', 'title', 'fields': [{'key', 'label', 'value', 'lines'}]}],
+#       'house_maps': [{'number', 'image', 'analysis_lines'}],
+#       'kundli_pdf': data URL or None,
+#       'generated_at': 'January 02, 2025 at 10:30 AM'
+#   }
+# Sections keep all their fields' order but list only fields with a value;
+# 'lines' is the value as displayed (bullets added for multi-item values).
+
+import html
+from datetime import datetime
+
+REPORT_TITLE = 'DESTINY REPORT'
+
+# Section key, title and (form field, label) pairs, in report order
+SECTION_LAYOUT = (
+    ('about', 'ABOUT THE CLIENT', (
+        ('name', 'Name'),
+        ('dateOfBirth', 'Date of Birth'),
+        ('timeOfBirth', 'Time of Birth'),
+        ('placeOfBirth', 'Place of Birth')
+    )),
+    ('vastu', 'VASTU ANALYSIS', (
+        ('mapOfHouse', 'Map of the House'),
+        ('vastuAnalysis', 'Analysis (Entrances, Kitchen, Washrooms)'),
+        ('vastuRemedies', 'Remedies')
+    )),
+    ('astrology', 'ASTROLOGY', (
+        ('donationsToDo', 'Donations to Do'),
+        ('donationsToWhom', 'Donations - To Whom'),
+        ('gemstones', 'Gemstones'),
+        ('mantra', 'Mantra to Make Situation Positive'),
+        ('birthNakshatra', 'Your Birth Nakshatra'),
+        ('mobileDisplayPicture', 'Beneficial Mobile Display Picture'),
+        ('beneficialSymbols', 'Most Beneficial Symbols'),
+        ('nakshatraProsperitySymbols', 'Prosperity Giving Symbols'),
+        ('nakshatraMentalPhysicalWellbeing', 'Mental/Physical Wellbeing Symbols'),
+        ('nakshatraAccomplishments', 'Accomplishment/Achievement Symbols'),
+        ('nakshatraAvoidSymbols', 'Symbols to Avoid')
+    )),
+    ('astro_vastu', 'ASTRO VASTU SOLUTION', (
+        ('aspectsOnHouses', 'Aspects on Houses'),
+        ('aspectsOnPlanets', 'Aspects on Planets'),
+        ('whatToRemove', 'What to Remove from Which Directions'),
+        ('whatToPlace', 'What to Place in Which Directions'),
+        ('astroVastuRemediesBody', 'Astro Vastu Remedies for Body'),
+        ('colorObjectsToUse', 'What Color or Objects to Use on Body'),
+        ('colorObjectsNotToUse', 'What Color or Objects NOT to Use on Body'),
+        ('lockerLocation', 'Most Favorable Location of Locker'),
+        ('laughingBuddhaDirection', 'Placement of Laughing Buddha/Vision Board - Direction'),
+        ('wishListInkColor', 'Color of Ink to Write Wish List')
+    )),
+    ('guidelines', 'GUIDELINES', (
+        ('neverCriticize', 'To Whom You Should Never Criticize or Judge'),
+        ('importantBooks', 'Important Books to Read to Uplift Your Life'),
+        ('giftsToGive', 'Gifts - To Give'),
+        ('giftsToReceive', 'Gifts - To Receive')
+    )),
+    ('bhrigunanda', 'BHRIGUNANDA NADI', (
+        ('saturnRelation', 'Saturn Relation'),
+        ('saturnFollowing', 'Saturn is following'),
+        ('professionalMindset', 'Professional Mindset'),
+        ('venusRelation', 'Venus Relation'),
+        ('venusFollowing', 'Venus is following'),
+        ('financialMindset', 'Financial Mindset')
+    ))
+)
+
+# Dasha periods lead the ASTROLOGY section
+DASHA_FIELDS = (
+    ('mahadasha', 'Mahadasha'),
+    ('antardasha', 'Antardasha'),
+    ('pratyantardasha', 'Pratyantar Dasha')
+)
+
+BULLET_CHARS = ('•', '◦', '○', '●', '▪', '▫', '–', '-', '*', '→')
+
+
+def sanitize_input(text):
+    """Sanitize user input to prevent XSS and injection attacks"""
+    if not text:
+        return ''
+    return html.escape(str(text))
+
+
+def format_dasha(form_data, prefix):
+    """Format dasha data from form fields
+    Format: Planet(Source), NL(NL Source), (Additional house), SL(SL source)
+    If no_star is True for the dasha, add * as superscript to the first planet
+    """
+    planet = sanitize_input(form_data.get(f'{prefix}_planet', ''))
+    source = sanitize_input(form_data.get(f'{prefix}_source', ''))
+    nl = sanitize_input(form_data.get(f'{prefix}_nl', ''))
+    nl_source = sanitize_input(form_data.get(f'{prefix}_nl_source', ''))
+    additional_house = sanitize_input(form_data.get(f'{prefix}_additional_house', ''))
+    sl = sanitize_input(form_data.get(f'{prefix}_sl', ''))
+    sl_source = sanitize_input(form_data.get(f'{prefix}_sl_source', ''))
+    no_star = form_data.get(f'{prefix}_no_star', False)
+
+    parts = []
+
+    # Planet(Source) - add * if no_star is True
+    if planet:
+        planet_text = planet
+        if no_star:
+            planet_text = f'{planet}*'
+
+        if source:
+            parts.append(f'{planet_text}({source})')
+        else:
+            parts.append(planet_text)
+
+    # NL Planet(NL Source)
+    if nl:
+        if nl_source:
+            parts.append(f'{nl}({nl_source})')
+        else:
+            parts.append(nl)
+
+    # (Additional house)
+    if additional_house:
+        parts.append(f'({additional_house})')
+
+    # SL Planet(SL source)
+    if sl:
+        if sl_source:
+            parts.append(f'{sl}({sl_source})')
+        else:
+            parts.append(sl)
+
+    # Add period dates if this is pratyantardasha
+    if prefix == 'pratyantardasha':
+        period_from = sanitize_input(form_data.get(f'{prefix}_period_from', ''))
+        period_to = sanitize_input(form_data.get(f'{prefix}_period_to', ''))
+
+        if period_from and period_to:
+            # Format dates
+            try:
+                from_date = datetime.strptime(period_from, '%Y-%m-%d').strftime('%b %d, %Y')
+                to_date = datetime.strptime(period_to, '%Y-%m-%d').strftime('%b %d, %Y')
+                parts.append(f'Period: {from_date} - {to_date}')
+            except ValueError:
+                # If date parsing fails, use raw values
+                parts.append(f'Period: {period_from} - {period_to}')
+
+    return ', '.join(parts) if parts else ''
+
+
+def split_value_items(value):
+    """Split values that contain multiple lines or long comma-separated lists into items"""
+    if not value:
+        return []
+
+    # Check if value contains newlines or commas suggesting multiple items
+    if '\n' in value:
+        items = [item.strip() for item in value.split('\n') if item.strip()]
+    elif ',' in value and len(value) > 50:  # Only split by comma if text is long
+        items = [item.strip() for item in value.split(',') if item.strip()]
+    else:
+        # Single value, no bullets needed
+        return [value]
+
+    return items if len(items) > 1 else [value]
+
+
+def has_bullet(text):
+    """Check if text starts with a bullet point"""
+    if not text:
+        return False
+    text = text.strip()
+    return text.startswith(BULLET_CHARS) or (len(text) > 2 and text[0].isdigit() and text[1] in ['.', ')'])
+
+
+def display_lines(value):
+    """Lines to display for a value: multi-item values get a bullet unless they already have one"""
+    items = split_value_items(value)
+    if len(items) > 1:
+        return [item if has_bullet(item) else f'• {item}' for item in items]
+    return items
+
+
+def _field(key, label, value, lines):
+    return {'key': key, 'label': label, 'value': value, 'lines': lines}
+
+
+def build_document(form_data, now=None):
+    """
+    Turn a report's form data into the normalized document model
+
+    Args:
+        form_data (dict): Form data as posted to /api/generate-report
+        now (datetime): Generation time (defaults to now)
+
+    Returns:
+        dict: Document model (see module header)
+    """
+    sections = []
+    for key, title, fields in SECTION_LAYOUT:
+        section_fields = []
+
+        if key == 'astrology':
+            # Dasha strings are shown as-is, never split into bullets
+            for prefix, label in DASHA_FIELDS:
+                dasha = format_dasha(form_data, prefix)
+                if dasha:
+                    section_fields.append(_field(prefix, label, dasha, [dasha]))
+
+        for field_key, label in fields:
+            value = sanitize_input(form_data.get(field_key, ''))
+            if value:
+                section_fields.append(_field(field_key, label, value, display_lines(value)))
+
+        sections.append({'key': key, 'title': title, 'fields': section_fields})
+
+    house_maps = []
+    images = form_data.get('houseMapImages', [])
+    analyses = form_data.get('houseMapAnalyses', [])
+    if images and isinstance(images, list):
+        if not isinstance(analyses, list):
+            analyses = []
+        for idx, image in enumerate(images):
+            analysis = analyses[idx] if idx < len(analyses) else ''
+            house_maps.append({
+                'number': idx + 1,
+                'image': image,
+                'analysis_lines': [line for line in analysis.split('\n') if line.strip()] if isinstance(analysis, str) else []
+            })
+
+    kundli_pdf = form_data.get('kundliPdf')
+
+    return {
+        'title': REPORT_TITLE,
+        'sections': sections,
+        'house_maps': house_maps,
+        'kundli_pdf': kundli_pdf if isinstance(kundli_pdf, str) and kundli_pdf else None,
+        'generated_at': (now or datetime.now()).strftime('%B %d, %Y at %I:%M %p')
+    }
@@ -0,0 +1,76 @@
+# Bookkeeping for finished reports
+# A rendered report is moved into the report store and registered with the
+# host's retention index; a report for a stored client is also added to
+# the client's report list and version history; every report is added to
+# the search index. Ad-hoc reports leave the search index again when the
+# janitor evicts their file; a client's versions stay searchable. Shared by the web app and the dasha
+# rollover scheduler, so reports from either can be found the same way.
+
+import os
+
+from .storage_backends import is_valid_report_id
+
+
+class ReportRecords:
+    """Store, record and forget reports across the report store, client store, history and search index"""
+
+    def __init__(self, report_store, storage, clients, history, search):
+        self.report_store = report_store
+        self.storage = storage
+        self.clients = clients
+        self.history = history
+        self.search = search
+
+    def persist(self, file_path):
+        """Move a rendered report into the report store and return its id"""
+        report_id = self.report_store.save(file_path)
+        local_path = self.report_store.path(report_id)
+        if local_path:
+            self.storage.register(local_path)
+        return report_id
+
+    def index(self, report_id, form_data, report_type, client_id=None, version=None):
+        """Add a report to the search index; a failure never fails the report"""
+        try:
+            self.search.index_report(report_id, form_data, report_type, client_id, version)
+        except Exception as e:
+            print(f"Could not index report {report_id}: {str(e)}")
+
+    def record(self, report_id, form_data, report_type, client_id=None):
+        """
+        Record a persisted report against its stored client (if any) and index it
+
+        Args:
+            form_data (dict): The form the report was rendered from
+
+        Returns:
+            int: The client's new version number, or None without a client
+        """
+        version = None
+        if client_id:
+            self.clients.add_report(client_id, report_id, report_type)
+            version, released = self.history.record_version(client_id, report_id, report_type, form_data)
+            self.discard(released)
+        self.index(report_id, form_data, report_type, client_id, version)
+        return version
+
+    def discard(self, report_ids):
+        """Delete stored report files that no version keeps any more"""
+        for report_id in report_ids:
+            try:
+                local_path = self.report_store.path(report_id)
+                self.report_store.delete(report_id)
+                if local_path:
+                    self.storage.forget(local_path)
+            except Exception as e:
+                print(f"Could not delete report {report_id}: {str(e)}")
+        try:
+            self.search.remove_reports(report_ids)
+        except Exception as e:
+            print(f"Could not remove reports from the search index: {str(e)}")
+
+    def evicted(self, paths):
+        """Retention callback: forget reports the janitor evicted in the search index"""
+        self.search.remove_reports(
+            name for name in map(os.path.basename, paths) if is_valid_report_id(name)
+        )
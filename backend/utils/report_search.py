@@ -0,0 +1,277 @@
+# Full-text search over generated reports
+# Every generated report's normalized text (the document model's fields
+# plus the house map analyses) is added to an SQLite FTS5 index in the
+# client database as the report is stored, one row per field, so a search
+# can say which field matched and show a snippet from it. Words are
+# stemmed (porter) and accents folded, so "toilets" finds "Toilet".
+#
+# The field key and client id are indexed columns, so field and client
+# filters are part of the FTS match rather than checks on every matching
+# row, and prefix indexes serve short 'word*' searches. Results come
+# newest first, so a search stops after one page of matches instead of
+# scoring every match (bm25 reads the whole index for its statistics).
+# A report's text rows use the rowids id * ROWS_PER_REPORT onwards, so
+# removing a report deletes one rowid range. A stored client's report is
+# indexed as a version of that client: when its file is released or evicted
+# the text stays searchable and the result points at the client and version
+# (downloaded by rendering the version again), and a version rendered again
+# points its row at the new file. Ad-hoc reports leave the index with their
+# file; a deleted client's reports leave with the client.
+
+import html
+import re
+from datetime import datetime
+
+from .report_model import build_document
+
+# Snippet highlight markers; replaced by <mark> after the snippet is escaped
+_MARK_OPEN = '\x02'
+_MARK_CLOSE = '\x03'
+SNIPPET_TOKENS = 16
+# Rowids reserved for one report's text rows (fields beyond this are not indexed)
+ROWS_PER_REPORT = 1024
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS indexed_reports (
+        id INTEGER PRIMARY KEY,
+        report_id TEXT UNIQUE,
+        client_id TEXT,
+        version INTEGER,
+        client_name TEXT NOT NULL DEFAULT '',
+        report_type TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    )""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS indexed_reports_client ON indexed_reports (client_id, version)",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS report_text USING fts5(
+        body, field, client, label UNINDEXED, report UNINDEXED,
+        tokenize = 'porter unicode61 remove_diacritics 2', prefix = '2 3 4'
+    )""",
+)
+
+_QUERY_TERM = re.compile(r'"([^"]*)"|(\S+)')
+_WORD_CHARS = re.compile(r'[^\w*]+')
+
+
+class InvalidSearchQuery(ValueError):
+    """The search text has no searchable words"""
+
+
+def report_fields(form_data):
+    """
+    (field key, label, text) for every non-empty field of a report, as printed
+
+    Returns:
+        list: Text is unescaped, i.e. what the astrologer typed
+    """
+    document = build_document(form_data)
+    fields = [
+        (field['key'], field['label'], html.unescape(field['value']))
+        for section in document['sections']
+        for field in section['fields']
+    ]
+    for house_map in document['house_maps']:
+        if house_map['analysis_lines']:
+            fields.append(('houseMapAnalyses', f"House Map {house_map['number']} Analysis",
+                           '\n'.join(house_map['analysis_lines'])))
+    return fields
+
+
+def build_match_query(text):
+    """
+    Turn user search text into a safe FTS5 query
+
+    "quoted text" is matched as a phrase, other words must all appear
+    (in any order) and a trailing * makes a word a prefix. Anything FTS5
+    would read as syntax (-, :, parentheses, NEAR, ...) is treated as text.
+
+    Raises:
+        InvalidSearchQuery: No searchable words
+    """
+    terms = []
+    for phrase, word in _QUERY_TERM.findall(text or ''):
+        if phrase:
+            if phrase.strip():
+                terms.append('"' + phrase.replace('"', '""') + '"')
+            continue
+        prefix = word.endswith('*')
+        for part in _WORD_CHARS.sub(' ', word).replace('*', ' ').split():
+            terms.append(f'"{part}"')
+        if prefix and terms and terms[-1].startswith('"'):
+            terms[-1] += '*'
+    if not terms:
+        raise InvalidSearchQuery('Search text has no searchable words')
+    return ' '.join(terms)
+
+
+def _quote(value):
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _render_snippet(snippet):
+    """HTML-escape a snippet, then turn the match markers into <mark> tags"""
+    return (html.escape(snippet)
+            .replace(_MARK_OPEN, '<mark>')
+            .replace(_MARK_CLOSE, '</mark>'))
+
+
+class ReportSearchIndex:
+    """FTS5 index of report text, sharing the client store's database and connections"""
+
+    def __init__(self, client_store):
+        self.store = client_store
+        self._schema_ready = False
+
+    def _connection(self):
+        conn = self.store.connection()
+        if not self._schema_ready:
+            # Idempotent; racing threads at most create nothing twice
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            self._schema_ready = True
+        return conn
+
+    def index_report(self, report_id, form_data, report_type, client_id=None, version=None):
+        """
+        Add one generated report's text to the index
+
+        Args:
+            client_id (str): The stored client the report was generated for
+            version (int): The client's report version; a version already
+                indexed (its file rendered again) only gets the new report id
+        """
+        fields = report_fields(form_data)
+        self._connection()
+        with self.store.transaction() as conn:
+            if client_id and version is not None:
+                cursor = conn.execute('UPDATE indexed_reports SET report_id = ? WHERE client_id = ? AND version = ?',
+                                      (report_id, client_id, version))
+                if cursor.rowcount:
+                    return
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO indexed_reports '
+                '(report_id, client_id, version, client_name, report_type, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (report_id, client_id, version if client_id else None, str(form_data.get('name') or '').strip(),
+                 report_type, datetime.now().isoformat(timespec='seconds'))
+            )
+            if not cursor.rowcount:
+                return  # already indexed
+            first_row = cursor.lastrowid * ROWS_PER_REPORT
+            conn.executemany(
+                'INSERT INTO report_text (rowid, body, field, client, label, report) VALUES (?, ?, ?, ?, ?, ?)',
+                [(first_row + position, text, key, client_id or '', label, cursor.lastrowid)
+                 for position, (key, label, text) in enumerate(fields[:ROWS_PER_REPORT])]
+            )
+
+    def search(self, text, fields=None, client_id=None, limit=20, offset=0):
+        """
+        Matching report fields with highlighted snippets, newest report first
+
+        Args:
+            text (str): Search text (see build_match_query)
+            fields (list): Only match these form fields, e.g. ['whatToPlace', 'vastuAnalysis']
+            client_id (str): Only this stored client's reports
+            limit (int): Page size
+            offset (int): Results to skip
+
+        Returns:
+            dict: {'results': [{'report_id', 'client_id', 'version', 'client_name', 'report_type',
+                'created_at', 'field', 'label', 'snippet'}], 'has_more': bool}. report_id
+                is None for a client version whose file is no longer kept; download it
+                through the client's version instead.
+
+        Raises:
+            InvalidSearchQuery: No searchable words in text
+        """
+        match = '{body} : (' + build_match_query(text) + ')'
+        if fields:
+            match += ' AND {field} : (' + ' OR '.join(_quote(field) for field in fields) + ')'
+        if client_id:
+            match += ' AND {client} : ' + _quote(client_id)
+
+        conn = self._connection()
+        rows = conn.execute(
+            'SELECT rowid FROM report_text WHERE report_text MATCH ? ORDER BY rowid DESC LIMIT ? OFFSET ?',
+            (match, limit + 1, offset)
+        ).fetchall()
+        page = [row[0] for row in rows[:limit]]
+        if not page:
+            return {'results': [], 'has_more': False}
+
+        # Snippets for the page only. A rowid range keeps FTS5 on one pass
+        # over the matches (IN or per-row lookups restart the query for
+        # every row); rows outside the page skip the snippet and content reads.
+        wanted = f"t.rowid IN ({', '.join('?' * len(page))})"
+        details = conn.execute(
+            f'SELECT t.rowid AS id, CASE WHEN {wanted} THEN t.report END AS report, '
+            f'CASE WHEN {wanted} THEN t.field END AS field, CASE WHEN {wanted} THEN t.label END AS label, '
+            f"CASE WHEN {wanted} THEN snippet(report_text, 0, '{_MARK_OPEN}', '{_MARK_CLOSE}', '…', "
+            f'{SNIPPET_TOKENS}) END AS snippet '
+            'FROM report_text t WHERE report_text MATCH ? AND t.rowid BETWEEN ? AND ?',
+            page * 4 + [match, min(page), max(page)]
+        ).fetchall()
+        by_id = {row['id']: row for row in details if row['report'] is not None}
+
+        report_ids = sorted({row['report'] for row in by_id.values()})
+        reports = {row['id']: row for row in conn.execute(
+            'SELECT id, report_id, client_id, version, client_name, report_type, created_at FROM indexed_reports '
+            f"WHERE id IN ({', '.join('?' * len(report_ids))})",
+            report_ids
+        )}
+
+        results = []
+        for row_id in page:
+            row = by_id.get(row_id)
+            report = reports.get(row['report']) if row is not None else None
+            if report is None:
+                continue
+            results.append({
+                'report_id': report['report_id'],
+                'client_id': report['client_id'],
+                'version': report['version'],
+                'client_name': report['client_name'],
+                'report_type': report['report_type'],
+                'created_at': report['created_at'],
+                'field': row['field'],
+                'label': row['label'],
+                'snippet': _render_snippet(row['snippet'])
+            })
+        return {'results': results, 'has_more': len(rows) > limit}
+
+    def _remove(self, conn, ids):
+        # One rowid range per report: FTS5 seeks to it instead of scanning the table
+        conn.executemany('DELETE FROM report_text WHERE rowid BETWEEN ? AND ?',
+                         [(i * ROWS_PER_REPORT, (i + 1) * ROWS_PER_REPORT - 1) for i in ids])
+        conn.executemany('DELETE FROM indexed_reports WHERE id = ?', [(i,) for i in ids])
+
+    def remove_client(self, client_id):
+        """Drop a deleted client's reports from the index"""
+        self._connection()
+        with self.store.transaction() as conn:
+            ids = [row[0] for row in conn.execute('SELECT id FROM indexed_reports WHERE client_id = ?', (client_id,))]
+            self._remove(conn, ids)
+
+    def remove_reports(self, report_ids):
+        """
+        Forget report files that no longer exist (evicted or released)
+
+        Ad-hoc reports leave the index; a client version keeps its text and
+        only loses its report id.
+        """
+        report_ids = list(report_ids)
+        if not report_ids:
+            return
+        self._connection()
+        with self.store.transaction() as conn:
+            rows = []
+            for start in range(0, len(report_ids), 500):
+                chunk = report_ids[start:start + 500]
+                rows += conn.execute(
+                    f"SELECT id, version FROM indexed_reports WHERE report_id IN ({', '.join('?' * len(chunk))})",
+                    chunk).fetchall()
+            conn.executemany('UPDATE indexed_reports SET report_id = NULL WHERE id = ?',
+                             [(row['id'],) for row in rows if row['version'] is not None])
+            self._remove(conn, [row['id'] for row in rows if row['version'] is None])
+
+    def stats(self):
+        conn = self._connection()
+        return {'reports': conn.execute('SELECT COUNT(*) FROM indexed_reports').fetchone()[0]}
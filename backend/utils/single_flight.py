@@ -0,0 +1,157 @@
+# Single-flight request coalescing
+# Identical requests that arrive while the first one is still rendering
+# (a double-clicked Generate, a retried conversion) wait for that render
+# and share its result instead of running their own. Requests are keyed by
+# a hash of their content. Only the leader takes a bulkhead slot; each
+# duplicate waiting on it holds a place in the same bulkhead's wait queue
+# and gives up after its queue timeout, so a retry storm on one request
+# ties up no more threads than the pool allows and is shed with 503.
+# Coalescing is per process: duplicates routed to another worker render
+# on their own.
+
+import hashlib
+import threading
+
+from .bulkheads import BULKHEADS
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers with the same key share its outcome"""
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {'executed': 0, 'coalesced': 0}
+
+    def do(self, key, fn, wait=None):
+        """
+        Run fn, or wait for the identical call already in flight
+
+        Args:
+            wait (callable): Called with the in-flight call's done event instead
+                of waiting on it without limit (see Bulkhead.wait)
+
+        Returns:
+            tuple: (result, shared) where shared is True for a coalesced caller
+
+        Raises:
+            Exception: Whatever the leader's fn raised, re-raised in every
+                waiter, or whatever wait raised
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+                self._stats['executed'] += 1
+            else:
+                call.waiters += 1
+                leader = False
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            try:
+                if wait is None:
+                    call.done.wait()
+                else:
+                    wait(call.done)
+            finally:
+                with self._lock:
+                    call.waiters -= 1
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Later requests start a fresh call; waiters already hold this one
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                'in_flight': len(self._calls),
+                'waiting': sum(call.waiters for call in self._calls.values())
+            }
+
+
+FLIGHTS = {
+    'render': SingleFlight('render'),
+    'raster': SingleFlight('raster'),
+}
+
+
+def _update(digest, data):
+    digest.update(len(data).to_bytes(8, 'big'))
+    digest.update(data)
+
+
+def request_key(*parts):
+    """
+    Content hash of a request from its parts: str, bytes, buffers such as an
+    mmap, or in-memory streams (BytesIO) such as a small upload
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        if hasattr(part, 'getbuffer'):
+            # Hashed in place; the view is released so the stream can still be closed
+            with part.getbuffer() as view:
+                _update(digest, view)
+        else:
+            _update(digest, part)
+    return digest.hexdigest()
+
+
+def coalesced(flight_name, key, fn, pool_name=None):
+    """
+    Run fn once for all concurrent requests with this key
+
+    Args:
+        flight_name (str): Key of FLIGHTS
+        key (str): request_key of the request
+        fn (callable): The work; its result must be safe to share between requests
+        pool_name (str): Bulkhead the leader runs in and the waiters queue in
+            (raises PoolSaturated for the leader and every waiter when the
+            pool is full, and for a waiter whose queue timeout expires)
+
+    Returns:
+        tuple: (result, shared)
+    """
+    if pool_name is None:
+        return FLIGHTS[flight_name].do(key, fn)
+    bulkhead = BULKHEADS[pool_name]
+
+    def run():
+        release = bulkhead.acquire()
+        try:
+            return fn()
+        finally:
+            release()
+
+    return FLIGHTS[flight_name].do(key, run, wait=bulkhead.wait)
+
+
+def single_flight_stats():
+    """Executed and coalesced request counts for the metrics endpoint"""
+    return {name: flight.stats() for name, flight in FLIGHTS.items()}
@@ -0,0 +1,115 @@
+# Precomputed HTTP payloads for the constant knowledge endpoints
+# The tables never change while the process runs, so each response body is
+# serialized (and compressed) exactly once and served from memory with a
+# strong ETag.
+
+import gzip
+import hashlib
+import json
+import os
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional - gzip/identity are always available
+    brotli = None
+
+from .zodiac_mapping import ZODIAC_BODY_MAPPING
+from .vastu_directions import VASTU_DIRECTIONS, PLANET_COLORS
+from .astro_vastu_logic import PLANET_ZODIAC_CLASSICAL
+
+# Cache lifetime for the knowledge tables (defaults to one day)
+STATIC_PAYLOAD_MAX_AGE = int(os.getenv("STATIC_PAYLOAD_MAX_AGE", "86400"))
+
+
+class StaticPayload:
+    """Serialized JSON body with its compressed variants and ETag"""
+
+    __slots__ = ('etag', 'variants')
+
+    def __init__(self, data):
+        body = json.dumps(
+            {'success': True, 'data': data},
+            ensure_ascii=False,
+            separators=(',', ':')
+        ).encode('utf-8')
+
+        # Strong ETag derived from the identity body; encodings get a suffix
+        # so that caches never mix up compressed and uncompressed bytes
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etag = digest
+
+        self.variants = {
+            'identity': body,
+            'gzip': gzip.compress(body, compresslevel=9, mtime=0)
+        }
+        if brotli is not None:
+            self.variants['br'] = brotli.compress(body, quality=11)
+
+    def etag_for(self, encoding):
+        """Return the quoted strong ETag for an encoding variant"""
+        if encoding == 'identity':
+            return f'"{self.etag}"'
+        return f'"{self.etag}-{encoding}"'
+
+
+def _build_payloads():
+    return {
+        'zodiac-mapping': StaticPayload(ZODIAC_BODY_MAPPING),
+        'vastu-directions': StaticPayload(VASTU_DIRECTIONS),
+        'planet-colors': StaticPayload(PLANET_COLORS),
+        'planet-classical': StaticPayload(PLANET_ZODIAC_CLASSICAL)
+    }
+
+
+STATIC_PAYLOADS = _build_payloads()
+
+
+def _choose_encoding(payload):
+    """Pick the best encoding the client accepts (br > gzip > identity)"""
+    accepted = request.accept_encodings
+    for encoding in ('br', 'gzip'):
+        if encoding in payload.variants and accepted[encoding]:
+            return encoding
+    return 'identity'
+
+
+def _etag_matches(header_value, payload):
+    """Check an If-None-Match header against every variant's ETag"""
+    if not header_value:
+        return False
+    if header_value.strip() == '*':
+        return True
+    candidates = {tag.strip() for tag in header_value.split(',')}
+    # Weak comparison is what If-None-Match mandates
+    candidates |= {tag[2:] for tag in candidates if tag.startswith('W/')}
+    return any(payload.etag_for(encoding) in candidates for encoding in payload.variants)
+
+
+def serve_static_payload(name):
+    """
+    Build the response for a precomputed knowledge payload
+
+    Args:
+        name (str): Payload key (e.g., 'zodiac-mapping')
+
+    Returns:
+        Response: 304 when the client's copy is current, otherwise the
+        (possibly compressed) cached body
+    """
+    payload = STATIC_PAYLOADS[name]
+    encoding = _choose_encoding(payload)
+    etag = payload.etag_for(encoding)
+
+    if _etag_matches(request.headers.get('If-None-Match'), payload):
+        response = Response(status=304)
+    else:
+        response = Response(payload.variants[encoding], mimetype='application/json')
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = f'public, max-age={STATIC_PAYLOAD_MAX_AGE}'
+    response.vary.add('Accept-Encoding')
+    return response
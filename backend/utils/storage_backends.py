@@ -0,0 +1,149 @@
+# Pluggable storage for generated reports
+# Reports are stored under unique ids in a hash-sharded layout
+# (ab/cd/<id>.pdf) either on local disk or in an S3-compatible bucket, so
+# several app instances can share generated reports.
+
+import hashlib
+import os
+import re
+import shutil
+import uuid
+
+REPORT_ID_PATTERN = re.compile(r'^[0-9a-f]{32}\.(pdf|docx|xlsx)$')
+
+
+def new_report_id(extension):
+    """Create a unique report id such as '3f2a...c9.pdf'"""
+    return f"{uuid.uuid4().hex}.{extension}"
+
+
+def is_valid_report_id(report_id):
+    """Check a client-supplied report id before using it in a path or key"""
+    return bool(REPORT_ID_PATTERN.match(report_id or ''))
+
+
+def shard_path(report_id):
+    """
+    Map a report id to its sharded relative location
+
+    Two levels of 256 directories keep any single directory small even with
+    millions of reports.
+    """
+    digest = hashlib.sha1(report_id.encode('utf-8')).hexdigest()
+    return f"{digest[:2]}/{digest[2:4]}/{report_id}"
+
+
+def _extension(path):
+    extension = os.path.splitext(path)[1].lstrip('.').lower()
+    return extension or 'pdf'
+
+
+class LocalReportStore:
+    """Reports on the local filesystem under root/ab/cd/<id>"""
+
+    def __init__(self, root):
+        # Directories are created as reports are saved
+        self.root = root
+
+    def path(self, report_id):
+        """Absolute local path of a stored report"""
+        return os.path.join(self.root, *shard_path(report_id).split('/'))
+
+    def save(self, source_path):
+        """Move a freshly rendered file into the store and return its id"""
+        report_id = new_report_id(_extension(source_path))
+        destination = self.path(report_id)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        try:
+            os.replace(source_path, destination)
+        except OSError:
+            # Different filesystem: fall back to copy + delete
+            shutil.move(source_path, destination)
+        return report_id
+
+    def exists(self, report_id):
+        return os.path.exists(self.path(report_id))
+
+    def open(self, report_id):
+        return open(self.path(report_id), 'rb')
+
+    def delete(self, report_id):
+        try:
+            os.remove(self.path(report_id))
+        except FileNotFoundError:
+            pass
+
+
+class S3ReportStore:
+    """Reports in an S3-compatible bucket (AWS S3, MinIO, ...) under prefix/ab/cd/<id>"""
+
+    def __init__(self, bucket, prefix='', endpoint_url=None, region=None):
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError('boto3 is required for S3 report storage. Please run: pip install boto3')
+
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        # Credentials come from the standard AWS environment variables/profiles
+        self.client = boto3.client('s3', endpoint_url=endpoint_url or None, region_name=region or None)
+
+    def _key(self, report_id):
+        key = shard_path(report_id)
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def path(self, report_id):
+        """Reports are not on local disk"""
+        return None
+
+    def save(self, source_path):
+        """Upload a freshly rendered file, remove the local copy and return its id"""
+        report_id = new_report_id(_extension(source_path))
+        self.client.upload_file(source_path, self.bucket, self._key(report_id))
+        os.remove(source_path)
+        return report_id
+
+    def exists(self, report_id):
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(report_id))
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+    def open(self, report_id):
+        return self.client.get_object(Bucket=self.bucket, Key=self._key(report_id))['Body']
+
+    def delete(self, report_id):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(report_id))
+
+
+def create_report_store(default_root):
+    """
+    Build the report store selected by REPORT_STORAGE_BACKEND
+
+    Environment:
+        REPORT_STORAGE_BACKEND: 'local' (default) or 's3'
+        REPORT_STORAGE_ROOT: local root directory (defaults to default_root)
+        S3_BUCKET, S3_PREFIX, S3_ENDPOINT_URL, S3_REGION: S3 settings;
+            S3_ENDPOINT_URL points at MinIO or another compatible service
+    """
+    backend = os.getenv("REPORT_STORAGE_BACKEND", "local").lower()
+
+    if backend == 's3':
+        bucket = os.getenv("S3_BUCKET")
+        if not bucket:
+            raise RuntimeError('S3_BUCKET must be set when REPORT_STORAGE_BACKEND=s3')
+        return S3ReportStore(
+            bucket,
+            prefix=os.getenv("S3_PREFIX", "reports"),
+            endpoint_url=os.getenv("S3_ENDPOINT_URL"),
+            region=os.getenv("S3_REGION")
+        )
+
+    if backend != 'local':
+        raise RuntimeError(f'Unknown REPORT_STORAGE_BACKEND "{backend}"')
+
+    return LocalReportStore(os.getenv("REPORT_STORAGE_ROOT", default_root))
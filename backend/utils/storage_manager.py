@@ -0,0 +1,288 @@
+# Retention and size-capped eviction for generated reports
+# Every report file's size and last download time are kept in a small
+# SQLite index beside the reports (<root>/.report_index.db) that all worker
+# processes on the host share, so the size cap covers every worker's writes
+# and a download through one worker protects the file from eviction by any
+# other. Triggers keep the file count and total size in a one-row totals
+# table, so the size check is O(1), and eviction walks the last_access
+# index from the least recently downloaded file. One janitor per host runs
+# the periodic eviction: whichever process holds <root>/.janitor.lock.
+# Only reports in the local store are tracked: with the S3 backend,
+# expire objects with a bucket lifecycle rule instead.
+
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: every process runs a janitor
+    fcntl = None
+
+# Defaults for the web app and the dasha scheduler (total size cap, maximum age)
+REPORT_STORAGE_MAX_BYTES = int(os.getenv("REPORT_STORAGE_MAX_BYTES", str(1024 * 1024 * 1024)))  # 1GB
+REPORT_STORAGE_MAX_AGE_SECONDS = int(os.getenv("REPORT_STORAGE_MAX_AGE_SECONDS", str(7 * 24 * 3600)))  # 7 days
+REPORT_JANITOR_INTERVAL_SECONDS = int(os.getenv("REPORT_JANITOR_INTERVAL_SECONDS", "300"))
+
+INDEX_NAME = '.report_index.db'
+JANITOR_LOCK_NAME = '.janitor.lock'
+INDEX_BUSY_TIMEOUT_SECONDS = 5
+EVICT_BATCH = 256
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS reports (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        last_access REAL NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS reports_last_access ON reports (last_access)",
+    """CREATE TABLE IF NOT EXISTS totals (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        files INTEGER NOT NULL DEFAULT 0,
+        bytes INTEGER NOT NULL DEFAULT 0,
+        scanned INTEGER NOT NULL DEFAULT 0,
+        evicted_files INTEGER NOT NULL DEFAULT 0,
+        evicted_bytes INTEGER NOT NULL DEFAULT 0,
+        last_eviction REAL
+    )""",
+    "INSERT OR IGNORE INTO totals (id) VALUES (0)",
+    """CREATE TRIGGER IF NOT EXISTS reports_insert AFTER INSERT ON reports BEGIN
+        UPDATE totals SET files = files + 1, bytes = bytes + NEW.size WHERE id = 0;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS reports_delete AFTER DELETE ON reports BEGIN
+        UPDATE totals SET files = files - 1, bytes = bytes - OLD.size WHERE id = 0;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS reports_resize AFTER UPDATE OF size ON reports BEGIN
+        UPDATE totals SET bytes = bytes - OLD.size + NEW.size WHERE id = 0;
+    END""",
+)
+
+
+class ReportStorageManager:
+    """Track generated report files host-wide and evict them by total size and age"""
+
+    def __init__(self, root, max_bytes, max_age_seconds, janitor_interval=300, on_evict=None, run_janitor=True):
+        """
+        Args:
+            on_evict (callable): Called with the paths of report files that
+                eviction removed, after they are gone
+            run_janitor (bool): False for processes that only register
+                reports (e.g. ones that fork workers later)
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.janitor_interval = janitor_interval
+        self.on_evict = on_evict
+        self.run_janitor = run_janitor
+
+        self._local = threading.local()
+        self._start_lock = threading.Lock()
+        self._started_pid = None
+        self._janitor_lock = None
+
+    def _connection(self):
+        """This thread's index connection, opened on first use (and again after a fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        os.makedirs(self.root, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(self.root, INDEX_NAME), timeout=INDEX_BUSY_TIMEOUT_SECONDS,
+                               isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _write(self, statements):
+        """Run (sql, params) pairs in one BEGIN IMMEDIATE transaction; returns the totals row"""
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for sql, params in statements:
+                conn.execute(sql, params)
+            totals = conn.execute('SELECT files, bytes FROM totals WHERE id = 0').fetchone()
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        return totals
+
+    def _key(self, path):
+        # Relative to root, so every process agrees however it spells the root
+        return os.path.relpath(path, self.root)
+
+    def ensure_started(self):
+        """Start this process's janitor thread; it runs eviction only while it holds the host lock"""
+        # Threads do not survive fork, so each gunicorn worker starts its own
+        if self._started_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._started_pid == os.getpid():
+                return
+            self._started_pid = os.getpid()
+            self._janitor_lock = None
+        thread = threading.Thread(target=self._janitor_loop, name='report-janitor', daemon=True)
+        thread.start()
+
+    def _acquire_janitor_lock(self):
+        """Become the host's janitor if no other process is; returns whether this process is it"""
+        if fcntl is None:
+            return True
+        if self._janitor_lock is None:
+            os.makedirs(self.root, exist_ok=True)
+            lock_file = open(os.path.join(self.root, JANITOR_LOCK_NAME), 'a')
+            try:
+                # Released by the kernel when the holder exits, so another worker takes over
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+            self._janitor_lock = lock_file
+        return True
+
+    def _scan(self):
+        """Index the files already on disk; runs once per index, in the janitor"""
+        conn = self._connection()
+        if conn.execute('SELECT scanned FROM totals WHERE id = 0').fetchone()[0]:
+            return
+        found = []
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+            for filename in filenames:
+                if filename.startswith('.'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                found.append((self._key(path), stat.st_size, stat.st_mtime))
+        # Files registered while walking keep their fresher entry
+        self._write(
+            [('INSERT OR IGNORE INTO reports (path, size, last_access) VALUES (?, ?, ?)', row) for row in found]
+            + [('UPDATE totals SET scanned = 1 WHERE id = 0', ())]
+        )
+
+    def register(self, path):
+        """Record a newly written report (counts as its first download)"""
+        if self.run_janitor:
+            self.ensure_started()
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        _, total_bytes = self._write([(
+            'INSERT INTO reports (path, size, last_access) VALUES (?, ?, ?) '
+            'ON CONFLICT (path) DO UPDATE SET size = excluded.size, last_access = excluded.last_access',
+            (self._key(path), size, time.time())
+        )])
+        if total_bytes > self.max_bytes:
+            self.evict()
+
+    def forget(self, path):
+        """Stop tracking a report deleted outside the janitor"""
+        self._connection().execute('DELETE FROM reports WHERE path = ?', (self._key(path),))
+
+    def touch(self, path):
+        """Mark a report as just downloaded"""
+        self._connection().execute('UPDATE reports SET last_access = ? WHERE path = ?',
+                                   (time.time(), self._key(path)))
+
+    def evict(self, now=None):
+        """
+        Delete least-recently-downloaded reports until the host's reports are
+        under max_bytes and nothing is older than max_age_seconds
+
+        Victims are picked and dropped from the index in one short write
+        transaction; their files are deleted after it commits, so other
+        workers' registers and touches never wait on file deletion.
+
+        Returns:
+            int: Number of files removed
+        """
+        now = time.time() if now is None else now
+        conn = self._connection()
+        victims = []
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            total_bytes = conn.execute('SELECT bytes FROM totals WHERE id = 0').fetchone()[0]
+            done = False
+            while not done:
+                rows = conn.execute(
+                    'SELECT path, size, last_access FROM reports ORDER BY last_access LIMIT ? OFFSET ?',
+                    (EVICT_BATCH, len(victims))
+                ).fetchall()
+                done = len(rows) < EVICT_BATCH
+                for key, size, last_access in rows:
+                    if total_bytes <= self.max_bytes and now - last_access <= self.max_age_seconds:
+                        done = True
+                        break
+                    victims.append((key, size))
+                    total_bytes -= size
+            conn.executemany('DELETE FROM reports WHERE path = ?', [(key,) for key, _ in victims])
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        if not victims:
+            return 0
+
+        removed, evicted_bytes, gone = 0, 0, []
+        for key, size in victims:
+            path = os.path.join(self.root, key)
+            try:
+                os.remove(path)
+                removed += 1
+                evicted_bytes += size
+            except FileNotFoundError:
+                pass  # deleted outside the janitor; its entry is gone now too
+            except OSError as e:
+                print(f"Error evicting report {path}: {e}")
+                continue
+            gone.append(path)
+        if removed:
+            conn.execute(
+                'UPDATE totals SET evicted_files = evicted_files + ?, evicted_bytes = evicted_bytes + ?, '
+                'last_eviction = ? WHERE id = 0',
+                (removed, evicted_bytes, now)
+            )
+
+        if gone and self.on_evict is not None:
+            try:
+                self.on_evict(gone)
+            except Exception as e:
+                print(f"Report eviction callback error: {e}")
+        return removed
+
+    def _janitor_loop(self):
+        while True:
+            try:
+                if self._acquire_janitor_lock():
+                    self._scan()
+                    self.evict()
+            except Exception as e:
+                print(f"Report janitor error: {e}")
+            time.sleep(self.janitor_interval)
+
+    def usage(self):
+        """Host-wide disk usage and eviction counters for the metrics endpoint"""
+        row = self._connection().execute(
+            'SELECT files, bytes, evicted_files, evicted_bytes, last_eviction FROM totals WHERE id = 0'
+        ).fetchone()
+        return {
+            'root': self.root,
+            'files': row[0],
+            'total_bytes': row[1],
+            'max_bytes': self.max_bytes,
+            'max_age_seconds': self.max_age_seconds,
+            'evicted_files': row[2],
+            'evicted_bytes': row[3],
+            'last_eviction': row[4],
+            'janitor': self._janitor_lock is not None or fcntl is None
+        }
@@ -0,0 +1,104 @@
+# Spooled, memory-mapped upload handling
+# Uploaded PDFs are spooled straight to a named temporary file while the
+# multipart body is parsed, then handed to PyPDF2 as a read-only mmap and to
+# poppler by path, so the upload is never copied into Python bytes.
+
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+from functools import wraps
+from io import BytesIO
+
+from flask import Request, jsonify, request
+
+# Non-PDF uploads up to this size stay in memory
+SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD_BYTES", str(512 * 1024)))
+SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None  # None = system temp dir
+
+
+def _is_pdf(filename, content_type):
+    return (filename or '').lower().endswith('.pdf') or content_type == 'application/pdf'
+
+
+class EmptyUploadError(ValueError):
+    """Raised when an uploaded file has no content"""
+
+
+class SpooledUploadRequest(Request):
+    """Request class that writes PDF and large uploads to named temp files"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if _is_pdf(filename, content_type) or total_content_length is None or total_content_length > SPOOL_THRESHOLD:
+            # Removed automatically when the request closes its files
+            return tempfile.NamedTemporaryFile('w+b', prefix='upload_', suffix='.pdf', dir=SPOOL_DIR)
+        return BytesIO()
+
+
+class SpooledUpload:
+    """An uploaded file as a read-only buffer plus a path external tools can read"""
+
+    def __init__(self, buffer, path, size):
+        self.buffer = buffer
+        self.path = path
+        self.size = size
+
+
+@contextmanager
+def open_upload(file_storage):
+    """
+    Map an uploaded file without copying it into Python bytes
+
+    Args:
+        file_storage (FileStorage): Entry from request.files
+
+    Yields:
+        SpooledUpload: buffer is a seekable stream (mmap or the in-memory
+            upload), path is the spooled file on disk
+
+    Raises:
+        EmptyUploadError: The uploaded file is empty
+    """
+    stream = file_storage.stream
+    # SpooledTemporaryFile-style wrappers keep the real file in _file
+    stream = getattr(stream, '_file', stream)
+
+    if isinstance(stream, BytesIO):
+        # Small upload kept in memory: spill it so poppler has a path
+        size = stream.getbuffer().nbytes
+        if size == 0:
+            raise EmptyUploadError('Uploaded file is empty')
+        with tempfile.NamedTemporaryFile('w+b', prefix='upload_', suffix='.pdf', dir=SPOOL_DIR) as spooled:
+            spooled.write(stream.getbuffer())
+            spooled.flush()
+            stream.seek(0)
+            yield SpooledUpload(stream, spooled.name, size)
+        return
+
+    stream.flush()
+    size = os.fstat(stream.fileno()).st_size
+    if size == 0:
+        raise EmptyUploadError('Uploaded file is empty')
+
+    mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        yield SpooledUpload(mapped, stream.name, size)
+    finally:
+        mapped.close()
+
+
+def upload_limit(max_bytes):
+    """Reject a request whose body is larger than this endpoint accepts"""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Checked from the header before the body is read; chunked bodies
+            # are still bounded by MAX_CONTENT_LENGTH
+            if request.content_length is not None and request.content_length > max_bytes:
+                return jsonify({
+                    'error': f'File size too large. Maximum size is {max_bytes // (1024 * 1024)}MB'
+                }), 413
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
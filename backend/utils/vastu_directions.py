@@ -1,6 +1,8 @@
 # 16-Direction Vastu Mapping with Planetary Influences and Colors
 # Used for advanced Mahavastu / Astro-Vastu practice
 
+from types import MappingProxyType
+
 VASTU_DIRECTIONS = {
     'East': {
         'number': 1,
@@ -145,6 +147,16 @@ PLANET_COLORS = {
     'Ketu': ['Yellow', 'Cream', 'White']
 }
 
+def _build_planet_directions_index():
+    index = {}
+    for direction, info in VASTU_DIRECTIONS.items():
+        for planet in info['planets']:
+            index.setdefault(planet, []).append(direction)
+    return MappingProxyType({planet: tuple(dirs) for planet, dirs in index.items()})
+
+# Read-only planet -> directions index (built once, in VASTU_DIRECTIONS order)
+PLANET_DIRECTIONS_INDEX = _build_planet_directions_index()
+
 def get_direction_info(direction):
     """
     Get Vastu information for a specific direction
@@ -205,11 +217,7 @@ def get_directions_for_planet(planet):
     Returns:
         list: List of directions where this planet has influence
     """
-    directions = []
-    for direction, info in VASTU_DIRECTIONS.items():
-        if planet in info['planets']:
-            directions.append(direction)
-    return directions
+    return list(PLANET_DIRECTIONS_INDEX.get(planet, ()))
 
 def get_all_directions():
     """
@@ -230,11 +238,12 @@ def suggest_colors_for_planets(planets):
     Returns:
         dict: Dictionary with colors to use and colors to avoid
     """
-    colors_to_use = set()
+    colors_to_use = {}
 
+    # dict keeps first-seen order so repeated calls give identical output
     for planet in planets:
         colors = get_colors_for_planet(planet)
-        colors_to_use.update(colors)
+        colors_to_use.update(dict.fromkeys(colors))
 
     return {
         'colors_to_use': list(colors_to_use),
@@ -0,0 +1,78 @@
+# Pre-fork warmup for gunicorn (preload_app)
+# Runs once in the master process so every forked worker inherits loaded
+# libraries, fonts, style sheets and precomputed tables copy-on-write, and
+# the first real request is as fast as the hundredth.
+
+import gc
+import shutil
+import tempfile
+import time
+
+# 1x1 white PNG so the throwaway render exercises the image pipeline too
+_SAMPLE_IMAGE = (
+    'data:image/png;base64,'
+    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8/5+hHgAHggJ/PchI7wAAAABJRU5ErkJggg=='
+)
+
+_SAMPLE_FORM = {
+    'name': 'Warmup Client',
+    'dateOfBirth': '1990-01-01',
+    'vastuAnalysis': 'North-East entrance\nSouth-West kitchen',
+    'houseMapImages': [_SAMPLE_IMAGE],
+    'houseMapAnalyses': ['Kitchen: South-East'],
+    'mahadasha_planet': 'Jupiter',
+    'pratyantardasha_planet': 'Venus',
+    'pratyantardasha_period_from': '2024-01-01',
+    'pratyantardasha_period_to': '2024-03-01',
+    'gemstones': 'Yellow Sapphire, Pearl',
+    'whatToPlace': 'Green plant in North',
+    'importantBooks': 'Bhagavad Gita',
+    'saturnRelation': 'Friendly'
+}
+
+
+def _warm_imports():
+    # Libraries the request handlers import lazily (see app.py)
+    import PyPDF2  # noqa: F401
+    import docx  # noqa: F401
+    import pdf2image  # noqa: F401
+    from PIL import Image
+    Image.init()  # register every codec plugin now instead of on first open
+
+    from . import chart_analysis, knowledge_index, static_payloads  # noqa: F401
+    from .astro_vastu_logic import RECOMMENDATION_TABLE
+    return len(RECOMMENDATION_TABLE)
+
+
+def _warm_render():
+    from .report_generator import ReportGenerator
+
+    # Throwaway reports: load reportlab fonts, style sheets and PIL codecs,
+    # and build the DOCX base template
+    scratch_dir = tempfile.mkdtemp(prefix='report_warmup_')
+    try:
+        ReportGenerator(output_dir=scratch_dir).generate(_SAMPLE_FORM, ['pdf', 'docx'])
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def warmup():
+    """
+    Load and precompute everything request handlers would otherwise build
+    lazily, then freeze the heap so workers share it copy-on-write
+    """
+    start = time.perf_counter()
+
+    _warm_imports()
+    try:
+        _warm_render()
+    except Exception as e:
+        # A failed warmup must never prevent the server from starting
+        print(f"Warmup render failed: {e}")
+
+    # Move everything allocated so far into the permanent generation so the
+    # cyclic GC never touches (and un-shares) those pages in the workers
+    gc.collect()
+    gc.freeze()
+
+    print(f"Warmup completed in {(time.perf_counter() - start) * 1000:.0f} ms")
@@ -2,11 +2,14 @@ import axios from 'axios';
 
 // Use environment variable for API URL, fallback to localhost for development
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:5001/api';
+// Shared key for the stored client endpoints (one of the backend's API_KEYS)
+const API_KEY = process.env.REACT_APP_API_KEY;
 
 const apiClient = axios.create({
   baseURL: API_BASE_URL,
   headers: {
     'Content-Type': 'application/json',
+    ...(API_KEY ? { 'X-API-Key': API_KEY } : {}),
   },
 });
 